@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import os
+from typing import Optional, Sequence, Type
+
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session, sessionmaker
+
+PAGE_SIZE = int(os.getenv("API_PAGE_SIZE", "100"))
+MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", "1000"))
+# Rows fetched per round trip while streaming NDJSON.
+STREAM_BATCH = int(os.getenv("API_STREAM_BATCH", "500"))
+# Set on a full page; pass its value back as ``after`` to get the next one.
+NEXT_CURSOR_HEADER = "X-Next-After"
+NDJSON = "application/x-ndjson"
+
+
+def keyset(model, after: Optional[int] = None, descending: bool = False) -> Select:
+    """``SELECT`` ordered by primary key, starting right after the ``after`` id."""
+
+    stmt = select(model).order_by(model.id.desc() if descending else model.id)
+    if after is not None:
+        stmt = stmt.where(model.id < after if descending else model.id > after)
+    return stmt
+
+
+def page(db: Session, stmt: Select, limit: int, response: Response) -> Sequence:
+    # one extra row tells whether another page exists without a COUNT
+    rows = db.scalars(stmt.limit(limit + 1)).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = str(rows[-1].id)
+    return rows
+
+
+def ndjson(db: Session, stmt: Select, schema: Type[BaseModel], limit: Optional[int] = None) -> StreamingResponse:
+    """Stream ``stmt`` as one JSON object per line, ``STREAM_BATCH`` rows in memory at a time."""
+
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    # The body is sent after the request's session is closed, so it reads with its own.
+    session_factory = sessionmaker(bind=db.get_bind(), autocommit=False, autoflush=False)
+
+    def lines():
+        with session_factory() as session:
+            for row in session.scalars(stmt.execution_options(yield_per=STREAM_BATCH)):
+                yield schema.model_validate(row).model_dump_json() + "\n"
+
+    return StreamingResponse(lines(), media_type=NDJSON)
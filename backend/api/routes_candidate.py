@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, load_only, sessionmaker, undefer
+from .pagination import MAX_PAGE_SIZE, PAGE_SIZE, keyset, ndjson, page
 from ..models.database import get_db
 from ..models.candidate import Candidate
-from ..schemas.Candidate import CandidateCreate, CandidateUpdate, CandidateResponse
+from ..models.upload_batch import UploadBatch
+from ..schemas.Candidate import BulkUploadStatus, CandidateCreate, CandidateUpdate, CandidateResponse, CandidateSummary
+from ..services.bulk_upload import spool_batch, start_batch
+from ..services.cv_executor import ParserBusyError, ParseTimeoutError
 from ..services.cv_parser import parse_cv
-from typing import List
+from ..services.matcher import candidate_deleted, candidate_fingerprint, candidate_saved
+from typing import List, Optional
 
 router = APIRouter(prefix="/candidates", tags=["candidates"])
 
@@ -12,15 +18,73 @@ router = APIRouter(prefix="/candidates", tags=["candidates"])
 def create_candidate(payload: CandidateCreate, db: Session = Depends(get_db)):
     c = Candidate(name=payload.name, skills=payload.skills, cv_text=payload.cv_text)
     db.add(c); db.commit(); db.refresh(c)
+    candidate_saved(db, c)
     return c
 
 @router.get("", response_model=List[CandidateResponse])
-def list_candidates(db: Session = Depends(get_db)):
-    return db.query(Candidate).order_by(Candidate.id.desc()).all()
+def list_candidates(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[int] = Query(None, description="id of the last candidate of the previous page"),
+    stream: bool = Query(False, description="stream every candidate after `after` as NDJSON"),
+    db: Session = Depends(get_db),
+):
+    # Newest first, so the cursor moves towards smaller ids.
+    stmt = keyset(Candidate, after, descending=True).options(undefer(Candidate.cv_text))
+    if stream:
+        return ndjson(db, stmt, CandidateResponse, limit)
+    return page(db, stmt, limit or PAGE_SIZE, response)
+
+@router.get("/summary", response_model=List[CandidateSummary])
+def list_candidate_summaries(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[int] = Query(None, description="id of the last candidate of the previous page"),
+    stream: bool = Query(False, description="stream every candidate after `after` as NDJSON"),
+    db: Session = Depends(get_db),
+):
+    """Same pages as ``GET /candidates`` without reading ``cv_text``."""
+    stmt = keyset(Candidate, after, descending=True).options(load_only(Candidate.id, Candidate.name, Candidate.skills))
+    if stream:
+        return ndjson(db, stmt, CandidateSummary, limit)
+    return page(db, stmt, limit or PAGE_SIZE, response)
+
+def _batch_status(batch: UploadBatch) -> BulkUploadStatus:
+    return BulkUploadStatus(
+        batch_id=batch.id,
+        status=batch.status,
+        total=batch.total,
+        processed=batch.processed,
+        succeeded=batch.succeeded,
+        failed=batch.failed,
+        failures=batch.failures or [],
+        created_at=batch.created_at,
+        finished_at=batch.finished_at,
+    )
+
+@router.post("/upload/bulk", response_model=BulkUploadStatus, status_code=202)
+async def upload_cv_bulk(files: List[UploadFile] = File(...), db: Session = Depends(get_db)):
+    """Accept many CVs (or zip archives of CVs) and process them in the background."""
+    try:
+        spooled = await run_in_threadpool(spool_batch, [(f.filename, f.file) for f in files])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Workers outlive this request, so they get their own sessions.
+    session_factory = sessionmaker(bind=db.get_bind(), autocommit=False, autoflush=False, expire_on_commit=False)
+    batch = await run_in_threadpool(start_batch, db, session_factory, spooled)
+    return _batch_status(batch)
+
+@router.get("/upload/bulk/{batch_id}", response_model=BulkUploadStatus)
+def get_bulk_upload(batch_id: str, db: Session = Depends(get_db)):
+    batch = db.get(UploadBatch, batch_id)
+    if not batch:
+        raise HTTPException(404, "Upload batch not found")
+    return _batch_status(batch)
 
 @router.get("/{candidate_id}", response_model=CandidateResponse)
 def get_candidate(candidate_id: int, db: Session = Depends(get_db)):
-    c = db.get(Candidate, candidate_id)
+    c = db.get(Candidate, candidate_id, options=[undefer(Candidate.cv_text)])
     if not c:
         raise HTTPException(404, "Candidate not found")
     return c
@@ -30,7 +94,9 @@ def delete_candidate(candidate_id: int, db: Session = Depends(get_db)):
     c = db.get(Candidate, candidate_id)
     if not c:
         raise HTTPException(404, "Candidate not found")
+    fingerprint = candidate_fingerprint(c)
     db.delete(c); db.commit()
+    candidate_deleted(db, candidate_id, fingerprint)
     return {"ok": True}
 
 @router.put("/{candidate_id}", response_model=CandidateResponse)
@@ -38,10 +104,12 @@ def update_candidate(candidate_id: int, payload: CandidateUpdate, db: Session =
     c = db.get(Candidate, candidate_id)
     if not c:
         raise HTTPException(404, "Candidate not found")
+    previous = candidate_fingerprint(c)
     if payload.name is not None: c.name = payload.name
     if payload.skills is not None: c.skills = payload.skills
     if payload.cv_text is not None: c.cv_text = payload.cv_text
     db.commit(); db.refresh(c)
+    candidate_saved(db, c, previous_fingerprint=previous)
     return c
 
 @router.post("/upload", response_model=CandidateResponse)
@@ -50,7 +118,16 @@ async def upload_cv(file: UploadFile = File(...), db: Session = Depends(get_db))
         name_guess, cv_text, skills = await parse_cv(file)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except ParserBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except ParseTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+
+    # The insert and embedding are blocking too; keep them off the event loop.
+    return await run_in_threadpool(_store_upload, db, name_guess, cv_text, skills)
 
+def _store_upload(db: Session, name_guess, cv_text: str, skills: List[str]) -> Candidate:
     c = Candidate(name=name_guess or "Unknown", cv_text=cv_text, skills=skills)
     db.add(c); db.commit(); db.refresh(c)
+    candidate_saved(db, c)
     return c
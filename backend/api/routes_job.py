@@ -1,40 +1,69 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from models.database import SessionLocal
-from models.job import Job
-from schemas.job import JobCreate, JobUpdate, JobResponse
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, load_only, undefer
+from ..models.database import get_db
+from ..models.job import Job
+from .pagination import MAX_PAGE_SIZE, PAGE_SIZE, keyset, ndjson, page
+from ..schemas.job import JobCreate, JobUpdate, JobResponse, JobSummary
+from ..services.job_ingest import canonical_job_url
+from ..services.matcher import job_deleted, job_fingerprint, job_saved
+from typing import List, Optional
 
 router = APIRouter()
 
-# Dependency để lấy DB session
-def get_db():
-    db = SessionLocal()
+def _commit_unique_url(db: Session) -> None:
+    # job_url là khóa upsert của pipeline ingest nên phải duy nhất
     try:
-        yield db
-    finally:
-        db.close()
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="A job with this job_url already exists")
 
-# Lấy tất cả jobs
+# Lấy jobs theo trang (keyset trên id tăng dần); stream=true trả NDJSON toàn bộ
 @router.get("/jobs", response_model=List[JobResponse])
-def get_jobs(db: Session = Depends(get_db)):
-    return db.query(Job).all()
+def get_jobs(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[int] = Query(None, description="id of the last job of the previous page"),
+    stream: bool = Query(False, description="stream every job after `after` as NDJSON"),
+    db: Session = Depends(get_db),
+):
+    stmt = keyset(Job, after).options(undefer(Job.description))
+    if stream:
+        return ndjson(db, stmt, JobResponse, limit)
+    return page(db, stmt, limit or PAGE_SIZE, response)
+
+# Như /jobs nhưng không đọc description
+@router.get("/jobs/summary", response_model=List[JobSummary])
+def get_job_summaries(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[int] = Query(None, description="id of the last job of the previous page"),
+    stream: bool = Query(False, description="stream every job after `after` as NDJSON"),
+    db: Session = Depends(get_db),
+):
+    stmt = keyset(Job, after).options(load_only(Job.id, Job.title, Job.company, Job.location, Job.skills, Job.job_url))
+    if stream:
+        return ndjson(db, stmt, JobSummary, limit)
+    return page(db, stmt, limit or PAGE_SIZE, response)
 
 # Lấy chi tiết job theo ID
 @router.get("/jobs/{job_id}", response_model=JobResponse)
 def get_job(job_id: int, db: Session = Depends(get_db)):
-    job = db.query(Job).filter(Job.id == job_id).first()
+    job = db.query(Job).options(undefer(Job.description)).filter(Job.id == job_id).first()
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     return job
 
 # Thêm job mới
-@router.post("/jobs", response_model=JobResponse)
+@router.post("/jobs", response_model=JobResponse, status_code=201)
 def create_job(job: JobCreate, db: Session = Depends(get_db)):
-    new_job = Job(**job.dict())
+    # Chuẩn hóa job_url giống pipeline ingest để upsert theo URL khớp nhau
+    new_job = Job(**{**job.dict(), "job_url": canonical_job_url(job.job_url)})
     db.add(new_job)
-    db.commit()
+    _commit_unique_url(db)
     db.refresh(new_job)
+    job_saved(db, new_job)
     return new_job
 
 # Update job
@@ -43,18 +72,22 @@ def update_job(job_id: int, job_update: JobUpdate, db: Session = Depends(get_db)
     job = db.query(Job).filter(Job.id == job_id).first()
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
-    for key, value in job_update.dict().items():
-        setattr(job, key, value)
-    db.commit()
+    previous = job_fingerprint(job)
+    for key, value in job_update.dict(exclude_unset=True).items():
+        setattr(job, key, canonical_job_url(value) if key == "job_url" else value)
+    _commit_unique_url(db)
     db.refresh(job)
+    job_saved(db, job, previous_fingerprint=previous)
     return job
 
 # Xóa job
-@router.delete("/jobs/{job_id}")
+@router.delete("/jobs/{job_id}", status_code=204)
 def delete_job(job_id: int, db: Session = Depends(get_db)):
     job = db.query(Job).filter(Job.id == job_id).first()
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
+    fingerprint = job_fingerprint(job)
     db.delete(job)
     db.commit()
-    return {"message": f"Job {job_id} deleted successfully"}
+    job_deleted(db, job_id, fingerprint)
+    return None
@@ -1,22 +1,47 @@
+import json
+from typing import Literal
+
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, sessionmaker
 
 from ..models.database import get_db
-from ..schemas.match import CandidateMatchResponse, CandidateSkillGapResponse
-from ..services.matcher import candidate_skill_snapshot, match_for_candidate
+from ..schemas.match import (
+    BatchMatchRequest,
+    CandidateMatchResponse,
+    CandidateSkillGapResponse,
+    JobMatchResponse,
+    MatchCacheStats,
+)
+from ..services.match_cache import get_match_cache
+from ..services.matcher import (
+    candidate_skill_snapshot,
+    job_skill_snapshot,
+    match_for_candidate,
+    match_for_job,
+    match_many,
+)
 from ..services.skill_gap import summarise_skill_gaps
 
 router = APIRouter(prefix="/match", tags=["match"])
 
 
+@router.get("/cache/stats", response_model=MatchCacheStats)
+def match_cache_stats():
+    return MatchCacheStats(**get_match_cache().stats())
+
+
 @router.get("/candidate/{candidate_id}", response_model=CandidateMatchResponse)
 def match_candidate(
     candidate_id: int,
     top_k: int = Query(20, ge=1, le=100),
     min_score: float = Query(0.0, ge=0.0, le=1.0),
+    semantic_mode: Literal["exact", "ann"] = Query("exact"),
     db: Session = Depends(get_db),
 ):
-    candidate, rows = match_for_candidate(db, candidate_id, top_k=top_k, min_score=min_score)
+    candidate, rows = match_for_candidate(
+        db, candidate_id, top_k=top_k, min_score=min_score, semantic_mode=semantic_mode
+    )
     if candidate is None:
         raise HTTPException(status_code=404, detail="Candidate not found")
 
@@ -28,6 +53,33 @@ def match_candidate(
     )
 
 
+@router.post("/batch")
+def match_batch(payload: BatchMatchRequest, db: Session = Depends(get_db)):
+    """Stream one NDJSON line per candidate so memory stays flat for any batch size."""
+
+    candidate_ids = None if payload.candidate_ids == "all" else payload.candidate_ids
+    # The response body is produced after this handler returns, so it gets its own session.
+    session_factory = sessionmaker(bind=db.get_bind(), autocommit=False, autoflush=False)
+
+    def lines():
+        with session_factory() as session:
+            for candidate_id, candidate, rows in match_many(
+                session, candidate_ids, top_k=payload.top_k, min_score=payload.min_score
+            ):
+                if candidate is None:
+                    yield json.dumps({"candidate_id": candidate_id, "error": "Candidate not found"}) + "\n"
+                    continue
+                response = CandidateMatchResponse(
+                    candidate_id=candidate.id,
+                    candidate_name=candidate.name,
+                    candidate_skills=candidate_skill_snapshot(candidate),
+                    results=rows,
+                )
+                yield response.model_dump_json() + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
 @router.get("/candidate/{candidate_id}/skill-gap", response_model=CandidateSkillGapResponse)
 def candidate_skill_gap(
     candidate_id: int,
@@ -49,3 +101,23 @@ def candidate_skill_gap(
         considered_jobs=len(rows),
         gaps=gaps,
     )
+
+
+@router.get("/job/{job_id}", response_model=JobMatchResponse)
+def match_job(
+    job_id: int,
+    top_k: int = Query(20, ge=1, le=100),
+    min_score: float = Query(0.0, ge=0.0, le=1.0),
+    db: Session = Depends(get_db),
+):
+    job, rows = match_for_job(db, job_id, top_k=top_k, min_score=min_score)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return JobMatchResponse(
+        job_id=job.id,
+        job_title=job.title,
+        company=job.company,
+        job_skills=job_skill_snapshot(job),
+        results=rows,
+    )
@@ -0,0 +1,141 @@
+"""Offline TopCV crawler throughput: pages/sec, retries and parse time per page type.
+
+Run with ``python -m backend.benchmarks.crawler``. Pages come from a response
+archive served by :class:`ReplayAdapter`, never from topcv.vn: either one
+recorded with ``iter_crawl(..., record_to=DIR)`` (``--archive DIR --query URL``)
+or, by default, a synthetic site built from the saved test fixtures.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from ..services.http_cache import page_kind
+from ..services.http_replay import ReplayAdapter, ResponseArchive
+from ..services.rate_limit import HostRateLimiter
+from ..services.topcv import BASE, build_session, get_parser_backend
+from ..services.topcv_crawler import crawl_concurrent
+
+FIXTURES = Path(__file__).resolve().parents[2] / "tests" / "fixtures" / "topcv"
+SYNTHETIC_QUERY = BASE + "/tim-viec-lam-benchmark?type_keyword=1&page={page}&sba=1"
+
+_SEARCH_ITEM = (
+    '<div class="job-item-search-result"><h3 class="title"><a href="/viec-lam/benchmark-{job}/{job}.html">'
+    'Data Analyst {job}</a></h3><a class="company" href="/cong-ty/benchmark-{company}/{company}.html">'
+    '<span class="company-name">Company {company}</span></a><label class="title-salary">15 - 25 triệu</label>'
+    '<label class="address"><span class="city-text">Hà Nội</span></label><label class="exp"><span>2 năm</span></label></div>'
+)
+
+
+def build_synthetic_archive(directory: str, pages: int, jobs_per_page: int, companies: int) -> ResponseArchive:
+    """Search, job and company pages cloned from the fixtures under fresh ids."""
+
+    archive = ResponseArchive(directory)
+    job_html = (FIXTURES / "job_1001.html").read_text(encoding="utf-8")
+    company_html = (FIXTURES / "company_501.html").read_text(encoding="utf-8")
+    for page in range(1, pages + 1):
+        items = []
+        for slot in range(jobs_per_page):
+            job = page * 10000 + slot
+            company = 1 + job % companies
+            items.append(_SEARCH_ITEM.format(job=job, company=company))
+            detail = re.sub(r"/cong-ty/[^\"']+", f"/cong-ty/benchmark-{company}/{company}.html", job_html)
+            archive.store(f"{BASE}/viec-lam/benchmark-{job}/{job}.html", 200, detail)
+        archive.store(SYNTHETIC_QUERY.format(page=page), 200, f"<html><body>{''.join(items)}</body></html>")
+    for company in range(1, companies + 1):
+        archive.store(f"{BASE}/cong-ty/benchmark-{company}/{company}.html", 200, company_html)
+    return archive
+
+
+def parse_times(archive: ResponseArchive, repeat: int = 3) -> Dict[str, Dict[str, float]]:
+    """Mean milliseconds to parse one archived page, per page type and parser backend."""
+
+    by_kind: Dict[str, List[str]] = {}
+    for entry in archive:
+        kind = page_kind(entry["url"])
+        if kind in ("search", "job", "company"):
+            by_kind.setdefault(kind, []).append(entry["body"])
+
+    result: Dict[str, Dict[str, float]] = {}
+    for kind, bodies in sorted(by_kind.items()):
+        result[kind] = {}
+        for name in ("bs4", "lxml"):
+            parse = getattr(get_parser_backend(name), kind)
+            started = time.perf_counter()
+            for _ in range(repeat):
+                for body in bodies:
+                    parse(body)
+            result[kind][name] = (time.perf_counter() - started) * 1000 / (repeat * len(bodies))
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--archive", help="recorded archive directory (default: synthetic site from fixtures)")
+    parser.add_argument("--query", default=SYNTHETIC_QUERY, help="search URL template with {page}")
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--jobs-per-page", type=int, default=20)
+    parser.add_argument("--companies", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.02, help="share of requests answered 503")
+    parser.add_argument("--throttle-rate", type=float, default=0.02, help="share of requests answered 429")
+    parser.add_argument("--max-in-flight", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--rps", type=float, default=100.0, help="token bucket rate per host")
+    parser.add_argument("--parser", default="lxml", choices=["bs4", "lxml"])
+    parser.add_argument("--parse-workers", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        if args.archive:
+            archive = ResponseArchive(args.archive)
+        else:
+            archive = build_synthetic_archive(os.path.join(scratch, "archive"), args.pages, args.jobs_per_page, args.companies)
+
+        print(f"{'in flight':>9} {'rows':>6} {'requests':>9} {'seconds':>8} {'pages/s':>8} {'429s':>5} {'5xx retries':>11}")
+        for max_in_flight in args.max_in_flight:
+            replay = ReplayAdapter(
+                archive,
+                latency=args.latency,
+                jitter=args.jitter,
+                error_rate=args.error_rate,
+                throttle_rate=args.throttle_rate,
+                seed=args.seed,
+            )
+            limiter = HostRateLimiter(args.rps, burst=max_in_flight)
+            session = build_session(limiter, pool_maxsize=max_in_flight, transport=replay)
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):  # the crawler logs every page
+                rows = crawl_concurrent(
+                    args.query,
+                    1,
+                    args.pages,
+                    max_in_flight=max_in_flight,
+                    session=session,
+                    parser=args.parser,
+                    parse_workers=args.parse_workers,
+                )
+            elapsed = time.perf_counter() - started
+            stats = replay.stats()
+            print(
+                f"{max_in_flight:>9} {len(rows):>6} {stats['requests']:>9} {elapsed:>8.2f} "
+                f"{stats['served'] / elapsed:>8.1f} {limiter.throttled:>5} {stats['retries']:>11}"
+            )
+
+        print()
+        print(f"{'page type':>9} {'bs4 ms':>8} {'lxml ms':>8}")
+        for kind, times in parse_times(archive).items():
+            print(f"{kind:>9} {times['bs4']:>8.2f} {times['lxml']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
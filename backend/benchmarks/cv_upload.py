@@ -0,0 +1,114 @@
+"""Peak RSS of one CV upload as the PDF grows: whole-file parsing vs the streaming path.
+
+Run with ``python -m backend.benchmarks.cv_upload``. Each measurement parses
+one synthetic PDF in a fresh interpreter and reports that process's peak
+RSS, so runs do not share allocator state.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from typing import List
+
+# Page content: a few lines of CV text plus an uncompressed image, like a scanned page.
+IMAGE_SIDE = 400
+TEXT_LINES = ["Jane Doe", "Senior backend engineer", "Python, FastAPI, PostgreSQL, Docker, Kubernetes"]
+
+
+def write_synthetic_pdf(path: str, pages: int) -> int:
+    """Write a ``pages``-page PDF with text and a raw image per page; returns its size in bytes."""
+
+    objects: List[bytes] = [b"<< /Type /Catalog /Pages 2 0 R >>", b""]
+    font_id = 3
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    page_ids: List[int] = []
+    image = bytes((i * 7) % 256 for i in range(IMAGE_SIDE * IMAGE_SIDE))
+    for number in range(pages):
+        text = " ".join(f"({line} - page {number + 1}) Tj 0 -16 Td" for line in TEXT_LINES)
+        content = f"q {IMAGE_SIDE} 0 0 {IMAGE_SIDE} 100 300 cm /Im0 Do Q BT /F1 12 Tf 72 760 Td {text} ET".encode()
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceGray /BitsPerComponent 8 /Length %d >>\nstream\n"
+            % (IMAGE_SIDE, IMAGE_SIDE, len(image))
+            + image
+            + b"\nendstream"
+        )
+        image_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 %d 0 R >> /XObject << /Im0 %d 0 R >> >> >>" % (content_id, font_id, image_id)
+        )
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, pages)
+
+    with open(path, "wb") as handle:
+        handle.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(handle.tell())
+            handle.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+        xref = handle.tell()
+        handle.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for offset in offsets:
+            handle.write(b"%010d 00000 n \n" % offset)
+        handle.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+        return handle.tell()
+
+
+_MEASURE = r"""
+import io, json, resource, sys
+mode, path = sys.argv[1], sys.argv[2]
+# Import the same modules in both modes so the baselines match.
+import pdfplumber
+from backend.services.cv_parser import parse_cv_bytes, spool_upload
+if mode == "whole":
+    with open(path, "rb") as handle:
+        content = handle.read()
+    with pdfplumber.open(io.BytesIO(content)) as pdf:
+        text = "\n".join(page.extract_text() or "" for page in pdf.pages)
+else:
+    with open(path, "rb") as handle:
+        source = spool_upload(handle, ".pdf")
+    text = parse_cv_bytes("cv.pdf", source)[1]
+    if isinstance(source, str):
+        import os
+        os.remove(source)
+print(json.dumps({"chars": len(text), "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}))
+"""
+
+
+def measure(mode: str, path: str) -> dict:
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    output = subprocess.run(
+        [sys.executable, "-c", _MEASURE, mode, path], check=True, capture_output=True, text=True, cwd=root
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[5, 20, 80, 160])
+    args = parser.parse_args()
+
+    print(f"{'pages':>6} {'size MB':>8} {'whole RSS MB':>13} {'stream RSS MB':>14} {'stream chars':>13}")
+    with tempfile.TemporaryDirectory() as directory:
+        for pages in args.pages:
+            path = os.path.join(directory, f"cv-{pages}.pdf")
+            size = write_synthetic_pdf(path, pages)
+            whole = measure("whole", path)
+            stream = measure("stream", path)
+            print(
+                f"{pages:>6} {size / 2**20:>8.1f} {whole['max_rss_kb'] / 1024:>13.1f} "
+                f"{stream['max_rss_kb'] / 1024:>14.1f} {stream['chars']:>13}"
+            )
+
+
+if __name__ == "__main__":
+    main()
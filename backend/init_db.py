@@ -1,11 +1,13 @@
 from models.database import Base, engine, SessionLocal
-from models import job, candidate
+from models import job, candidate, corpus_revision, embedding, upload_batch
+from models.migrations import ensure_schema
 from models.job import Job
 
 def init():
     # Tạo bảng trong DB
     print("📦 Creating tables...")
     Base.metadata.create_all(bind=engine)
+    ensure_schema(engine)
 
     # Thêm dữ liệu mẫu
     db = SessionLocal()
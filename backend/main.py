@@ -1,7 +1,49 @@
+from contextlib import asynccontextmanager
+from typing import Optional
+
 from fastapi import FastAPI
-from api.routes_job import router as job_router
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import sessionmaker
+
+from .api.routes_candidate import router as candidate_router
+from .api.routes_job import router as job_router
+from .api.routes_match import router as match_router
+from .models.database import get_db
+from .models.migrations import ensure_schema
+from .services.bulk_upload import BatchSupervisor
+from .services.cv_executor import get_parse_executor
+from .services.skill_taxonomy import get_skill_taxonomy
+
+
+def _prepare_database(app: FastAPI) -> Optional[BatchSupervisor]:
+    sessions = app.dependency_overrides.get(get_db, get_db)()
+    try:
+        bind = next(sessions).get_bind()
+        # Columns added since the tables were created (create_all never alters them).
+        ensure_schema(bind)
+        # Bulk uploads whose process died would otherwise stay queued forever.
+        supervisor = BatchSupervisor(sessionmaker(bind=bind, autocommit=False, autoflush=False))
+        supervisor.run_once()
+        return supervisor.start()
+    except DBAPIError:
+        # No database (or no tables) yet: start anyway, as before.
+        return None
+    finally:
+        sessions.close()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the compiled skill taxonomy once instead of on the first CV upload.
+    get_skill_taxonomy()
+    supervisor = _prepare_database(app)
+    yield
+    if supervisor is not None:
+        supervisor.stop()
+    get_parse_executor().shutdown()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 @app.get("/")
 def read_root():
@@ -9,3 +51,5 @@ def read_root():
 
 # Gắn router cho Job API
 app.include_router(job_router)
+app.include_router(candidate_router)
+app.include_router(match_router)
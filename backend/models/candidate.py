@@ -12,5 +12,6 @@ class Candidate(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     name: Mapped[str] = mapped_column(Text, nullable=False)
-    cv_text: Mapped[str | None] = mapped_column(Text)
+    # Loaded on first access; a CV is tens of KB that most reads never look at.
+    cv_text: Mapped[str | None] = mapped_column(Text, deferred=True)
     skills: Mapped[list[str]] = mapped_column(SkillList(), default=list)
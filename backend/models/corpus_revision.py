@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from sqlalchemy import Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .database import Base
+
+
+class CorpusRevision(Base):
+    """Write counter of one corpus ("jobs" or "candidates") shared by every process."""
+
+    __tablename__ = "corpus_revisions"
+
+    name: Mapped[str] = mapped_column(String(32), primary_key=True)
+    revision: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
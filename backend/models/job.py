@@ -13,6 +13,8 @@ class Job(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     title: Mapped[str] = mapped_column(Text, nullable=False)
     company: Mapped[str] = mapped_column(Text, nullable=False)
-    description: Mapped[str] = mapped_column(Text, nullable=False)
+    # Loaded on first access; lists and matching never need the full posting text.
+    description: Mapped[str] = mapped_column(Text, nullable=False, deferred=True)
     location: Mapped[str] = mapped_column(Text, nullable=False)
     skills: Mapped[list[str]] = mapped_column(SkillList(), default=list)
+    job_url: Mapped[str | None] = mapped_column(Text, unique=True, index=True)
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+
+# Columns added to tables that ``create_all`` does not alter once they exist:
+# (table, column, DDL type, unique index name or None).
+ADDED_COLUMNS = (
+    ("jobs", "job_url", "TEXT", "ix_jobs_job_url"),
+    ("upload_batches", "owner", "VARCHAR(128)", None),
+    ("upload_batches", "heartbeat_at", "TIMESTAMP WITH TIME ZONE", None),
+)
+
+
+def _has_column(bind: Engine | Connection, table: str, column: str) -> bool:
+    return column in {info["name"] for info in inspect(bind).get_columns(table)}
+
+
+def ensure_schema(bind: Engine | Connection) -> list[str]:
+    """Add the columns of :data:`ADDED_COLUMNS` missing from an existing database.
+
+    Idempotent and safe to run from several processes at once: a column added
+    by a concurrent caller is detected and skipped. Returns ``table.column``
+    for every column added here.
+    """
+
+    engine = bind.engine if isinstance(bind, Connection) else bind
+    added: list[str] = []
+    for table, column, ddl_type, unique_index in ADDED_COLUMNS:
+        if not inspect(engine).has_table(table) or _has_column(engine, table, column):
+            continue
+        try:
+            with engine.begin() as connection:
+                connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl_type}"))
+                if unique_index:
+                    connection.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS {unique_index} ON {table} ({column})"))
+        except DBAPIError:
+            if not _has_column(engine, table, column):
+                raise
+            continue  # another process added it first
+        added.append(f"{table}.{column}")
+    return added
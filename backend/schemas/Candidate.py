@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import List, Optional
 from pydantic import BaseModel
 
@@ -19,3 +20,27 @@ class CandidateResponse(CandidateBase):
 
     class Config:
         from_attributes = True  # Pydantic v2
+
+class CandidateSummary(BaseModel):
+    """A candidate without the CV text."""
+    id: int
+    name: str
+    skills: List[str] = []
+
+    class Config:
+        from_attributes = True
+
+class BulkUploadFailure(BaseModel):
+    filename: str
+    error: str
+
+class BulkUploadStatus(BaseModel):
+    batch_id: str
+    status: str
+    total: int
+    processed: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    failures: List[BulkUploadFailure] = []
+    created_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
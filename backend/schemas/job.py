@@ -11,6 +11,7 @@ class JobBase(BaseModel):
     description: str
     location: str
     skills: List[str] = Field(default_factory=list)
+    job_url: Optional[str] = None
 
 
 class JobCreate(JobBase):
@@ -23,9 +24,23 @@ class JobUpdate(BaseModel):
     description: Optional[str] = None
     location: Optional[str] = None
     skills: Optional[List[str]] = None
+    job_url: Optional[str] = None
 
 
 class JobResponse(JobBase):
     id: int
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class JobSummary(BaseModel):
+    """A job without its description, for lists that only show the posting header."""
+
+    id: int
+    title: str
+    company: str
+    location: str
+    skills: List[str] = Field(default_factory=list)
+    job_url: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
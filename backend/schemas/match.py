@@ -1,6 +1,6 @@
-from typing import List, Optional
+from typing import List, Literal, Optional, Union
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class MatchResult(BaseModel):
@@ -27,6 +27,35 @@ class CandidateMatchResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class BatchMatchRequest(BaseModel):
+    candidate_ids: Union[List[int], Literal["all"]] = "all"
+    top_k: int = Field(20, ge=1, le=100)
+    min_score: float = Field(0.0, ge=0.0, le=1.0)
+
+
+class CandidateMatchResult(BaseModel):
+    candidate_id: int
+    candidate_name: str
+    score: float
+    skill_score: float
+    keyword_hits: int
+    coverage: float
+    semantic_score: float
+    matched_skills: List[str]
+    missing_skills: List[str]
+    candidate_extra_skills: List[str]
+
+
+class JobMatchResponse(BaseModel):
+    job_id: int
+    job_title: str
+    company: str
+    job_skills: List[str]
+    results: List[CandidateMatchResult]
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class SkillGapItem(BaseModel):
     skill: str
     demand_count: int
@@ -44,3 +73,12 @@ class CandidateSkillGapResponse(BaseModel):
     gaps: List[SkillGapItem]
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class MatchCacheStats(BaseModel):
+    backend: str
+    version: int
+    size: int
+    hits: int
+    misses: int
+    hit_ratio: float
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_NPROBE = int(os.getenv("ANN_NPROBE", "8"))
+# Next to the package by default, so API workers, benchmarks and tests share one index file.
+ANN_INDEX_DIR = os.getenv("ANN_INDEX_DIR", os.path.join(os.path.dirname(__file__), ".ann"))
+KMEANS_ITERATIONS = 12
+KMEANS_SAMPLE_PER_LIST = 64
+# Retrain the coarse quantiser once the corpus has grown this much past the training set.
+RETRAIN_GROWTH = 4.0
+
+
+def default_nlist(count: int) -> int:
+    configured = os.getenv("ANN_NLIST")
+    if configured:
+        return max(1, int(configured))
+    return max(1, int(4 * np.sqrt(max(count, 1))))
+
+
+def _normalise(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0.0] = 1.0
+    return matrix / norms
+
+
+class IVFFlatIndex:
+    """Inverted-file index over unit vectors with exact re-scoring inside probed lists.
+
+    A spherical k-means quantiser splits the vectors into ``nlist`` cells; a
+    query only scans the members of its ``nprobe`` closest cells. Vectors are
+    added and removed incrementally, and only the quantiser is persisted:
+    reloading it and re-assigning the current vectors is one matmul.
+    """
+
+    def __init__(self, nprobe: int = DEFAULT_NPROBE, seed: int = 0) -> None:
+        self.nprobe = nprobe
+        self.seed = seed
+        self.centroids = np.zeros((0, 0), dtype=np.float32)
+        self.trained_size = 0
+        self.generation = -1
+        self._lock = threading.RLock()
+        self._lists: List[Dict[int, np.ndarray]] = []
+        self._where: Dict[int, int] = {}
+        self._packed: List[Optional[Tuple[np.ndarray, np.ndarray]]] = []
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    @property
+    def trained(self) -> bool:
+        return len(self.centroids) > 0
+
+    def needs_retrain(self) -> bool:
+        return not self.trained or len(self._where) > RETRAIN_GROWTH * max(self.trained_size, 1)
+
+    def train(self, vectors: np.ndarray, nlist: Optional[int] = None) -> None:
+        count = len(vectors)
+        if not count:
+            return
+        nlist = min(nlist or default_nlist(count), count)
+        rng = np.random.default_rng(self.seed)
+        sample_size = min(count, nlist * KMEANS_SAMPLE_PER_LIST)
+        sample = vectors[rng.choice(count, size=sample_size, replace=False)]
+        centroids = sample[rng.choice(sample_size, size=nlist, replace=False)].copy()
+
+        for _ in range(KMEANS_ITERATIONS):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            counts = np.bincount(assign, minlength=nlist)
+            empty = np.flatnonzero(counts == 0)
+            if len(empty):
+                sums[empty] = sample[rng.choice(sample_size, size=len(empty), replace=False)]
+            centroids = _normalise(sums).astype(np.float32)
+
+        with self._lock:
+            self.centroids = centroids
+            self.trained_size = count
+            self._reset_lists()
+
+    def reset(self) -> None:
+        """Drop all members but keep the trained quantiser."""
+
+        with self._lock:
+            self._reset_lists()
+
+    def _reset_lists(self) -> None:
+        self._lists = [{} for _ in range(len(self.centroids))]
+        self._packed = [None] * len(self.centroids)
+        self._where = {}
+
+    def add_many(self, ids: Sequence[int], vectors: np.ndarray) -> None:
+        if not len(ids):
+            return
+        cells = np.argmax(vectors @ self.centroids.T, axis=1)
+        with self._lock:
+            for entry_id, cell, vector in zip(ids, cells.tolist(), vectors):
+                self._place(int(entry_id), cell, vector)
+
+    def add(self, entry_id: int, vector: np.ndarray) -> None:
+        if not self.trained:
+            return
+        cell = int(np.argmax(self.centroids @ vector))
+        with self._lock:
+            self._place(entry_id, cell, vector)
+
+    def _place(self, entry_id: int, cell: int, vector: np.ndarray) -> None:
+        self.remove(entry_id)
+        self._lists[cell][entry_id] = np.asarray(vector, dtype=np.float32)
+        self._where[entry_id] = cell
+        self._packed[cell] = None
+
+    def remove(self, entry_id: int) -> None:
+        with self._lock:
+            cell = self._where.pop(entry_id, None)
+            if cell is not None:
+                self._lists[cell].pop(entry_id, None)
+                self._packed[cell] = None
+
+    def _cell(self, cell: int) -> Tuple[np.ndarray, np.ndarray]:
+        packed = self._packed[cell]
+        if packed is None:
+            members = self._lists[cell]
+            ids = np.fromiter(members.keys(), dtype=np.int64, count=len(members))
+            vectors = np.vstack(list(members.values())) if members else np.zeros((0, self.centroids.shape[1]), dtype=np.float32)
+            packed = (ids, vectors)
+            self._packed[cell] = packed
+        return packed
+
+    def search(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ``(ids, cosine)`` of up to ``k`` approximate nearest neighbours, best first."""
+
+        with self._lock:
+            if not self.trained or not self._where or k <= 0:
+                return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+            nprobe = min(self.nprobe, len(self.centroids))
+            closest = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+            cells = [self._cell(int(cell)) for cell in closest]
+
+        ids = np.concatenate([cell_ids for cell_ids, _ in cells])
+        if not len(ids):
+            return ids, np.zeros(0, dtype=np.float32)
+        sims = np.concatenate([vectors @ query for _, vectors in cells])
+        if k < len(ids):
+            top = np.argpartition(-sims, k - 1)[:k]
+            ids, sims = ids[top], sims[top]
+        order = np.argsort(-sims, kind="stable")
+        return ids[order], sims[order]
+
+    def save(self, path: str, model_name: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp.npz"
+        with self._lock:
+            np.savez(tmp_path, centroids=self.centroids, trained_size=self.trained_size, model_name=model_name)
+        os.replace(tmp_path, path)
+
+    def load(self, path: str, model_name: str) -> bool:
+        """Restore a saved quantiser for ``model_name``; members must be re-added."""
+
+        if not os.path.exists(path):
+            return False
+        with np.load(path) as data:
+            if str(data["model_name"]) != model_name:
+                return False
+            with self._lock:
+                self.centroids = data["centroids"].astype(np.float32)
+                self.trained_size = int(data["trained_size"])
+                self._reset_lists()
+        return True
+
+
+def ann_index_path(model_name: str, name: str = "jobs") -> str:
+    safe = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+    return os.path.join(ANN_INDEX_DIR, f"{name}-{safe}.npz")
+
+
+def exact_search(vectors: np.ndarray, ids: np.ndarray, query: np.ndarray, k: int) -> np.ndarray:
+    sims = vectors @ query
+    if k < len(ids):
+        top = np.argpartition(-sims, k - 1)[:k]
+        return ids[top]
+    return ids
+
+
+def recall_at_k(ann: IVFFlatIndex, vectors: np.ndarray, ids: np.ndarray, queries: np.ndarray, k: int) -> float:
+    """Share of the exact top-``k`` neighbours the ANN index also returns, averaged over queries."""
+
+    if not len(queries) or not len(ids):
+        return 1.0
+    hits = 0
+    expected_total = 0
+    for query in queries:
+        expected = set(exact_search(vectors, ids, query, k).tolist())
+        found = set(ann.search(query, k)[0].tolist())
+        hits += len(expected & found)
+        expected_total += len(expected)
+    return hits / expected_total
+
+
+_JOB_ANN = IVFFlatIndex()
+
+
+def get_job_ann() -> IVFFlatIndex:
+    return _JOB_ANN
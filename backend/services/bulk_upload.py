@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import uuid
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+
+from ..models.candidate import Candidate
+from ..models.upload_batch import UploadBatch
+from .cv_cache import file_digest
+from .cv_executor import get_parse_executor
+from .cv_parser import cached_parse, parse_cv_path, remember_parse
+from .matcher import candidates_saved
+
+BULK_UPLOAD_CHUNK = int(os.getenv("BULK_UPLOAD_CHUNK", "100"))
+BULK_UPLOAD_WORKERS = int(os.getenv("BULK_UPLOAD_WORKERS", "1"))
+BULK_UPLOAD_MAX_FILES = int(os.getenv("BULK_UPLOAD_MAX_FILES", "10000"))
+BULK_UPLOAD_MAX_FILE_BYTES = int(os.getenv("BULK_UPLOAD_MAX_FILE_BYTES", str(50 * 1024 * 1024)))
+BULK_UPLOAD_DIR = os.getenv("BULK_UPLOAD_DIR") or None
+BULK_UPLOAD_HEARTBEAT = float(os.getenv("BULK_UPLOAD_HEARTBEAT", "30"))
+# A queued or processing batch whose owner has not reported in for this long is taken to be dead.
+BULK_UPLOAD_STALE_AFTER = float(os.getenv("BULK_UPLOAD_STALE_AFTER", str(4 * BULK_UPLOAD_HEARTBEAT)))
+MAX_FAILURES_KEPT = 1000
+# Identifies this process on the batches it runs; the suffix tells a restarted process with a reused pid apart.
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+INTERRUPTED_ERROR = "Interrupted by a server restart; upload the files again"
+
+
+class BatchEntry(NamedTuple):
+    """One CV of a batch: a spooled file, or a member of a spooled zip archive."""
+
+    filename: str
+    path: str
+    member: Optional[str] = None
+
+
+class SpooledBatch(NamedTuple):
+    directory: str
+    entries: List[BatchEntry]
+
+
+def _is_cv_member(info: zipfile.ZipInfo) -> bool:
+    name = info.filename
+    base = os.path.basename(name)
+    return not info.is_dir() and not name.startswith("__MACOSX/") and bool(base) and not base.startswith(".")
+
+
+def spool_batch(files: Iterable[Tuple[str, BinaryIO]]) -> SpooledBatch:
+    """Copy uploaded files to a private temp dir and list the CVs they contain.
+
+    Zip archives are listed, not extracted; members are unpacked one at a
+    time by the worker. Raises ``ValueError`` for an empty or oversized batch.
+    """
+
+    directory = tempfile.mkdtemp(prefix="cv-batch-", dir=BULK_UPLOAD_DIR)
+    entries: List[BatchEntry] = []
+    try:
+        for position, (filename, stream) in enumerate(files):
+            filename = os.path.basename(filename or f"file-{position}")
+            path = os.path.join(directory, f"{position:06d}-{filename}")
+            with open(path, "wb") as handle:
+                shutil.copyfileobj(stream, handle, 1024 * 1024)
+            if filename.lower().endswith(".zip"):
+                try:
+                    with zipfile.ZipFile(path) as archive:
+                        entries.extend(
+                            BatchEntry(os.path.basename(info.filename), path, info.filename)
+                            for info in archive.infolist()
+                            if _is_cv_member(info)
+                        )
+                except zipfile.BadZipFile:
+                    raise ValueError(f"{filename} is not a valid zip archive")
+            else:
+                entries.append(BatchEntry(filename, path))
+            if len(entries) > BULK_UPLOAD_MAX_FILES:
+                raise ValueError(f"A batch may contain at most {BULK_UPLOAD_MAX_FILES} CVs")
+        if not entries:
+            raise ValueError("The batch does not contain any files")
+    except Exception:
+        shutil.rmtree(directory, ignore_errors=True)
+        raise
+    return SpooledBatch(directory, entries)
+
+
+def _materialise(entry: BatchEntry, directory: str, archives: Dict[str, zipfile.ZipFile]) -> str:
+    """Return a path holding the entry's bytes, unpacking zip members on demand."""
+
+    if entry.member is None:
+        size = os.path.getsize(entry.path)
+    else:
+        archive = archives.get(entry.path)
+        if archive is None:
+            archive = archives[entry.path] = zipfile.ZipFile(entry.path)
+        size = archive.getinfo(entry.member).file_size
+    if size > BULK_UPLOAD_MAX_FILE_BYTES:
+        raise ValueError(f"File is larger than {BULK_UPLOAD_MAX_FILE_BYTES} bytes")
+    if entry.member is None:
+        return entry.path
+
+    target = os.path.join(directory, f"member-{uuid.uuid4().hex}")
+    with archive.open(entry.member) as source, open(target, "wb") as handle:
+        shutil.copyfileobj(source, handle, 1024 * 1024)
+    return target
+
+
+def _submit_parse(entry_path: str, filename: str) -> Future:
+    """Queue one parse on the shared pool, waiting for a slot rather than failing the batch."""
+
+    return get_parse_executor().submit(parse_cv_path, entry_path, filename, wait=True)
+
+
+def _parse_chunk(entries: List[BatchEntry], directory: str, archives: Dict[str, zipfile.ZipFile]) -> Tuple[List[Tuple[str, Tuple]], List[Dict[str, str]]]:
+    parsed: List[Tuple[str, Tuple]] = []
+    failures: List[Dict[str, str]] = []
+    executor = get_parse_executor()
+    # Keep at most one job per worker in flight so interactive uploads still find queue slots.
+    window = executor.max_workers
+    pending: List[Tuple[BatchEntry, str, str, Future]] = []
+
+    def drain(limit: int) -> None:
+        while len(pending) > limit:
+            entry, path, digest, future = pending.pop(0)
+            try:
+                result = future.result(timeout=executor.timeout)
+                remember_parse(entry.filename, digest, result)
+                parsed.append((entry.filename, result))
+            except FutureTimeoutError:
+                executor.abandon(future)
+                failures.append({"filename": entry.filename, "error": f"Parsing took longer than {executor.timeout:g}s"})
+            except Exception as exc:
+                failures.append({"filename": entry.filename, "error": str(exc) or exc.__class__.__name__})
+            finally:
+                if path != entry.path:
+                    os.remove(path)
+
+    for entry in entries:
+        try:
+            path = _materialise(entry, directory, archives)
+            digest = file_digest(path)
+        except (ValueError, KeyError, OSError, zipfile.BadZipFile) as exc:
+            failures.append({"filename": entry.filename, "error": str(exc)})
+            continue
+        cached = cached_parse(entry.filename, digest)
+        if cached is not None:
+            parsed.append((entry.filename, cached))
+            if path != entry.path:
+                os.remove(path)
+            continue
+        pending.append((entry, path, digest, _submit_parse(path, entry.filename)))
+        drain(window - 1)
+    drain(0)
+    return parsed, failures
+
+
+def process_batch(session_factory: Callable[[], Session], batch_id: str, spooled: SpooledBatch, chunk_size: int = BULK_UPLOAD_CHUNK) -> None:
+    """Parse, insert and embed every CV of a spooled batch, one transaction per chunk."""
+
+    archives: Dict[str, zipfile.ZipFile] = {}
+    try:
+        with session_factory() as db:
+            batch = db.get(UploadBatch, batch_id)
+            batch.status = "processing"
+            batch.heartbeat_at = datetime.now(timezone.utc)
+            db.commit()
+
+            for start in range(0, len(spooled.entries), chunk_size):
+                chunk = spooled.entries[start:start + chunk_size]
+                parsed, failures = _parse_chunk(chunk, spooled.directory, archives)
+
+                candidates = [
+                    Candidate(name=name_guess or "Unknown", cv_text=cv_text, skills=skills)
+                    for _, (name_guess, cv_text, skills) in parsed
+                ]
+                db.add_all(candidates)
+                batch.processed += len(chunk)
+                batch.succeeded += len(candidates)
+                batch.failed += len(failures)
+                if failures and len(batch.failures) < MAX_FAILURES_KEPT:
+                    batch.failures = (batch.failures + failures)[:MAX_FAILURES_KEPT]
+                batch.heartbeat_at = datetime.now(timezone.utc)
+                db.commit()
+                candidates_saved(db, candidates)
+                db.expunge_all()
+                batch = db.get(UploadBatch, batch_id)
+
+            batch.status = "completed"
+            batch.finished_at = datetime.now(timezone.utc)
+            db.commit()
+    except Exception as exc:
+        with session_factory() as db:
+            batch = db.get(UploadBatch, batch_id)
+            if batch is not None:
+                batch.status = "failed"
+                batch.failures = (batch.failures or []) + [{"filename": "", "error": str(exc) or exc.__class__.__name__}]
+                batch.finished_at = datetime.now(timezone.utc)
+                db.commit()
+        raise
+    finally:
+        for archive in archives.values():
+            archive.close()
+        shutil.rmtree(spooled.directory, ignore_errors=True)
+
+
+_RUNNER: Optional[ThreadPoolExecutor] = None
+_RUNNER_LOCK = threading.Lock()
+_RUNNING: Dict[str, Future] = {}
+
+
+def _runner() -> ThreadPoolExecutor:
+    global _RUNNER
+    with _RUNNER_LOCK:
+        if _RUNNER is None:
+            _RUNNER = ThreadPoolExecutor(max_workers=max(1, BULK_UPLOAD_WORKERS), thread_name_prefix="cv-bulk")
+        return _RUNNER
+
+
+def start_batch(db: Session, session_factory: Callable[[], Session], spooled: SpooledBatch) -> UploadBatch:
+    """Record a new batch and hand it to the background workers."""
+
+    batch = UploadBatch(
+        id=uuid.uuid4().hex, status="queued", total=len(spooled.entries), failures=[],
+        owner=WORKER_ID, heartbeat_at=datetime.now(timezone.utc),
+    )
+    db.add(batch)
+    db.commit()
+    db.refresh(batch)
+
+    batch_id = batch.id
+    future = _runner().submit(process_batch, session_factory, batch_id, spooled)
+    _RUNNING[batch_id] = future
+    future.add_done_callback(lambda _: _RUNNING.pop(batch_id, None))
+    return batch
+
+
+def touch_running_batches(db: Session) -> None:
+    """Refresh the heartbeat of every batch this process is running or has queued."""
+
+    if not _RUNNING:
+        return
+    db.execute(
+        update(UploadBatch)
+        .where(UploadBatch.id.in_(list(_RUNNING)), UploadBatch.owner == WORKER_ID)
+        .values(heartbeat_at=datetime.now(timezone.utc))
+    )
+    db.commit()
+
+
+def recover_interrupted_batches(db: Session, stale_after: float = BULK_UPLOAD_STALE_AFTER) -> int:
+    """Fail ``queued`` or ``processing`` batches whose owner stopped sending heartbeats.
+
+    Their spooled files and worker threads died with that process, so nothing
+    would ever move them on. Batches of live processes, this one or another
+    worker, keep a fresh heartbeat and are left alone. Returns how many were marked.
+    """
+
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=stale_after)
+    batches = [
+        batch
+        for batch in db.query(UploadBatch).filter(
+            UploadBatch.status.in_(("queued", "processing")),
+            or_(UploadBatch.heartbeat_at.is_(None), UploadBatch.heartbeat_at < cutoff),
+        )
+        if batch.id not in _RUNNING
+    ]
+    finished_at = datetime.now(timezone.utc)
+    for batch in batches:
+        batch.status = "failed"
+        batch.failures = (batch.failures or []) + [{"filename": "", "error": INTERRUPTED_ERROR}]
+        batch.failed = batch.total - batch.succeeded
+        batch.finished_at = finished_at
+    db.commit()
+    return len(batches)
+
+
+class BatchSupervisor:
+    """Background thread that sends this process's heartbeats and fails batches of dead ones."""
+
+    def __init__(self, session_factory: Callable[[], Session], interval: float = BULK_UPLOAD_HEARTBEAT) -> None:
+        self.session_factory = session_factory
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> int:
+        with self.session_factory() as db:
+            touch_running_batches(db)
+            return recover_interrupted_batches(db)
+
+    def _loop(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception:  # pragma: no cover - database briefly unavailable, retry next beat
+                pass
+
+    def start(self) -> "BatchSupervisor":
+        self._thread = threading.Thread(target=self._loop, name="cv-bulk-heartbeat", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def wait_for_batch(batch_id: str, timeout: Optional[float] = None) -> None:
+    """Block until a batch started by this process finishes (used by scripts and tests)."""
+
+    future = _RUNNING.get(batch_id)
+    if future is not None:
+        future.result(timeout=timeout)
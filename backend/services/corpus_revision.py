@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models.corpus_revision import CorpusRevision
+
+JOBS = "jobs"
+CANDIDATES = "candidates"
+
+
+def current_revision(db: Session, corpus: str) -> int:
+    return db.scalar(select(CorpusRevision.revision).where(CorpusRevision.name == corpus)) or 0
+
+
+def bump_revision(db: Session, corpus: str) -> int:
+    """Advance ``corpus`` by one and commit; returns the new revision.
+
+    Every process that serves matches compares this row with the revision its
+    in-memory state was built from, so a write made by another worker or a
+    script is noticed even when it leaves the row count and max id unchanged.
+    """
+
+    bumped = db.execute(
+        update(CorpusRevision)
+        .where(CorpusRevision.name == corpus)
+        .values(revision=CorpusRevision.revision + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if bumped.rowcount == 0:
+        try:
+            db.add(CorpusRevision(name=corpus, revision=1))
+            db.flush()
+        except IntegrityError:  # another process created the row first
+            db.rollback()
+            return bump_revision(db, corpus)
+    revision = current_revision(db, corpus)
+    db.commit()
+    return revision
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import csv
+import json
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Sequence
+
+DEFAULT_BATCH_SIZE = 500
+
+
+class RowSink(ABC):
+    """Writes crawl rows to a file in batches of ``batch_size``.
+
+    Rows are buffered until a batch is full, then written and flushed to
+    disk, so memory stays bounded by one batch and a crash loses at most
+    the rows of the current batch. Use as a context manager or call
+    ``close`` to write the last partial batch.
+    """
+
+    def __init__(self, path: str, columns: Sequence[str], batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+        self.path = path
+        self.columns = list(columns)
+        self.batch_size = max(1, batch_size)
+        self.rows_written = 0
+        self._buffer: List[Dict] = []
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def write(self, row: Dict) -> None:
+        self._buffer.append({column: row.get(column) for column in self.columns})
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def write_all(self, rows: Iterable[Dict]) -> None:
+        for row in rows:
+            self.write(row)
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._write_batch(self._buffer)
+            self.rows_written += len(self._buffer)
+            self._buffer = []
+
+    def close(self) -> None:
+        self.flush()
+
+    @abstractmethod
+    def _write_batch(self, rows: List[Dict]) -> None:
+        ...
+
+    def __enter__(self) -> "RowSink":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class JsonlSink(RowSink):
+    def __init__(self, path: str, columns: Sequence[str], batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+        super().__init__(path, columns, batch_size)
+        self._handle = open(path, "w", encoding="utf-8")
+
+    def _write_batch(self, rows: List[Dict]) -> None:
+        self._handle.writelines(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+        self._handle.flush()
+
+    def close(self) -> None:
+        super().close()
+        self._handle.close()
+
+
+class CsvSink(RowSink):
+    def __init__(self, path: str, columns: Sequence[str], batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+        super().__init__(path, columns, batch_size)
+        # utf-8-sig như file CSV cũ để Excel đọc đúng tiếng Việt
+        self._handle = open(path, "w", encoding="utf-8-sig", newline="")
+        self._writer = csv.DictWriter(self._handle, fieldnames=self.columns)
+        self._writer.writeheader()
+
+    def _write_batch(self, rows: List[Dict]) -> None:
+        self._writer.writerows(rows)
+        self._handle.flush()
+
+    def close(self) -> None:
+        super().close()
+        self._handle.close()
+
+
+class ParquetSink(RowSink):
+    """One Parquet row group per batch; every column is a nullable string. Requires ``pyarrow``."""
+
+    def __init__(self, path: str, columns: Sequence[str], batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        super().__init__(path, columns, batch_size)
+        self._pa = pa
+        self._schema = pa.schema([(column, pa.string()) for column in self.columns])
+        self._writer = pq.ParquetWriter(path, self._schema)
+
+    def _write_batch(self, rows: List[Dict]) -> None:
+        self._writer.write_table(self._pa.Table.from_pylist(rows, schema=self._schema))
+
+    def close(self) -> None:
+        super().close()
+        self._writer.close()
+
+
+SINKS = {".jsonl": JsonlSink, ".csv": CsvSink, ".parquet": ParquetSink}
+
+
+def open_sink(path: str, columns: Sequence[str], batch_size: int = DEFAULT_BATCH_SIZE) -> RowSink:
+    """Pick the sink from the file extension (.jsonl, .csv or .parquet)."""
+
+    extension = os.path.splitext(path)[1].lower()
+    sink = SINKS.get(extension)
+    if sink is None:
+        raise ValueError(f"Unsupported output format {extension!r}; use one of {', '.join(sorted(SINKS))}")
+    return sink(path, columns, batch_size)
+
+
+def export_excel(source: str, target: Optional[str] = None) -> str:
+    """Convert a finished JSONL/CSV/Parquet crawl output to .xlsx (loads the whole file)."""
+
+    import pandas as pd
+
+    extension = os.path.splitext(source)[1].lower()
+    if extension == ".jsonl":
+        df = pd.read_json(source, lines=True, dtype=False)
+    elif extension == ".csv":
+        df = pd.read_csv(source, encoding="utf-8-sig", dtype=str)
+    elif extension == ".parquet":
+        df = pd.read_parquet(source)
+    else:
+        raise ValueError(f"Unsupported output format {extension!r}")
+    target = target or os.path.splitext(source)[0] + ".xlsx"
+    df.to_excel(target, index=False)
+    return target
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterator, NamedTuple, Optional
+
+# Search-result fields that identify one revision of a posting without opening it.
+LISTING_FIELDS = ("title", "company", "company_url", "salary_list", "address_list", "exp_list")
+
+# Stored rows read back per query when a resumed run replays its output.
+RUN_ROWS_PAGE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS crawl_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    query TEXT NOT NULL,
+    status TEXT NOT NULL,
+    last_page INTEGER,
+    started_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS crawl_jobs (
+    path TEXT PRIMARY KEY,
+    job_url TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    run_id INTEGER NOT NULL,
+    run_pos INTEGER NOT NULL,
+    row TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_crawl_jobs_run ON crawl_jobs (run_id, run_pos);
+"""
+
+
+def listing_fingerprint(job: Dict) -> str:
+    payload = json.dumps([job.get(field) for field in LISTING_FIELDS], ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class JobRecord(NamedTuple):
+    fingerprint: str
+    run_id: int
+    row: Dict
+
+
+class CrawlRun:
+    """One crawl of a query; ``next_page`` is where a resumed run picks up."""
+
+    def __init__(self, run_id: int, next_page: int, next_pos: int = 0, resumed: bool = False) -> None:
+        self.id = run_id
+        self.next_page = next_page
+        self.resumed = resumed
+        self._next_pos = next_pos
+
+    def next_position(self) -> int:
+        pos = self._next_pos
+        self._next_pos += 1
+        return pos
+
+
+class CrawlState:
+    """SQLite checkpoint of a crawl: runs, visited job paths and their last scraped rows.
+
+    Every job is committed as soon as it is scraped and every finished search
+    page advances the run, so a crashed crawl restarts at the page it died on
+    without refetching jobs it already stored. ``reuse`` lets an incremental
+    crawl keep the stored row of a posting whose listing is unchanged.
+    """
+
+    def __init__(self, path: str, clock=time.time) -> None:
+        self.path = path
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def start_run(self, query: str, start_page: int = 1, resume: bool = True) -> CrawlRun:
+        with self._lock:
+            if resume:
+                found = self._conn.execute(
+                    "SELECT id, last_page FROM crawl_runs WHERE query = ? AND status = 'running' ORDER BY id DESC LIMIT 1",
+                    (query,),
+                ).fetchone()
+                if found is not None:
+                    run_id, last_page = found
+                    next_pos = self._conn.execute(
+                        "SELECT COALESCE(MAX(run_pos) + 1, 0) FROM crawl_jobs WHERE run_id = ?", (run_id,)
+                    ).fetchone()[0]
+                    next_page = start_page if last_page is None else max(start_page, last_page + 1)
+                    return CrawlRun(run_id, next_page, next_pos, resumed=True)
+            cursor = self._conn.execute(
+                "INSERT INTO crawl_runs (query, status, started_at) VALUES (?, 'running', ?)", (query, self._clock())
+            )
+            self._conn.commit()
+            return CrawlRun(cursor.lastrowid, start_page)
+
+    def page_done(self, run: CrawlRun, page: int) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE crawl_runs SET last_page = ? WHERE id = ?", (page, run.id))
+            self._conn.commit()
+
+    def finish_run(self, run: CrawlRun) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE crawl_runs SET status = 'finished', finished_at = ? WHERE id = ?", (self._clock(), run.id)
+            )
+            self._conn.commit()
+
+    def lookup(self, path: str) -> Optional[JobRecord]:
+        with self._lock:
+            found = self._conn.execute(
+                "SELECT fingerprint, run_id, row FROM crawl_jobs WHERE path = ?", (path,)
+            ).fetchone()
+        if found is None:
+            return None
+        return JobRecord(found[0], found[1], json.loads(found[2]))
+
+    def record(self, run: CrawlRun, path: str, fingerprint: str, row: Dict, position: int) -> None:
+        now = self._clock()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO crawl_jobs (path, job_url, fingerprint, first_seen, last_seen, run_id, run_pos, row)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(path) DO UPDATE SET
+                    job_url = excluded.job_url, fingerprint = excluded.fingerprint, last_seen = excluded.last_seen,
+                    run_id = excluded.run_id, run_pos = excluded.run_pos, row = excluded.row
+                """,
+                (path, row.get("job_url") or "", fingerprint, now, now, run.id, position, json.dumps(row, ensure_ascii=False)),
+            )
+            self._conn.commit()
+
+    def reuse(self, run: CrawlRun, path: str, job: Dict, known: JobRecord, position: int) -> Dict:
+        """Carry an unchanged posting into this run without fetching its pages again."""
+
+        row = {**known.row, **job}
+        self.record(run, path, known.fingerprint, row, position)
+        return row
+
+    def run_rows(self, run: CrawlRun) -> Iterator[Dict]:
+        """Rows already stored by ``run`` (before a crash), in crawl order."""
+
+        position = -1
+        while True:
+            with self._lock:
+                found = self._conn.execute(
+                    "SELECT run_pos, row FROM crawl_jobs WHERE run_id = ? AND run_pos > ? ORDER BY run_pos LIMIT ?",
+                    (run.id, position, RUN_ROWS_PAGE),
+                ).fetchall()
+            if not found:
+                return
+            for position, row in found:
+                yield json.loads(row)
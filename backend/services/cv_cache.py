@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional
+
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+READ_CHUNK = 1024 * 1024
+# Rough per-entry overhead of the tuple, list and key, so tiny CVs still count.
+ENTRY_OVERHEAD = 256
+
+
+class CachedCv(NamedTuple):
+    name: Optional[str]
+    text: str
+    skills: List[str]
+    taxonomy_version: str
+
+    def size(self) -> int:
+        return ENTRY_OVERHEAD + len(self.text) + len(self.name or "") + sum(len(skill) for skill in self.skills)
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(READ_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ParsedCvCache:
+    """Parsed CVs keyed by ``<extractor version>:<sha256 of the raw file>``.
+
+    The LRU is bounded by the approximate size of the cached text rather than
+    by entry count, since one CV can be a hundred times larger than another.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, CachedCv]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[CachedCv]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, entry: CachedCv) -> None:
+        size = entry.size()
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size()
+            self._entries[key] = entry
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
+
+
+_CACHE: Optional[ParsedCvCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_parsed_cv_cache() -> ParsedCvCache:
+    global _CACHE
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = ParsedCvCache(int(os.getenv("PARSED_CV_CACHE_BYTES", DEFAULT_CACHE_BYTES)))
+    return _CACHE
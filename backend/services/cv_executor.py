@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import weakref
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional, TypeVar
+
+from .skill_taxonomy import get_skill_taxonomy
+
+T = TypeVar("T")
+
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+DEFAULT_TIMEOUT_SECONDS = 60.0
+
+
+class ParserBusyError(RuntimeError):
+    """Every worker is busy and the wait queue is full."""
+
+
+class ParserCrashedError(ParserBusyError):
+    """A worker died mid-parse; the pool has been rebuilt, so a retry can succeed."""
+
+
+class ParseTimeoutError(RuntimeError):
+    """A parse job ran past the per-job timeout."""
+
+
+def _warm_worker() -> None:
+    get_skill_taxonomy()
+
+
+class ParseExecutor:
+    """Bounded process pool for CPU-heavy CV parsing.
+
+    At most ``max_workers + max_queued`` jobs are admitted; further calls fail
+    fast with :class:`ParserBusyError` instead of queueing without limit, or
+    with ``wait=True`` block until a slot frees up (background batches). A
+    slot is released when its job really finishes, so a job that outlived its
+    timeout keeps counting against the pool until its worker is free again.
+    A timed-out job or a dead worker therefore recycles the whole pool: its
+    workers are terminated, their jobs fail and free their slots, and the
+    next job starts a fresh pool.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_WORKERS, max_queued: Optional[int] = None, timeout: float = DEFAULT_TIMEOUT_SECONDS) -> None:
+        self.max_workers = max(1, max_workers)
+        self.max_queued = self.max_workers if max_queued is None else max(0, max_queued)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._slot_freed = threading.Condition(self._lock)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._owners: "weakref.WeakKeyDictionary[Future, ProcessPoolExecutor]" = weakref.WeakKeyDictionary()
+        self._in_flight = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queued
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _ensure_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker,
+            )
+        return self._pool
+
+    def _release(self, _: Future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._slot_freed.notify()
+
+    def submit(self, func: Callable[..., T], *args: Any, wait: bool = False) -> "Future[T]":
+        with self._lock:
+            while self._in_flight >= self.capacity:
+                if not wait:
+                    raise ParserBusyError("CV parser is busy, please retry shortly")
+                self._slot_freed.wait()
+            pool = self._ensure_pool()
+            try:
+                future = pool.submit(func, *args)
+            except BrokenProcessPool:
+                # a worker died since the last job; start over with a fresh pool
+                self._pool = None
+                pool = self._ensure_pool()
+                future = pool.submit(func, *args)
+            self._owners[future] = pool
+            self._in_flight += 1
+        future.add_done_callback(self._release)
+        return future
+
+    def abandon(self, future: Future) -> None:
+        """Give up on a job that overran its timeout, recycling the pool it still occupies."""
+
+        if not future.cancel() and not future.done():
+            self._recycle(self._owners.get(future))
+
+    def _recycle(self, pool: Optional[ProcessPoolExecutor]) -> None:
+        with self._lock:
+            if pool is None or self._pool is not pool:
+                return  # already replaced by another caller
+            self._pool = None
+        _terminate(pool)
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        future = self.submit(func, *args)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError as exc:
+            self.abandon(future)
+            raise ParseTimeoutError(f"CV parsing took longer than {self.timeout:g}s") from exc
+        except BrokenProcessPool as exc:
+            self._recycle(self._owners.get(future))
+            raise ParserCrashedError("CV parser worker crashed, please retry shortly") from exc
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _terminate(pool: ProcessPoolExecutor) -> None:
+    """Kill the pool's workers; their pending jobs fail with ``BrokenProcessPool``."""
+
+    terminate = getattr(pool, "terminate_workers", None)  # Python 3.14+
+    if terminate is not None:
+        terminate()
+        return
+    for process in list((pool._processes or {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+_EXECUTOR: Optional[ParseExecutor] = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def get_parse_executor() -> ParseExecutor:
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        with _EXECUTOR_LOCK:
+            if _EXECUTOR is None:
+                workers = int(os.getenv("CV_PARSE_WORKERS", DEFAULT_WORKERS))
+                queued = os.getenv("CV_PARSE_QUEUE")
+                _EXECUTOR = ParseExecutor(
+                    max_workers=workers,
+                    max_queued=int(queued) if queued else None,
+                    timeout=float(os.getenv("CV_PARSE_TIMEOUT", DEFAULT_TIMEOUT_SECONDS)),
+                )
+    return _EXECUTOR
@@ -1,53 +1,81 @@
 from __future__ import annotations
 
+import hashlib
 import io
-import re
-from typing import List, Optional, Tuple
+import os
+import tempfile
+from typing import Any, BinaryIO, Iterable, Iterator, List, Optional, Tuple, Union
 
 import pdfplumber
 from docx import Document
 from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
 
-SKILL_KEYWORDS = {
-    "python",
-    "java",
-    "javascript",
-    "typescript",
-    "react",
-    "node",
-    "sql",
-    "postgresql",
-    "mysql",
-    "fastapi",
-    "django",
-    "flask",
-    "docker",
-    "kubernetes",
-    "aws",
-    "gcp",
-    "azure",
-    "terraform",
-    "kafka",
-    "spark",
-    "pandas",
-    "numpy",
-}
-
-
-def _extract_pdf_text(content: bytes) -> str:
-    with pdfplumber.open(io.BytesIO(content)) as pdf:
-        pages = [page.extract_text() or "" for page in pdf.pages]
-    return "\n".join(pages)
-
-
-def _extract_docx_text(content: bytes) -> str:
-    document = Document(io.BytesIO(content))
-    return "\n".join(paragraph.text for paragraph in document.paragraphs)
+from .cv_cache import CachedCv, get_parsed_cv_cache
+from .cv_executor import get_parse_executor
+from .skill_taxonomy import get_skill_taxonomy
+
+# Uploads up to this size are handed to the parser as bytes; larger ones are spooled to disk.
+CV_SPOOL_THRESHOLD = int(os.getenv("CV_SPOOL_THRESHOLD", str(1024 * 1024)))
+CV_MAX_PAGES = int(os.getenv("CV_MAX_PAGES", "30"))
+CV_MAX_CHARS = int(os.getenv("CV_MAX_CHARS", "200000"))
+COPY_CHUNK = 1024 * 1024
+# Bump whenever text extraction changes so cached parses of the old extractor are ignored.
+EXTRACTOR_VERSION = 2
+
+# Raw upload bytes, or the path of a spooled upload.
+CvSource = Union[bytes, str]
+
+
+def _open_source(source: CvSource) -> Union[BinaryIO, str]:
+    return io.BytesIO(source) if isinstance(source, bytes) else source
+
+
+def iter_pdf_pages(source: CvSource, max_pages: int = CV_MAX_PAGES) -> Iterator[str]:
+    """Yield the text of the first ``max_pages`` pages, releasing each page's layout once read."""
+
+    with pdfplumber.open(_open_source(source), pages=range(1, max_pages + 1)) as pdf:
+        for page in pdf.pages:
+            try:
+                yield page.extract_text() or ""
+            finally:
+                page.close()
+
+
+def iter_docx_paragraphs(source: CvSource) -> Iterator[str]:
+    document = Document(_open_source(source))
+    for paragraph in document.paragraphs:
+        yield paragraph.text
+
+
+def _take_text(chunks: Iterable[str], max_chars: int = CV_MAX_CHARS) -> str:
+    """Join ``chunks`` with newlines, stopping (and not reading further) past ``max_chars``."""
+
+    parts: List[str] = []
+    remaining = max_chars
+    for chunk in chunks:
+        if len(chunk) >= remaining:
+            parts.append(chunk[:remaining])
+            break
+        parts.append(chunk)
+        remaining -= len(chunk) + 1
+    if hasattr(chunks, "close"):
+        chunks.close()
+    return "\n".join(parts)
+
+
+def _extract_pdf_text(source: CvSource) -> str:
+    return _take_text(iter_pdf_pages(source))
+
+
+def _extract_docx_text(source: CvSource) -> str:
+    return _take_text(iter_docx_paragraphs(source))
 
 
 def extract_skills(raw_text: str) -> List[str]:
-    tokens = set(re.findall(r"[a-zA-Z\+\#\.]{2,}", raw_text.lower()))
-    return sorted(skill for skill in SKILL_KEYWORDS if skill in tokens)
+    """Canonical taxonomy skills mentioned in ``raw_text``; aliases such as "k8s" fold into "kubernetes"."""
+
+    return get_skill_taxonomy().extract(raw_text)
 
 
 def _guess_name(text: str) -> Optional[str]:
@@ -61,18 +89,103 @@ def _guess_name(text: str) -> Optional[str]:
     return None
 
 
-async def parse_cv(file: UploadFile) -> Tuple[Optional[str], str, List[str]]:
-    content = await file.read()
-    filename = (file.filename or "").lower()
+def _check_supported(filename: str) -> str:
+    filename = (filename or "").lower()
+    if not filename.endswith((".pdf", ".docx", ".doc")):
+        raise ValueError("Unsupported file type. Please upload PDF or DOCX files.")
+    return filename
+
+
+def parse_cv_bytes(filename: str, content: CvSource) -> Tuple[Optional[str], str, List[str]]:
+    """Synchronous parse of an uploaded CV; CPU bound, so it runs in the parse executor.
 
+    ``content`` is the raw upload or the path it was spooled to. Extraction
+    stops after ``CV_MAX_PAGES`` pages or ``CV_MAX_CHARS`` characters.
+    """
+
+    filename = _check_supported(filename)
     if filename.endswith(".pdf"):
         text = _extract_pdf_text(content)
-    elif filename.endswith(".docx") or filename.endswith(".doc"):
-        text = _extract_docx_text(content)
     else:
-        raise ValueError("Unsupported file type. Please upload PDF or DOCX files.")
+        text = _extract_docx_text(content)
 
     text = text or ""
     skills = extract_skills(text)
     name_guess = _guess_name(text)
     return name_guess, text, skills
+
+
+def parse_cv_path(path: str, filename: str) -> Tuple[Optional[str], str, List[str]]:
+    """Variant of :func:`parse_cv_bytes` for a spooled file, so only the path crosses the process boundary."""
+
+    return parse_cv_bytes(filename, path)
+
+
+def extractor_version() -> str:
+    """Tag of everything that shapes the extracted text; part of every parsed-CV cache key."""
+
+    return f"{EXTRACTOR_VERSION}.p{CV_MAX_PAGES}.c{CV_MAX_CHARS}"
+
+
+def _cache_key(filename: str, digest: str) -> str:
+    return f"{extractor_version()}:{os.path.splitext(filename.lower())[1]}:{digest}"
+
+
+def cached_parse(filename: str, digest: str) -> Optional[Tuple[Optional[str], str, List[str]]]:
+    """Return a previous parse of the same file, re-deriving skills if the taxonomy changed since."""
+
+    cache = get_parsed_cv_cache()
+    key = _cache_key(filename, digest)
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    taxonomy = get_skill_taxonomy()
+    if entry.taxonomy_version != taxonomy.version:
+        entry = entry._replace(skills=taxonomy.extract(entry.text), taxonomy_version=taxonomy.version)
+        cache.put(key, entry)
+    return entry.name, entry.text, list(entry.skills)
+
+
+def remember_parse(filename: str, digest: str, parsed: Tuple[Optional[str], str, List[str]]) -> None:
+    name_guess, text, skills = parsed
+    entry = CachedCv(name_guess, text, list(skills), get_skill_taxonomy().version)
+    get_parsed_cv_cache().put(_cache_key(filename, digest), entry)
+
+
+def spool_upload(stream: BinaryIO, suffix: str = "", threshold: int = CV_SPOOL_THRESHOLD, digest: Any = None) -> CvSource:
+    """Read a small upload into memory, or copy a large one to a temp file in fixed-size chunks.
+
+    Returns the bytes or the temp file path; the caller removes the file.
+    ``digest`` (a ``hashlib`` object) is fed every byte on the way.
+    """
+
+    head = stream.read(threshold + 1)
+    if digest is not None:
+        digest.update(head)
+    if len(head) <= threshold:
+        return head
+    handle = tempfile.NamedTemporaryFile(prefix="cv-upload-", suffix=suffix, delete=False)
+    with handle:
+        handle.write(head)
+        del head
+        while chunk := stream.read(COPY_CHUNK):
+            if digest is not None:
+                digest.update(chunk)
+            handle.write(chunk)
+    return handle.name
+
+
+async def parse_cv(file: UploadFile) -> Tuple[Optional[str], str, List[str]]:
+    _check_supported(file.filename)
+    digest = hashlib.sha256()
+    source = await run_in_threadpool(spool_upload, file.file, os.path.splitext(file.filename)[1], CV_SPOOL_THRESHOLD, digest)
+    try:
+        cached = cached_parse(file.filename, digest.hexdigest())
+        if cached is not None:
+            return cached
+        parsed = await get_parse_executor().run(parse_cv_bytes, file.filename, source)
+        remember_parse(file.filename, digest.hexdigest(), parsed)
+        return parsed
+    finally:
+        if isinstance(source, str):
+            os.remove(source)
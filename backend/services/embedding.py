@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+from functools import lru_cache
+from typing import Protocol, Sequence
+
+import numpy as np
+
+DEFAULT_SENTENCE_MODEL = "all-MiniLM-L6-v2"
+HASHING_DIM = 384
+
+_TOKEN_RE = re.compile(r"[\w\+\#\.]+", re.UNICODE)
+
+
+class EmbeddingService(Protocol):
+    model_name: str
+    dim: int
+
+    def embed(self, text: str) -> np.ndarray: ...
+
+    def embed_many(self, texts: Sequence[str]) -> np.ndarray: ...
+
+    def similarity(self, a: str, b: str) -> float: ...
+
+
+def _l2_normalise(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0.0] = 1.0
+    return matrix / norms
+
+
+def cosine_to_score(values: np.ndarray) -> np.ndarray:
+    """Clip cosine similarities of unit vectors into the [0, 1] score range."""
+
+    return np.clip(values, 0.0, 1.0)
+
+
+class HashingEmbeddingService:
+    """Signed feature-hashing bag of words; cheap and dependency free."""
+
+    def __init__(self, dim: int = HASHING_DIM) -> None:
+        self.dim = dim
+        self.model_name = f"hashing-{dim}"
+
+    def _bucket(self, token: str) -> tuple[int, float]:
+        digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        sign = 1.0 if value & 1 else -1.0
+        return (value >> 1) % self.dim, sign
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in _TOKEN_RE.findall((text or "").lower()):
+            index, sign = self._bucket(token)
+            vector[index] += sign
+        return _l2_normalise(vector)
+
+    def embed_many(self, texts: Sequence[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.vstack([self.embed(text) for text in texts])
+
+    def similarity(self, a: str, b: str) -> float:
+        return float(cosine_to_score(np.dot(self.embed(a), self.embed(b))))
+
+
+class SentenceTransformerEmbeddingService:
+    def __init__(self, model_name: str = DEFAULT_SENTENCE_MODEL) -> None:
+        from sentence_transformers import SentenceTransformer
+
+        self.model_name = model_name
+        self._model = SentenceTransformer(model_name)
+        self.dim = int(self._model.get_sentence_embedding_dimension())
+
+    def embed(self, text: str) -> np.ndarray:
+        return self.embed_many([text])[0]
+
+    def embed_many(self, texts: Sequence[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        vectors = self._model.encode(list(texts), normalize_embeddings=True, convert_to_numpy=True)
+        return np.asarray(vectors, dtype=np.float32)
+
+    def similarity(self, a: str, b: str) -> float:
+        vectors = self.embed_many([a, b])
+        return float(cosine_to_score(np.dot(vectors[0], vectors[1])))
+
+
+@lru_cache(maxsize=1)
+def get_embedding_service() -> EmbeddingService:
+    backend = os.getenv("EMBEDDING_BACKEND", "").strip().lower()
+    if backend in {"sentence-transformer", "sentence-transformers"}:
+        return SentenceTransformerEmbeddingService(os.getenv("EMBEDDING_MODEL", DEFAULT_SENTENCE_MODEL))
+    return HashingEmbeddingService()
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import delete, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from ..models.embedding import EmbeddingRecord
+from .embedding import EmbeddingService, get_embedding_service
+
+DEFAULT_MEMORY_ENTRIES = 50_000
+LOOKUP_CHUNK = 500
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    """Content-addressed embedding cache: process memory in front of the ``embeddings`` table.
+
+    Entries are keyed by ``(model_name, sha256(text))`` so a restart reuses the
+    table, and switching ``EMBEDDING_BACKEND`` back and forth keeps each model's
+    vectors side by side instead of overwriting them. The memory tier is an
+    LRU shared by request threads. New vectors are written through a session
+    of their own, so the caller's transaction and loaded rows are left alone.
+    """
+
+    def __init__(self, embedder: EmbeddingService, max_memory_entries: int = DEFAULT_MEMORY_ENTRIES) -> None:
+        self.embedder = embedder
+        self.max_memory_entries = max_memory_entries
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def model_name(self) -> str:
+        return self.embedder.model_name
+
+    def _recall(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+            return vector
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        with self._lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def _forget(self, key: str) -> None:
+        with self._lock:
+            self._memory.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+
+    def _load(self, db: Session, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        found: Dict[str, np.ndarray] = {}
+        for start in range(0, len(keys), LOOKUP_CHUNK):
+            chunk = keys[start:start + LOOKUP_CHUNK]
+            stmt = select(EmbeddingRecord.content_hash, EmbeddingRecord.vector).where(
+                EmbeddingRecord.model_name == self.model_name,
+                EmbeddingRecord.content_hash.in_(chunk),
+            )
+            for key, blob in db.execute(stmt):
+                found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def _save(self, db: Session, rows: Sequence[Tuple[str, np.ndarray]]) -> None:
+        if not rows:
+            return
+        # committing on ``db`` would expire every row the caller has loaded
+        with Session(db.get_bind()) as writer:
+            try:
+                writer.add_all(
+                    EmbeddingRecord(
+                        model_name=self.model_name,
+                        content_hash=key,
+                        dim=int(vector.shape[0]),
+                        vector=np.asarray(vector, dtype=np.float32).tobytes(),
+                    )
+                    for key, vector in rows
+                )
+                writer.commit()
+            except SQLAlchemyError:
+                # Another worker stored the same text concurrently; the vectors are identical.
+                writer.rollback()
+
+    def get_many(self, db: Optional[Session], texts: Sequence[str]) -> np.ndarray:
+        """Return one unit vector per text, embedding only the ones never seen before."""
+
+        keys = [content_hash(text) for text in texts]
+        vectors: Dict[str, np.ndarray] = {}
+        for key in keys:
+            cached = self._recall(key)
+            if cached is not None:
+                vectors[key] = cached
+
+        missing = list(dict.fromkeys(key for key in keys if key not in vectors))
+        if missing and db is not None:
+            for key, vector in self._load(db, missing).items():
+                vectors[key] = vector
+                self._remember(key, vector)
+            missing = [key for key in missing if key not in vectors]
+
+        if missing:
+            first_text = {key: text for key, text in zip(keys, texts)}
+            computed = self.embedder.embed_many([first_text[key] for key in missing])
+            fresh: List[Tuple[str, np.ndarray]] = []
+            for key, vector in zip(missing, computed):
+                vector = np.asarray(vector, dtype=np.float32)
+                vectors[key] = vector
+                self._remember(key, vector)
+                fresh.append((key, vector))
+            if db is not None:
+                self._save(db, fresh)
+
+        if not keys:
+            return np.zeros((0, self.embedder.dim), dtype=np.float32)
+        return np.vstack([vectors[key] for key in keys])
+
+    def get(self, db: Optional[Session], text: str) -> np.ndarray:
+        return self.get_many(db, [text])[0]
+
+    def invalidate(self, db: Optional[Session], key: str) -> None:
+        """Drop a stale content hash for the active model."""
+
+        self._forget(key)
+        if db is None:
+            return
+        with Session(db.get_bind()) as writer:
+            writer.execute(
+                delete(EmbeddingRecord).where(
+                    EmbeddingRecord.model_name == self.model_name,
+                    EmbeddingRecord.content_hash == key,
+                )
+            )
+            writer.commit()
+
+
+_STORES: Dict[str, EmbeddingStore] = {}
+
+
+def get_embedding_store() -> EmbeddingStore:
+    embedder = get_embedding_service()
+    store = _STORES.get(embedder.model_name)
+    if store is None:
+        size = int(os.getenv("EMBEDDING_CACHE_SIZE", DEFAULT_MEMORY_ENTRIES))
+        store = EmbeddingStore(embedder, max_memory_entries=size)
+        _STORES[embedder.model_name] = store
+    return store
+
+
+if __name__ == "__main__":
+    from ..models.database import SessionLocal
+    from .matcher import backfill_embeddings
+
+    with SessionLocal() as session:
+        count = backfill_embeddings(session)
+    print(f"Embedded {count} texts with {get_embedding_store().model_name}")
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, NamedTuple, Optional, TypeVar
+from urllib.parse import urlsplit, urlunsplit
+
+T = TypeVar("T")
+
+# Seconds a stored page is served without asking the server; after that it is revalidated.
+DEFAULT_TTLS: Dict[str, float] = {
+    "search": 15 * 60,
+    "job": 12 * 60 * 60,
+    "company": 7 * 24 * 60 * 60,
+    "other": 60 * 60,
+}
+
+
+def normalize_url(url: str, keep_query: bool = True) -> str:
+    """Lowercase scheme and host, drop the fragment, trailing slash and (optionally) the query."""
+
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip("/") or "/"
+    query = parts.query if keep_query else ""
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, query, ""))
+
+
+def page_kind(url: str) -> str:
+    parts = urlsplit(url)
+    if "/cong-ty/" in parts.path:
+        return "company"
+    if "page=" in parts.query or parts.path.startswith("/tim-viec-lam"):
+        return "search"
+    if "/viec-lam/" in parts.path or "/tuyen-dung/" in parts.path:
+        return "job"
+    return "other"
+
+
+class CachedResponse(NamedTuple):
+    url: str
+    body: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """On-disk store of fetched pages for conditional GETs.
+
+    Each URL maps to ``<sha256>.json`` (validators and timestamps) and
+    ``<sha256>.html`` (body) under ``directory``. A page younger than the TTL
+    of its kind is served without a request; an older one is revalidated
+    with ``If-None-Match``/``If-Modified-Since`` and refreshed on 304.
+    """
+
+    def __init__(self, directory: str, ttls: Optional[Dict[str, float]] = None, clock: Callable[[], float] = time.time) -> None:
+        self.directory = directory
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, url: str) -> tuple[str, str]:
+        key = hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{key}.json"), os.path.join(self.directory, f"{key}.html")
+
+    def lookup(self, url: str) -> Optional[CachedResponse]:
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, encoding="utf-8") as handle:
+                meta = json.load(handle)
+            with open(body_path, encoding="utf-8") as handle:
+                body = handle.read()
+        except (OSError, ValueError):
+            return None
+        return CachedResponse(meta["url"], body, meta.get("etag"), meta.get("last_modified"), float(meta["stored_at"]))
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        return self._clock() - entry.stored_at < self.ttls.get(page_kind(entry.url), self.ttls["other"])
+
+    def _write(self, path: str, data: str) -> None:
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            handle.write(data)
+        os.replace(tmp_path, path)
+
+    def store(self, url: str, body: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> CachedResponse:
+        entry = CachedResponse(url, body, etag, last_modified, self._clock())
+        meta_path, body_path = self._paths(url)
+        self._write(body_path, body)
+        self._write(meta_path, json.dumps({"url": url, "etag": etag, "last_modified": last_modified, "stored_at": entry.stored_at}))
+        return entry
+
+    def refresh(self, entry: CachedResponse) -> CachedResponse:
+        """Restart the TTL of an entry the server confirmed with 304 Not Modified."""
+
+        return self.store(entry.url, entry.body, entry.etag, entry.last_modified)
+
+    def count(self, outcome: str) -> None:
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "revalidated": self.revalidated, "misses": self.misses}
+
+
+class Memo:
+    """Thread-safe memo that runs ``fetch`` once per key, even when callers race."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._results: Dict[str, Future] = {}
+
+    def get_or_fetch(self, key: str, fetch: Callable[[], T]) -> T:
+        with self._lock:
+            future = self._results.get(key)
+            owner = future is None
+            if owner:
+                future = self._results[key] = Future()
+        if not owner:
+            return future.result()
+        try:
+            result = fetch()
+        except BaseException as exc:
+            # Failures are not memoised: waiters see this error, the next caller retries.
+            with self._lock:
+                self._results.pop(key, None)
+            future.set_exception(exc)
+            raise
+        future.set_result(result)
+        return result
+
+    def __len__(self) -> int:
+        return len(self._results)
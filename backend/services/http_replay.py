@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, Iterator, Optional
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from .http_cache import normalize_url
+
+# Response headers worth keeping in the archive; the rest describe the original connection.
+ARCHIVED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+class ResponseArchive:
+    """Directory of recorded responses, one ``<sha256 of URL>.json`` file each."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        key = hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{key}.json")
+
+    def store(self, url: str, status: int, body: str, headers: Optional[Dict[str, str]] = None) -> None:
+        entry = {"url": url, "status": status, "headers": headers or {}, "body": body}
+        path = self._path(url)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(entry, handle, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def lookup(self, url: str) -> Optional[Dict]:
+        """The stored ``{"url", "status", "headers", "body"}`` entry, or ``None``."""
+
+        try:
+            with open(self._path(url), encoding="utf-8") as handle:
+                return json.load(handle)
+        except (OSError, ValueError):
+            return None
+
+    def __iter__(self) -> Iterator[Dict]:
+        for name in sorted(os.listdir(self.directory)):
+            if name.endswith(".json"):
+                with open(os.path.join(self.directory, name), encoding="utf-8") as handle:
+                    yield json.load(handle)
+
+
+class RecordingAdapter(HTTPAdapter):
+    """HTTP adapter that also saves every successful response to a :class:`ResponseArchive`."""
+
+    def __init__(self, archive: ResponseArchive, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.archive = archive
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        if response.status_code == 200:
+            headers = {name: response.headers[name] for name in ARCHIVED_HEADERS if name in response.headers}
+            self.archive.store(request.url, response.status_code, response.text, headers)
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """Serves a :class:`ResponseArchive` offline, with injected latency, errors and 429s.
+
+    Each request sleeps ``latency`` plus up to ``jitter`` seconds, then fails
+    with a 429 (``throttle_rate``, carrying ``Retry-After``) or a 503
+    (``error_rate``) before falling back to the archived page or a 404. 503s
+    are retried in the adapter up to ``max_retries`` times, like the
+    ``urllib3`` retry policy of the live session. Counters are thread-safe.
+    """
+
+    def __init__(
+        self,
+        archive: ResponseArchive,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: int = 0,
+        max_retries: int = 3,
+        seed: Optional[int] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        super().__init__()
+        self.archive = archive
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.max_retries = max_retries
+        self._random = random.Random(seed)
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.served = 0
+        self.throttled = 0
+        self.errors = 0
+        self.retries = 0
+        self.missing = 0
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _roll(self) -> float:
+        with self._lock:
+            return self._random.random()
+
+    def _response(self, request, status: int, body: str = "", headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers or {})
+        response._content = body.encode("utf-8")
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        response.reason = {200: "OK", 404: "Not Found", 429: "Too Many Requests", 503: "Service Unavailable"}.get(status, "")
+        return response
+
+    def send(self, request, **kwargs) -> requests.Response:
+        for attempt in range(self.max_retries + 1):
+            self._count("requests")
+            delay = self.latency + (self._roll() * self.jitter if self.jitter else 0.0)
+            if delay:
+                self._sleep(delay)
+            roll = self._roll()
+            if roll < self.throttle_rate:
+                self._count("throttled")
+                return self._response(request, 429, headers={"Retry-After": str(self.retry_after)})
+            if roll < self.throttle_rate + self.error_rate:
+                self._count("errors")
+                if attempt < self.max_retries:
+                    self._count("retries")
+                    continue
+                return self._response(request, 503)
+            break
+
+        entry = self.archive.lookup(request.url)
+        if entry is None:
+            self._count("missing")
+            return self._response(request, 404)
+        self._count("served")
+        return self._response(request, entry["status"], entry["body"], entry.get("headers"))
+
+    def close(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "requests": self.requests,
+            "served": self.served,
+            "throttled": self.throttled,
+            "errors": self.errors,
+            "retries": self.retries,
+            "missing": self.missing,
+        }
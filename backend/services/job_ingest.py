@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from ..models.job import Job
+from .http_cache import normalize_url
+from .matcher import embed_jobs, job_fingerprint, jobs_ingested
+
+INGEST_CHUNK = int(os.getenv("JOB_INGEST_CHUNK", "1000"))
+JOB_FIELDS = ("title", "company", "description", "location", "skills")
+# Job description sections of a TopCV posting, in the order they are joined.
+DESCRIPTION_SECTIONS = (("desc_mota", "Mô tả công việc"), ("desc_yeucau", "Yêu cầu ứng viên"))
+
+
+class IngestReport(NamedTuple):
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+
+
+def _clean(value: Any) -> Optional[str]:
+    if value is None or (isinstance(value, float) and value != value):  # NaN from pandas/CSV
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def canonical_job_url(url: Any) -> Optional[str]:
+    """The form ``job_url`` is stored in, shared by the ingest and the job routes.
+
+    Tracking query parameters and fragments are dropped, so the same posting
+    reached from different search pages is one row.
+    """
+
+    url = _clean(url)
+    return normalize_url(url, keep_query=False) if url else None
+
+
+def row_to_job(row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Map one crawl row (see ``topcv.COLUMNS``) onto ``Job`` columns; ``None`` if it cannot be stored."""
+
+    job_url = canonical_job_url(row.get("job_url"))
+    title = _clean(row.get("detail_title")) or _clean(row.get("title"))
+    if not job_url or not title:
+        return None
+
+    sections = []
+    for field, heading in DESCRIPTION_SECTIONS:
+        body = _clean(row.get(field))
+        if body:
+            sections.append(f"{heading}:\n{body}")
+    tags = _clean(row.get("tags")) or ""
+    return {
+        "job_url": job_url,
+        "title": title,
+        "company": _clean(row.get("company_name_full")) or _clean(row.get("company")) or "",
+        "description": "\n\n".join(sections),
+        "location": _clean(row.get("detail_location")) or _clean(row.get("address_list")) or "",
+        "skills": [tag.strip() for tag in tags.split(";") if tag.strip()],
+    }
+
+
+def read_rows(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream rows from a crawl output file (.jsonl, .csv or .parquet) without loading it whole."""
+
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".jsonl":
+        with open(path, encoding="utf-8") as handle:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+    elif extension == ".csv":
+        with open(path, encoding="utf-8-sig", newline="") as handle:
+            yield from csv.DictReader(handle)
+    elif extension == ".parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=INGEST_CHUNK):
+            yield from batch.to_pylist()
+    else:
+        raise ValueError(f"Unsupported input format {extension!r}; use .jsonl, .csv or .parquet")
+
+
+def _chunks(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk: List[Dict[str, Any]] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def _upsert(db: Session, jobs: List[Dict[str, Any]]) -> None:
+    """One multi-row ``INSERT ... ON CONFLICT (job_url) DO UPDATE`` for the chunk.
+
+    A posting inserted by a concurrent ingest or ``POST /jobs`` since the
+    chunk was read is updated instead of failing the unique constraint.
+    """
+
+    dialect = db.get_bind().dialect.name
+    if dialect not in _UPSERT_INSERTS:
+        raise ValueError(f"job ingest needs PostgreSQL or SQLite, not {dialect}")
+    stmt = _UPSERT_INSERTS[dialect](Job).values(jobs)
+    db.execute(stmt.on_conflict_do_update(index_elements=[Job.job_url], set_={field: stmt.excluded[field] for field in JOB_FIELDS}))
+
+
+def _ingest_chunk(db: Session, rows: List[Dict[str, Any]], stale: List[str]) -> IngestReport:
+    by_url: Dict[str, Dict[str, Any]] = {}
+    skipped = 0
+    for row in rows:
+        job = row_to_job(row)
+        if job is None:
+            skipped += 1
+            continue
+        if job["job_url"] in by_url:
+            skipped += 1  # the later row of a duplicated posting wins
+        by_url[job["job_url"]] = job
+
+    existing = db.execute(
+        select(Job.id, Job.job_url, *(getattr(Job, field) for field in JOB_FIELDS)).where(Job.job_url.in_(list(by_url)))
+    ).all()
+    updates: List[Dict[str, Any]] = []
+    for current in existing:
+        job = by_url.pop(current.job_url)
+        if all(getattr(current, field) == job[field] for field in JOB_FIELDS):
+            skipped += 1
+            continue
+        stale.append(job_fingerprint(current))
+        updates.append(job)
+
+    written = list(by_url.values()) + updates
+    if written:
+        _upsert(db, written)
+    db.commit()
+    # embed while loading, so the first match request in each worker does not embed the whole load
+    embed_jobs(db, [Job(**job) for job in written])
+    return IngestReport(len(by_url), len(updates), skipped)
+
+
+def ingest_rows(db: Session, rows: Iterable[Dict[str, Any]], chunk_size: int = INGEST_CHUNK) -> IngestReport:
+    """Upsert crawl rows into ``jobs`` by ``job_url``, one transaction per chunk.
+
+    Rows without a URL or title, repeats within a chunk and postings whose
+    stored columns already match are counted as skipped. When anything
+    changed, the shared jobs revision is bumped once at the end; API workers
+    see it on their next index probe, rebuild their job index and drop cached
+    rankings. New and changed postings are embedded chunk by chunk and the
+    embeddings of replaced ones deleted, so that rebuild embeds nothing.
+    """
+
+    inserted = updated = skipped = 0
+    stale: List[str] = []
+    try:
+        for chunk in _chunks(rows, chunk_size):
+            report = _ingest_chunk(db, chunk, stale)
+            inserted += report.inserted
+            updated += report.updated
+            skipped += report.skipped
+    finally:
+        if inserted or updated:
+            jobs_ingested(db, stale)
+    return IngestReport(inserted, updated, skipped)
+
+
+def ingest_file(db: Session, path: str, chunk_size: int = INGEST_CHUNK) -> IngestReport:
+    return ingest_rows(db, read_rows(path), chunk_size)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Load TopCV crawl output into the jobs table.")
+    parser.add_argument("path", help="crawl output written by topcv.crawl_to_file (.jsonl, .csv or .parquet)")
+    parser.add_argument("--chunk-size", type=int, default=INGEST_CHUNK)
+    args = parser.parse_args(argv)
+
+    from ..models.database import SessionLocal, engine
+    from ..models.migrations import ensure_schema
+
+    ensure_schema(engine)
+    with SessionLocal() as db:
+        report = ingest_file(db, args.path, args.chunk_size)
+    print(f"inserted={report.inserted} updated={report.updated} skipped={report.skipped}")
+
+
+if __name__ == "__main__":
+    main()
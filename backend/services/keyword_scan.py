@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import os
+import threading
+import weakref
+from collections import OrderedDict, deque
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .embedding_store import content_hash
+from .skill_vocab import SkillVocabulary, get_skill_vocabulary
+
+DEFAULT_SCAN_ENTRIES = 20_000
+
+
+def _is_word(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton over a fixed list of lowercase keywords.
+
+    :meth:`find` walks the text once, whatever the number of keywords, and
+    only reports whole-word occurrences: "java" does not match inside
+    "javascript". Edges made of symbols (the "++" of "c++") need no boundary.
+    """
+
+    def __init__(self, keywords: Sequence[str]) -> None:
+        self.keywords = list(keywords)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+        for index, keyword in enumerate(self.keywords):
+            if keyword:
+                self._insert(keyword, index)
+        self._link()
+
+    def _insert(self, keyword: str, index: int) -> None:
+        node = 0
+        for char in keyword:
+            following = self._goto[node].get(char)
+            if following is None:
+                following = len(self._goto)
+                self._goto[node][char] = following
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            node = following
+        self._out[node] += (index,)
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, following in self._goto[node].items():
+                queue.append(following)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[following] = self._goto[fallback].get(char, 0)
+                self._out[following] += self._out[self._fail[following]]
+
+    def find(self, text: str) -> Set[int]:
+        """Indices of the keywords that occur in ``text`` as whole words."""
+
+        found: Set[int] = set()
+        if not text or len(self._goto) == 1:
+            return found
+        text = text.lower()
+        last = len(text) - 1
+        goto, fail, out, keywords = self._goto, self._fail, self._out, self.keywords
+        node = 0
+        for end, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for index in out[node]:
+                if index in found:
+                    continue
+                keyword = keywords[index]
+                start = end - len(keyword) + 1
+                if start > 0 and _is_word(keyword[0]) and _is_word(text[start - 1]):
+                    continue
+                if end < last and _is_word(keyword[-1]) and _is_word(text[end + 1]):
+                    continue
+                found.add(index)
+        return found
+
+
+def count_keyword_hits(text: str, keywords: Iterable[str]) -> int:
+    """Number of ``keywords`` mentioned in ``text`` as whole words."""
+
+    keywords = list(keywords)
+    if not text or not keywords:
+        return 0
+    return len(KeywordAutomaton(keywords).find(text))
+
+
+class KeywordScanner:
+    """Finds which vocabulary skills a text mentions with one automaton pass.
+
+    The automaton is rebuilt lazily when the vocabulary has grown. Results are
+    memoised by text hash together with the vocabulary size they were computed
+    against, so a CV is rescanned only when it changes or new skills appear.
+    """
+
+    def __init__(self, vocabulary: SkillVocabulary, max_entries: int = DEFAULT_SCAN_ENTRIES) -> None:
+        self.vocabulary = vocabulary
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._built: Tuple[int, KeywordAutomaton] = (0, KeywordAutomaton([]))
+        self._memory: "OrderedDict[str, Tuple[int, np.ndarray]]" = OrderedDict()
+
+    def _current(self) -> Tuple[int, KeywordAutomaton]:
+        size = len(self.vocabulary)
+        if size != self._built[0]:
+            with self._lock:
+                if size != self._built[0]:
+                    self._built = (size, KeywordAutomaton(self.vocabulary.labels()[:size]))
+        return self._built
+
+    def scan(self, text: Optional[str]) -> np.ndarray:
+        """Sorted skill ids of the vocabulary labels mentioned in ``text``."""
+
+        if not text:
+            return np.zeros(0, dtype=np.int32)
+        size, automaton = self._current()
+        key = content_hash(text)
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None and cached[0] == size:
+                self._memory.move_to_end(key)
+                return cached[1]
+
+        skill_ids = np.asarray(sorted(automaton.find(text)), dtype=np.int32)
+        with self._lock:
+            self._memory[key] = (size, skill_ids)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+        return skill_ids
+
+
+_SCANNERS: "weakref.WeakKeyDictionary[SkillVocabulary, KeywordScanner]" = weakref.WeakKeyDictionary()
+_SCANNERS_LOCK = threading.Lock()
+
+
+def get_keyword_scanner(vocabulary: Optional[SkillVocabulary] = None) -> KeywordScanner:
+    if vocabulary is None:
+        vocabulary = get_skill_vocabulary()
+    with _SCANNERS_LOCK:
+        scanner = _SCANNERS.get(vocabulary)
+        if scanner is None:
+            scanner = KeywordScanner(vocabulary, int(os.getenv("KEYWORD_SCAN_CACHE_SIZE", DEFAULT_SCAN_ENTRIES)))
+            _SCANNERS[vocabulary] = scanner
+        return scanner
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Protocol, Tuple
+
+DEFAULT_CACHE_ENTRIES = 10_000
+DEFAULT_CACHE_TTL = 3600
+REDIS_PREFIX = "jobmatcher:match"
+
+
+class CacheBackend(Protocol):
+    name: str
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]: ...
+
+    def set(self, key: str, value: List[Dict[str, Any]]) -> None: ...
+
+    def size(self) -> int: ...
+
+    def clear(self) -> None: ...
+
+    def version(self) -> int: ...
+
+    def bump_version(self) -> int: ...
+
+
+class MemoryBackend:
+    """Per-process LRU with a TTL; the corpus version is a plain counter in this process.
+
+    Other workers cannot bump this counter. Their writes reach it through the
+    index probe (see ``matcher._ensure_index``), and the TTL bounds how long
+    any entry can outlive a change nothing here noticed.
+    """
+
+    name = "memory"
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_CACHE_ENTRIES,
+        ttl_seconds: float = DEFAULT_CACHE_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._version = 0
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def size(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def version(self) -> int:
+        return self._version
+
+    def bump_version(self) -> int:
+        with self._lock:
+            self._version += 1
+            # Entries for older versions can never be hit again.
+            self._entries.clear()
+            return self._version
+
+
+class RedisBackend:
+    """Shared cache for every worker; eviction is left to Redis (``maxmemory-policy allkeys-lru``).
+
+    Works with any Redis-protocol server. Entries also carry a TTL so keys of
+    superseded corpus versions age out on servers without an eviction policy.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, ttl_seconds: int = DEFAULT_CACHE_TTL) -> None:
+        import redis
+
+        self.ttl_seconds = ttl_seconds
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        raw = self._client.get(f"{REDIS_PREFIX}:{key}")
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: List[Dict[str, Any]]) -> None:
+        self._client.set(f"{REDIS_PREFIX}:{key}", json.dumps(value), ex=self.ttl_seconds)
+
+    def size(self) -> int:
+        return sum(1 for _ in self._client.scan_iter(match=f"{REDIS_PREFIX}:v*", count=1000))
+
+    def clear(self) -> None:
+        keys = list(self._client.scan_iter(match=f"{REDIS_PREFIX}:v*", count=1000))
+        if keys:
+            self._client.delete(*keys)
+
+    def version(self) -> int:
+        return int(self._client.get(f"{REDIS_PREFIX}:version") or 0)
+
+    def bump_version(self) -> int:
+        return int(self._client.incr(f"{REDIS_PREFIX}:version"))
+
+
+class MatchCache:
+    """Match results keyed by request parameters and a corpus version counter.
+
+    Any write that can change a ranking bumps the version, and so does a
+    rebuild of an index after writes made elsewhere; the caller also passes
+    the shared candidate revision. Entries never need explicit invalidation.
+    """
+
+    def __init__(self, backend: CacheBackend) -> None:
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, candidate_id: int, top_k: int, min_score: float, semantic_mode: str, revision: int = 0) -> str:
+        return f"v{self.backend.version()}.{revision}:{candidate_id}:{top_k}:{min_score:.4f}:{semantic_mode}"
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        try:
+            value = self.backend.get(key)
+        except Exception:  # pragma: no cover - a cache outage must not fail matching
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: List[Dict[str, Any]]) -> None:
+        try:
+            self.backend.set(key, value)
+        except Exception:  # pragma: no cover - a cache outage must not fail matching
+            pass
+
+    def bump_version(self) -> None:
+        try:
+            self.backend.bump_version()
+        except Exception:  # pragma: no cover - a cache outage must not fail writes
+            pass
+
+    def clear(self) -> None:
+        self.backend.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend.name,
+            "version": self.backend.version(),
+            "size": self.backend.size(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def _build_cache() -> MatchCache:
+    backend_name = os.getenv("MATCH_CACHE_BACKEND", "memory").strip().lower()
+    ttl = int(os.getenv("MATCH_CACHE_TTL", DEFAULT_CACHE_TTL))
+    if backend_name == "redis":
+        url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+        return MatchCache(RedisBackend(url, ttl_seconds=ttl))
+    return MatchCache(MemoryBackend(int(os.getenv("MATCH_CACHE_SIZE", DEFAULT_CACHE_ENTRIES)), ttl_seconds=ttl))
+
+
+_CACHE: Optional[MatchCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_match_cache() -> MatchCache:
+    global _CACHE
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = _build_cache()
+    return _CACHE
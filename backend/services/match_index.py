@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from .skill_vocab import SkillVocabulary, get_skill_vocabulary
+
+IndexRow = Tuple[int, Iterable[str], np.ndarray]
+
+
+class IndexSnapshot(NamedTuple):
+    """Immutable view of the index; row ``i`` of every field describes ``ids[i]``."""
+
+    ids: np.ndarray
+    skills: sparse.csr_matrix
+    vectors: np.ndarray
+    rows: Dict[int, int]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def row_sizes(self) -> np.ndarray:
+        return np.diff(self.skills.indptr)
+
+
+def skill_rows_to_csr(rows: List[np.ndarray], width: int) -> sparse.csr_matrix:
+    """Stack per-row arrays of skill ids into a 0/1 CSR matrix of ``width`` columns."""
+
+    indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    if rows:
+        np.cumsum([len(row) for row in rows], out=indptr[1:])
+        indices = np.concatenate(rows).astype(np.int32, copy=False)
+    else:
+        indices = np.zeros(0, dtype=np.int32)
+    data = np.ones(len(indices), dtype=np.float32)
+    return sparse.csr_matrix((data, indices, indptr), shape=(len(rows), width))
+
+
+class MatchIndex:
+    """In-memory view of a corpus (jobs or candidates) used for scoring without the ORM.
+
+    Each row is one entry of a CSR skill matrix over the shared skill
+    vocabulary and one row of a dense embedding matrix, both aligned with
+    ``ids``. Rows are kept in sync by the write routes; ``revision`` is the
+    shared corpus revision (see ``corpus_revision``) the rows reflect.
+    """
+
+    def __init__(self, vocabulary: Optional[SkillVocabulary] = None) -> None:
+        self.vocabulary = vocabulary if vocabulary is not None else get_skill_vocabulary()
+        self._lock = threading.RLock()
+        self._skill_ids: Dict[int, np.ndarray] = {}
+        self._ids: List[int] = []
+        self._rows: Dict[int, int] = {}
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._snapshot: Optional[IndexSnapshot] = None
+        self.loaded = False
+        self.checked_at = 0.0
+        self.generation = 0
+        self.revision = 0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, entry_id: int) -> bool:
+        return entry_id in self._rows
+
+    def clear(self) -> None:
+        with self._lock:
+            self._skill_ids.clear()
+            self._ids = []
+            self._rows = {}
+            self._vectors = np.zeros((0, 0), dtype=np.float32)
+            self._snapshot = None
+            self.loaded = False
+            self.checked_at = 0.0
+
+    def rebuild(self, rows: Iterable[IndexRow], revision: int = 0) -> None:
+        with self._lock:
+            self.clear()
+            for entry_id, skills, vector in rows:
+                self.upsert(entry_id, skills, vector)
+            self.revision = revision
+            self.loaded = True
+            self.checked_at = time.monotonic()
+            self.generation += 1
+
+    def _ensure_capacity(self, dim: int) -> None:
+        count = len(self._ids)
+        if self._vectors.shape[1] != dim:
+            if count:
+                raise ValueError(f"Embedding dimension changed from {self._vectors.shape[1]} to {dim}; rebuild the index")
+            self._vectors = np.zeros((16, dim), dtype=np.float32)
+        if count >= self._vectors.shape[0]:
+            grown = np.zeros((max(16, self._vectors.shape[0] * 2), dim), dtype=np.float32)
+            grown[:count] = self._vectors[:count]
+            self._vectors = grown
+
+    def upsert(self, entry_id: int, skills: Iterable[str], vector: np.ndarray) -> None:
+        with self._lock:
+            self._skill_ids[entry_id] = self.vocabulary.add_many(skills)
+            row = self._rows.get(entry_id)
+            if row is None:
+                self._ensure_capacity(int(vector.shape[0]))
+                row = len(self._ids)
+                self._ids.append(entry_id)
+                self._rows[entry_id] = row
+            self._vectors[row] = vector
+            self._snapshot = None
+
+    def remove(self, entry_id: int) -> None:
+        with self._lock:
+            row = self._rows.pop(entry_id, None)
+            if row is None:
+                return
+            self._skill_ids.pop(entry_id, None)
+            last = len(self._ids) - 1
+            if row != last:
+                moved = self._ids[last]
+                self._ids[row] = moved
+                self._rows[moved] = row
+                self._vectors[row] = self._vectors[last]
+            self._ids.pop()
+            self._snapshot = None
+
+    def snapshot(self) -> IndexSnapshot:
+        """Return the current corpus as a CSR skill matrix plus embedding rows.
+
+        Built lazily after writes and shared by readers until the next write,
+        so scoring never sees a half-applied update.
+        """
+
+        with self._lock:
+            if self._snapshot is None:
+                ids = np.asarray(self._ids, dtype=np.int64)
+                matrix = skill_rows_to_csr([self._skill_ids[entry_id] for entry_id in self._ids], len(self.vocabulary))
+                self._snapshot = IndexSnapshot(ids, matrix, self._vectors[:len(ids)].copy(), dict(self._rows))
+            return self._snapshot
+
+
+_JOB_INDEX = MatchIndex()
+_CANDIDATE_INDEX = MatchIndex()
+
+
+def get_job_index() -> MatchIndex:
+    return _JOB_INDEX
+
+
+def get_candidate_index() -> MatchIndex:
+    return _CANDIDATE_INDEX
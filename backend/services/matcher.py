@@ -1,14 +1,38 @@
 from __future__ import annotations
 
+import os
+import time
 from ast import literal_eval
-from collections.abc import Iterable
-from typing import Any, Dict, List, Tuple
+from collections.abc import Callable, Iterable, Iterator
+from typing import Any, Dict, List, NamedTuple, Sequence, Tuple
 
-from sqlalchemy.orm import Session
+import numpy as np
+from sqlalchemy import func
+from scipy import sparse
+from sqlalchemy.orm import Session, load_only, undefer
 
 from ..models.candidate import Candidate
 from ..models.job import Job
-from .embedding import get_embedding_service
+from .ann import RETRAIN_GROWTH, IVFFlatIndex, ann_index_path, get_job_ann
+from .corpus_revision import CANDIDATES, JOBS, bump_revision, current_revision
+from .embedding import cosine_to_score, get_embedding_service
+from .embedding_store import content_hash, get_embedding_store
+from .keyword_scan import KeywordAutomaton, count_keyword_hits, get_keyword_scanner
+from .match_cache import get_match_cache
+from .match_index import IndexRow, IndexSnapshot, MatchIndex, get_candidate_index, get_job_index, skill_rows_to_csr
+from .ranking import can_reach, kth_largest, top_k as top_k_rows
+from .skill_vocab import SkillVocabulary
+
+KEYWORD_BONUS_STEP = 0.03
+KEYWORD_BONUS_CAP = 0.25
+SEMANTIC_WEIGHT = 0.2
+INDEX_REFRESH_SECONDS = float(os.getenv("JOB_INDEX_REFRESH_SECONDS", "30"))
+INDEX_BATCH_SIZE = 500
+MATCH_BATCH_SIZE = int(os.getenv("MATCH_BATCH_SIZE", "64"))
+MATCH_JOB_CHUNK = int(os.getenv("MATCH_JOB_CHUNK", "8192"))
+ANN_CANDIDATES = int(os.getenv("ANN_CANDIDATES", "200"))
+SEMANTIC_MODES = ("exact", "ann")
+LOAD_CHUNK = 1000
 
 
 def _ensure_list(value: Any) -> List[str]:
@@ -76,51 +100,315 @@ def _compose_job_text(job: Job) -> str:
     return " ".join(part for part in parts if part)
 
 
-def score_candidate_to_job(candidate: Candidate, job: Job) -> Dict[str, Any]:
+def job_fingerprint(job: Job) -> str:
+    return content_hash(_compose_job_text(job))
+
+
+def candidate_fingerprint(candidate: Candidate) -> str:
+    return content_hash(_compose_candidate_text(candidate))
+
+
+def _iter_rows(db: Session, model: Any, batch_size: int) -> Iterator[List[Any]]:
+    """Walk a table in id order, one committed-safe batch at a time, deferred text included."""
+
+    last_id = 0
+    while True:
+        batch = db.query(model).options(undefer("*")).filter(model.id > last_id).order_by(model.id).limit(batch_size).all()
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1].id
+
+
+def _sync_embedding(db: Session, text: str, previous_fingerprint: str | None) -> np.ndarray | None:
+    try:
+        store = get_embedding_store()
+        if previous_fingerprint and previous_fingerprint != content_hash(text):
+            store.invalidate(db, previous_fingerprint)
+        if text:
+            return store.get(db, text)
+    except Exception:  # pragma: no cover - best effort, matching recomputes lazily
+        db.rollback()
+    return None
+
+
+def _indexed_vector(index: MatchIndex, entry_id: int | None) -> np.ndarray | None:
+    """Embedding already held by ``index`` for ``entry_id``, so its text need not be read or hashed."""
+
+    if not index.loaded or entry_id is None or entry_id not in index:
+        return None
+    snap = index.snapshot()
+    row = snap.rows.get(entry_id)
+    return None if row is None else snap.vectors[row]
+
+
+def _index_rows(db: Session, rows: Sequence[Any], compose: Callable[[Any], str]) -> List[IndexRow]:
+    # plain values first: nothing below may touch the ORM rows again
+    entries = [(row.id, _normalise_skills(row.skills)[0], compose(row)) for row in rows]
+    vectors = get_embedding_store().get_many(db, [text for _, _, text in entries])
+    return [(entry_id, skills, vector) for (entry_id, skills, _), vector in zip(entries, vectors)]
+
+
+def _ensure_index(db: Session, index: MatchIndex, model: Any, compose: Callable[[Any], str], corpus: str) -> MatchIndex:
+    now = time.monotonic()
+    if index.loaded and now - index.checked_at < INDEX_REFRESH_SECONDS:
+        return index
+
+    # read before the rows, so a write racing the rebuild triggers another one
+    revision = current_revision(db, corpus)
+    count, max_id = db.query(func.count(model.id), func.max(model.id)).one()
+    if index.loaded and index.revision == revision and count == len(index) and (max_id is None or max_id in index):
+        index.checked_at = now
+        return index
+
+    rows: List[IndexRow] = []
+    for batch in _iter_rows(db, model, INDEX_BATCH_SIZE):
+        rows.extend(_index_rows(db, batch, compose))
+    index.rebuild(rows, revision)
+    # the rows changed under this process, so may every cached ranking
+    get_match_cache().bump_version()
+    return index
+
+
+def ensure_job_index(db: Session) -> MatchIndex:
+    """Return the process-wide job index, rebuilding it if the jobs table drifted.
+
+    Writes through the job routes keep the index current. Every
+    ``INDEX_REFRESH_SECONDS`` the shared corpus revision, which every writer
+    bumps, is compared with the one the index was built from; the count/max-id
+    probe additionally catches inserts and deletes made with plain SQL.
+    """
+
+    return _ensure_index(db, get_job_index(), Job, _compose_job_text, JOBS)
+
+
+def ensure_candidate_index(db: Session) -> MatchIndex:
+    return _ensure_index(db, get_candidate_index(), Candidate, _compose_candidate_text, CANDIDATES)
+
+
+def _record_write(db: Session, corpus: str, index: MatchIndex, applied: bool) -> None:
+    """Bump the shared revision of ``corpus`` after a write.
+
+    ``applied`` says the write was also made to ``index`` in place; the index
+    then moves to the new revision, unless writes from elsewhere came first,
+    in which case the next probe rebuilds it.
+    """
+
+    try:
+        revision = bump_revision(db, corpus)
+    except Exception:  # pragma: no cover - best effort, the count/max-id probe still applies
+        db.rollback()
+        return
+    if applied and index.loaded and index.revision == revision - 1:
+        index.revision = revision
+
+
+def _current_index(db: Session, index: MatchIndex, corpus: str, revision: int | None = None) -> MatchIndex:
+    """``index``, dropped first if it lags the shared revision, so stale vectors are never read."""
+
+    if revision is None:
+        revision = current_revision(db, corpus)
+    if index.loaded and index.revision != revision:
+        index.clear()
+    return index
+
+
+def ensure_job_ann(db: Session) -> IVFFlatIndex:
+    """Return the job ANN index, re-populating it after the job index was rebuilt.
+
+    The quantiser is reused from disk when one exists for the active model
+    and retrained (then saved) only when missing or outgrown.
+    """
+
+    index = ensure_job_index(db)
+    ann = get_job_ann()
+    if ann.generation == index.generation and not ann.needs_retrain():
+        return ann
+
+    snap = index.snapshot()
+    model_name = get_embedding_store().model_name
+    path = ann_index_path(model_name)
+    if not ann.trained:
+        ann.load(path, model_name)
+    if not ann.trained or len(snap) > RETRAIN_GROWTH * max(ann.trained_size, 1):
+        ann.train(snap.vectors)
+        if ann.trained:
+            ann.save(path, model_name)
+    ann.reset()
+    ann.add_many(snap.ids.tolist(), snap.vectors)
+    ann.generation = index.generation
+    return ann
+
+
+def job_saved(db: Session, job: Job, previous_fingerprint: str | None = None) -> None:
+    """Refresh derived matching state after a job insert or update."""
+
+    get_match_cache().bump_version()
+    vector = _sync_embedding(db, _compose_job_text(job), previous_fingerprint)
+    index = get_job_index()
+    applied = index.loaded and vector is not None
+    if applied:
+        index.upsert(job.id, _normalise_skills(job.skills)[0], vector)
+        ann = get_job_ann()
+        if ann.generation == index.generation:
+            ann.add(job.id, vector)
+    _record_write(db, JOBS, index, applied)
+
+
+def jobs_ingested(db: Session, stale_fingerprints: Iterable[str] = ()) -> None:
+    """After a bulk job load: drop replaced embeddings and bump the shared jobs revision.
+
+    Usually called from the ``job_ingest`` CLI, whose in-memory index and
+    cache die with it; the revision is what running API workers notice.
+    """
+
+    get_match_cache().bump_version()
+    for fingerprint in stale_fingerprints:
+        forget_embedding(db, fingerprint)
+    get_job_index().clear()
+    _record_write(db, JOBS, get_job_index(), applied=False)
+
+
+def embed_jobs(db: Session, jobs: Sequence[Job]) -> None:
+    """Store embeddings for jobs written in bulk, so no match request has to embed them inline."""
+
+    texts = [text for text in map(_compose_job_text, jobs) if text]
+    if not texts:
+        return
+    try:
+        get_embedding_store().get_many(db, texts)
+    except Exception:  # pragma: no cover - best effort, the index build embeds what is missing
+        db.rollback()
+
+
+def job_deleted(db: Session, job_id: int, fingerprint: str) -> None:
+    get_match_cache().bump_version()
+    forget_embedding(db, fingerprint)
+    get_job_index().remove(job_id)
+    get_job_ann().remove(job_id)
+    _record_write(db, JOBS, get_job_index(), applied=True)
+
+
+def candidate_saved(db: Session, candidate: Candidate, previous_fingerprint: str | None = None) -> None:
+    if previous_fingerprint is not None:
+        get_match_cache().bump_version()
+    vector = _sync_embedding(db, _compose_candidate_text(candidate), previous_fingerprint)
+    index = get_candidate_index()
+    applied = index.loaded and vector is not None
+    if applied:
+        index.upsert(candidate.id, _normalise_skills(candidate.skills)[0], vector)
+    if previous_fingerprint is not None:
+        # inserts are caught by the count/max-id probe and change no cached ranking
+        _record_write(db, CANDIDATES, index, applied)
+
+
+def candidates_saved(db: Session, candidates: Sequence[Candidate]) -> None:
+    """Bulk variant of :func:`candidate_saved` for freshly inserted candidates: one embedding batch."""
+
+    if not candidates:
+        return
+    try:
+        rows = _index_rows(db, candidates, _compose_candidate_text)
+    except Exception:  # pragma: no cover - best effort, matching recomputes lazily
+        db.rollback()
+        return
+    index = get_candidate_index()
+    if index.loaded:
+        for candidate_id, skills, vector in rows:
+            index.upsert(candidate_id, skills, vector)
+
+
+def candidate_deleted(db: Session, candidate_id: int, fingerprint: str) -> None:
+    get_match_cache().bump_version()
+    forget_embedding(db, fingerprint)
+    get_candidate_index().remove(candidate_id)
+    _record_write(db, CANDIDATES, get_candidate_index(), applied=True)
+
+
+def forget_embedding(db: Session, fingerprint: str) -> None:
+    try:
+        get_embedding_store().invalidate(db, fingerprint)
+    except Exception:  # pragma: no cover - best effort cleanup
+        db.rollback()
+
+
+def backfill_embeddings(db: Session, batch_size: int = 256) -> int:
+    """Embed every job and candidate for the active model ahead of a backend switch."""
+
+    store = get_embedding_store()
+    total = 0
+    for model, compose in ((Job, _compose_job_text), (Candidate, _compose_candidate_text)):
+        for batch in _iter_rows(db, model, batch_size):
+            store.get_many(db, [compose(row) for row in batch])
+            total += len(batch)
+    return total
+
+
+def score_candidate_to_job(candidate: Candidate, job: Job, semantic_score: float | None = None) -> Dict[str, Any]:
     cand_norm, cand_display = _normalise_skills(candidate.skills)
     job_norm, job_display = _normalise_skills(job.skills)
 
     skill_score = _jaccard(cand_norm, job_norm)
 
-    keyword_hits = 0
-    if candidate.cv_text:
-        text = candidate.cv_text.lower()
-        keyword_hits = sum(1 for skill in job_norm if skill in text)
+    keyword_hits = count_keyword_hits(candidate.cv_text, job_norm)
+    bonus = min(KEYWORD_BONUS_CAP, keyword_hits * KEYWORD_BONUS_STEP)
 
-    bonus = min(0.25, keyword_hits * 0.03)
-
-    semantic_score = 0.0
-    candidate_text = _compose_candidate_text(candidate)
-    job_text = _compose_job_text(job)
-    if candidate_text and job_text:
-        try:
-            embedder = get_embedding_service()
-            semantic_score = embedder.similarity(candidate_text, job_text)
-        except Exception:  # pragma: no cover - best effort fallback
-            semantic_score = 0.0
+    if semantic_score is None:
+        semantic_score = 0.0
+        candidate_text = _compose_candidate_text(candidate)
+        job_text = _compose_job_text(job)
+        if candidate_text and job_text:
+            try:
+                embedder = get_embedding_service()
+                semantic_score = embedder.similarity(candidate_text, job_text)
+            except Exception:  # pragma: no cover - best effort fallback
+                semantic_score = 0.0
+    semantic_score = float(semantic_score)
 
     base_score = min(1.0, skill_score + bonus)
-    score = round(min(1.0, base_score + 0.2 * semantic_score), 4)
+    score = min(1.0, base_score + SEMANTIC_WEIGHT * semantic_score)
+    coverage = len(job_norm & cand_norm) / len(job_norm) if job_norm else 0.0
 
-    matched = sorted(job_display[s] for s in job_norm & cand_norm)
-    missing = sorted(job_display[s] for s in job_norm - cand_norm)
-    extras = sorted(cand_display[s] for s in cand_norm - job_norm)
+    return _result_row(job, job_norm, job_display, cand_norm, cand_display, score, skill_score, keyword_hits, coverage, semantic_score)
 
-    coverage = round(len(matched) / len(job_norm), 4) if job_norm else 0.0
 
+def _result_row(
+    job: Job,
+    job_norm: set[str],
+    job_display: Dict[str, str],
+    cand_norm: set[str],
+    cand_display: Dict[str, str],
+    score: float,
+    skill_score: float,
+    keyword_hits: int,
+    coverage: float,
+    semantic_score: float,
+) -> Dict[str, Any]:
     return {
         "job_id": job.id,
         "title": job.title,
         "company": job.company,
         "location": job.location,
-        "score": score,
+        **_score_fields(score, skill_score, keyword_hits, coverage, semantic_score),
+        **_skill_labels(job_norm, job_display, cand_norm, cand_display),
+    }
+
+
+def _score_fields(score: float, skill_score: float, keyword_hits: int, coverage: float, semantic_score: float) -> Dict[str, Any]:
+    return {
+        "score": round(score, 4),
         "skill_score": round(skill_score, 4),
         "keyword_hits": keyword_hits,
-        "coverage": coverage,
+        "coverage": round(coverage, 4),
         "semantic_score": round(semantic_score, 4),
-        "matched_skills": matched,
-        "missing_skills": missing,
-        "candidate_extra_skills": extras,
+    }
+
+
+def _skill_labels(job_norm: set[str], job_display: Dict[str, str], cand_norm: set[str], cand_display: Dict[str, str]) -> Dict[str, List[str]]:
+    return {
+        "matched_skills": sorted(job_display[s] for s in job_norm & cand_norm),
+        "missing_skills": sorted(job_display[s] for s in job_norm - cand_norm),
+        "candidate_extra_skills": sorted(cand_display[s] for s in cand_norm - job_norm),
     }
 
 
@@ -129,13 +417,457 @@ def candidate_skill_snapshot(candidate: Candidate) -> list[str]:
     return sorted(display.values(), key=str.lower)
 
 
-def match_for_candidate(db: Session, candidate_id: int, top_k: int = 20, min_score: float = 0.0) -> Tuple[Candidate | None, List[Dict[str, Any]]]:
-    candidate = db.get(Candidate, candidate_id)
+def job_skill_snapshot(job: Job) -> list[str]:
+    _, display = _normalise_skills(job.skills)
+    return sorted(display.values(), key=str.lower)
+
+
+def _load_jobs(db: Session, job_ids: Iterable[int]) -> List[Job]:
+    ids = sorted(job_ids)
+    jobs: List[Job] = []
+    for start in range(0, len(ids), LOAD_CHUNK):
+        jobs.extend(
+            db.query(Job)
+            .options(load_only(Job.id, Job.title, Job.company, Job.location, Job.skills))
+            .filter(Job.id.in_(ids[start:start + LOAD_CHUNK]))
+            .all()
+        )
+    return jobs
+
+
+class CorpusScores(NamedTuple):
+    """Per-job score components aligned with ``ids``."""
+
+    ids: np.ndarray
+    score: np.ndarray
+    skill_score: np.ndarray
+    keyword_hits: np.ndarray
+    coverage: np.ndarray
+    semantic_score: np.ndarray
+
+
+def _candidate_query(
+    db: Session | None, candidate: Candidate, vocabulary: SkillVocabulary, width: int
+) -> Tuple[int, np.ndarray, np.ndarray, np.ndarray | None]:
+    """Return ``(skill count, skill indicator, CV keyword indicator, embedding)`` for a candidate."""
+
+    cand_norm, _ = _normalise_skills(candidate.skills)
+    cand_vector = vocabulary.indicator(vocabulary.lookup(cand_norm), width)
+    cv_vector = vocabulary.indicator(get_keyword_scanner(vocabulary).scan(candidate.cv_text), width)
+
+    embedding = None
+    if candidate.name or cand_norm:  # composed text is non-empty without reading the CV
+        embedding = _indexed_vector(get_candidate_index(), candidate.id)
+    if embedding is None:
+        candidate_text = _compose_candidate_text(candidate)
+        if candidate_text:
+            try:
+                embedding = get_embedding_store().get(db, candidate_text)
+            except Exception:  # pragma: no cover - best effort fallback
+                embedding = None
+    return len(cand_norm), cand_vector, cv_vector, embedding
+
+
+def _skill_components(skills: sparse.csr_matrix, query_size: int, query_vector: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return ``(jaccard, intersection, row sizes)`` of every matrix row against a skill query."""
+
+    intersection = np.asarray(skills @ query_vector, dtype=np.float64)
+    sizes = np.diff(skills.indptr).astype(np.float64)
+    union = sizes + query_size - intersection
+    skill_score = np.zeros(len(sizes), dtype=np.float64)
+    if query_size:
+        np.divide(intersection, union, out=skill_score, where=(sizes > 0) & (union > 0))
+    return skill_score, intersection, sizes
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray | float) -> np.ndarray:
+    out = np.zeros(len(numerator), dtype=np.float64)
+    np.divide(numerator, denominator, out=out, where=np.broadcast_to(np.asarray(denominator) > 0, out.shape))
+    return out
+
+
+def _base_scores(skill_score: np.ndarray, keyword_hits: np.ndarray) -> np.ndarray:
+    return np.minimum(1.0, skill_score + np.minimum(KEYWORD_BONUS_CAP, keyword_hits * KEYWORD_BONUS_STEP))
+
+
+def _semantic(vectors: np.ndarray, embedding: np.ndarray | None) -> np.ndarray:
+    if embedding is None or not len(vectors):
+        return np.zeros(len(vectors), dtype=np.float64)
+    return cosine_to_score(vectors @ embedding).astype(np.float64)
+
+
+def score_corpus(db: Session | None, candidate: Candidate, snap: IndexSnapshot, vocabulary: SkillVocabulary) -> CorpusScores:
+    """Score the candidate against every indexed job with sparse and dense matrix ops.
+
+    Mirrors :func:`score_candidate_to_job`: Jaccard and coverage come from the
+    candidate skill indicator against the CSR skill matrix, keyword hits from
+    the skills mentioned in the CV, and semantic similarity from one matmul.
+    """
+
+    cand_size, cand_vector, cv_vector, embedding = _candidate_query(db, candidate, vocabulary, snap.skills.shape[1])
+    skill_score, intersection, sizes = _skill_components(snap.skills, cand_size, cand_vector)
+    coverage = _ratio(intersection, sizes)
+    keyword_hits = np.asarray(snap.skills @ cv_vector, dtype=np.float64)
+    semantic = _semantic(snap.vectors, embedding)
+    score = np.minimum(1.0, _base_scores(skill_score, keyword_hits) + SEMANTIC_WEIGHT * semantic)
+    return CorpusScores(snap.ids, score, skill_score, keyword_hits.astype(np.int64), coverage, semantic)
+
+
+def rank_corpus(
+    db: Session | None,
+    candidate: Candidate,
+    snap: IndexSnapshot,
+    vocabulary: SkillVocabulary,
+    top_k: int,
+    min_score: float = 0.0,
+    ann: IVFFlatIndex | None = None,
+) -> Tuple[CorpusScores, List[Tuple[int, float]]]:
+    """Like :func:`score_corpus` but skips work for jobs that cannot make the top-k.
+
+    Every score is at least its skill score and at most skill score plus the
+    keyword cap plus the semantic weight. Jobs whose upper bound falls below
+    the k-th best lower bound (or ``min_score``) are dropped before keyword
+    hits are counted, and again before the embedding matmul. Returns the
+    scores of the surviving jobs and ``(position, rounded score)`` of the
+    winners in rank order.
+
+    With an ``ann`` index, jobs that share no skill with the candidate are
+    only kept if the ANN search returns them among its ``ANN_CANDIDATES``
+    nearest neighbours, so the exact matmul covers a bounded set.
+    """
+
+    cand_size, cand_vector, cv_vector, embedding = _candidate_query(db, candidate, vocabulary, snap.skills.shape[1])
+    skill_score, intersection, sizes = _skill_components(snap.skills, cand_size, cand_vector)
+    coverage = _ratio(intersection, sizes)
+
+    floor = max(min_score, kth_largest(skill_score, top_k))
+    rows = np.flatnonzero(can_reach(np.minimum(1.0, skill_score + KEYWORD_BONUS_CAP + SEMANTIC_WEIGHT), floor))
+
+    keyword_hits = np.asarray(snap.skills[rows] @ cv_vector, dtype=np.float64)
+    base = _base_scores(skill_score[rows], keyword_hits)
+    floor = max(floor, kth_largest(base, top_k))
+    keep = can_reach(np.minimum(1.0, base + SEMANTIC_WEIGHT), floor)
+    rows, keyword_hits, base = rows[keep], keyword_hits[keep], base[keep]
+
+    if ann is not None and embedding is not None:
+        nearest = np.zeros(len(snap), dtype=bool)
+        ann_ids, _ = ann.search(embedding, max(top_k, ANN_CANDIDATES))
+        nearest[[snap.rows[job_id] for job_id in ann_ids.tolist() if job_id in snap.rows]] = True
+        keep = (intersection[rows] > 0) | (keyword_hits > 0) | nearest[rows]
+        rows, keyword_hits, base = rows[keep], keyword_hits[keep], base[keep]
+
+    semantic = _semantic(snap.vectors[rows], embedding)
+    score = np.minimum(1.0, base + SEMANTIC_WEIGHT * semantic)
+    scores = CorpusScores(snap.ids[rows], score, skill_score[rows], keyword_hits.astype(np.int64), coverage[rows], semantic)
+    return scores, top_k_rows(scores.ids, scores.score, top_k, min_score)
+
+
+def match_for_candidate(
+    db: Session,
+    candidate_id: int,
+    top_k: int = 20,
+    min_score: float = 0.0,
+    semantic_mode: str = "exact",
+) -> Tuple[Candidate | None, List[Dict[str, Any]]]:
+    if semantic_mode not in SEMANTIC_MODES:
+        raise ValueError(f"semantic_mode must be one of {SEMANTIC_MODES}")
+    # scoring and the result breakdown both scan the CV, so load it with the row
+    candidate = db.get(Candidate, candidate_id, options=[undefer(Candidate.cv_text)])
     if not candidate:
         return None, []
 
-    jobs = db.query(Job).all()
-    results = [score_candidate_to_job(candidate, job) for job in jobs]
-    results = [row for row in results if row["score"] >= min_score]
-    results.sort(key=lambda row: row["score"], reverse=True)
-    return candidate, results[:top_k]
+    # probe first: a rebuild after writes from other processes bumps the cache version
+    index = ensure_job_index(db)
+    revision = current_revision(db, CANDIDATES)
+    cache = get_match_cache()
+    key = cache.key(candidate_id, top_k, min_score, semantic_mode, revision)
+    cached = cache.get(key)
+    if cached is not None:
+        return candidate, cached
+
+    ann = ensure_job_ann(db) if semantic_mode == "ann" else None
+    _current_index(db, get_candidate_index(), CANDIDATES, revision)
+    scores, ranked = rank_corpus(db, candidate, index.snapshot(), index.vocabulary, top_k, min_score, ann)
+    results = build_results(db, candidate, scores, [position for position, _ in ranked])
+    cache.set(key, results)
+    return candidate, results
+
+
+def build_results(
+    db: Session,
+    candidate: Candidate,
+    scores: CorpusScores,
+    positions: Sequence[int],
+    jobs: Dict[int, Job] | None = None,
+) -> List[Dict[str, Any]]:
+    """Turn ranked score rows into response dicts; the only step that touches Job rows."""
+
+    cand_norm, cand_display = _normalise_skills(candidate.skills)
+    job_ids = [int(scores.ids[position]) for position in positions]
+    if jobs is None:
+        jobs = {job.id: job for job in _load_jobs(db, job_ids)}
+    results: List[Dict[str, Any]] = []
+    for position, job_id in zip(positions, job_ids):
+        job = jobs.get(job_id)
+        if job is None:
+            continue
+        job_norm, job_display = _normalise_skills(job.skills)
+        results.append(
+            _result_row(
+                job, job_norm, job_display, cand_norm, cand_display,
+                float(scores.score[position]),
+                float(scores.skill_score[position]),
+                int(scores.keyword_hits[position]),
+                float(scores.coverage[position]),
+                float(scores.semantic_score[position]),
+            )
+        )
+    return results
+
+
+def _candidate_batches(db: Session, candidate_ids: Sequence[int] | None, batch_size: int) -> Iterator[List[Tuple[int, Candidate | None]]]:
+    if candidate_ids is None:
+        for batch in _iter_rows(db, Candidate, batch_size):
+            yield [(c.id, c) for c in batch]
+        return
+    for start in range(0, len(candidate_ids), batch_size):
+        chunk = list(candidate_ids[start:start + batch_size])
+        found = {c.id: c for c in db.query(Candidate).options(undefer(Candidate.cv_text)).filter(Candidate.id.in_(chunk))}
+        yield [(candidate_id, found.get(candidate_id)) for candidate_id in chunk]
+
+
+def _concat_scores(parts: List[CorpusScores]) -> CorpusScores:
+    if not parts:
+        empty = np.zeros(0, dtype=np.float64)
+        return CorpusScores(np.zeros(0, dtype=np.int64), empty, empty, np.zeros(0, dtype=np.int64), empty, empty)
+    return CorpusScores(*(np.concatenate(field) for field in zip(*parts)))
+
+
+def score_candidates_batch(
+    db: Session,
+    candidates: Sequence[Candidate],
+    snap: IndexSnapshot,
+    vocabulary: SkillVocabulary,
+    top_k: int,
+    min_score: float = 0.0,
+    chunk_size: int = MATCH_JOB_CHUNK,
+) -> List[CorpusScores]:
+    """Score several candidates against the whole corpus with matrix-matrix products.
+
+    Jobs are taken ``chunk_size`` rows at a time: skill overlaps and keyword
+    hits are one sparse product each against a candidates-by-skills matrix,
+    and semantic scores one dense ``chunk x dim @ dim x batch`` matmul. Only
+    the rows of each chunk that make a candidate's top-k are kept, so memory
+    is bounded by ``chunk_size x batch`` whatever the corpus size. Returns one
+    :class:`CorpusScores` of those survivors per candidate.
+    """
+
+    width = snap.skills.shape[1]
+    norms = [_normalise_skills(c.skills)[0] for c in candidates]
+    scanner = get_keyword_scanner(vocabulary)
+
+    def query_matrix(ids: List[np.ndarray]) -> sparse.csr_matrix:
+        return skill_rows_to_csr([row_ids[row_ids < width] for row_ids in ids], width)
+
+    skill_query = query_matrix([vocabulary.lookup(norm) for norm in norms]).T.tocsc()
+    cv_query = query_matrix([scanner.scan(c.cv_text) for c in candidates]).T.tocsc()
+    cand_sizes = np.asarray([len(norm) for norm in norms], dtype=np.float64)[None, :]
+
+    embeddings = None
+    texts = [_compose_candidate_text(c) for c in candidates]
+    if len(snap):
+        try:
+            embeddings = get_embedding_store().get_many(db, texts)
+        except Exception:  # pragma: no cover - best effort fallback
+            embeddings = None
+    no_text = [pos for pos, text in enumerate(texts) if not text]
+
+    row_sizes = snap.row_sizes().astype(np.float64)
+    kept: List[List[CorpusScores]] = [[] for _ in candidates]
+    for start in range(0, len(snap), chunk_size):
+        stop = min(start + chunk_size, len(snap))
+        skills = snap.skills[start:stop]
+        intersection = (skills @ skill_query).toarray().astype(np.float64, copy=False)
+        keyword_hits = (skills @ cv_query).toarray().astype(np.float64, copy=False)
+
+        sizes = row_sizes[start:stop, None]
+        union = sizes + cand_sizes - intersection
+        skill_score = np.zeros_like(intersection)
+        np.divide(intersection, union, out=skill_score, where=(sizes > 0) & (cand_sizes > 0) & (union > 0))
+        coverage = np.zeros_like(intersection)
+        np.divide(intersection, np.broadcast_to(sizes, intersection.shape), out=coverage, where=np.broadcast_to(sizes > 0, intersection.shape))
+
+        semantic = np.zeros_like(intersection)
+        if embeddings is not None:
+            semantic = cosine_to_score(snap.vectors[start:stop] @ embeddings.T).astype(np.float64)
+            semantic[:, no_text] = 0.0
+
+        score = np.minimum(1.0, _base_scores(skill_score, keyword_hits) + SEMANTIC_WEIGHT * semantic)
+        ids = snap.ids[start:stop]
+        for col, parts in enumerate(kept):
+            rows = np.asarray([position for position, _ in top_k_rows(ids, score[:, col], top_k, min_score)], dtype=np.int64)
+            parts.append(
+                CorpusScores(
+                    ids[rows], score[rows, col], skill_score[rows, col], keyword_hits[rows, col].astype(np.int64),
+                    coverage[rows, col], semantic[rows, col],
+                )
+            )
+    return [_concat_scores(parts) for parts in kept]
+
+
+def match_many(
+    db: Session,
+    candidate_ids: Sequence[int] | None = None,
+    top_k: int = 20,
+    min_score: float = 0.0,
+    batch_size: int = MATCH_BATCH_SIZE,
+) -> Iterator[Tuple[int, Candidate | None, List[Dict[str, Any]]]]:
+    """Match many candidates (``None`` means all) against one snapshot of the job corpus.
+
+    Yields ``(candidate_id, candidate, results)`` per candidate in request
+    order, or id order for all candidates; unknown ids yield ``None``. Work
+    and memory are bounded by ``batch_size`` candidates times
+    ``MATCH_JOB_CHUNK`` jobs at a time.
+    """
+
+    index = ensure_job_index(db)
+    snap = index.snapshot()
+    for batch in _candidate_batches(db, candidate_ids, batch_size):
+        present = [candidate for _, candidate in batch if candidate is not None]
+        per_candidate = dict(zip((c.id for c in present), score_candidates_batch(db, present, snap, index.vocabulary, top_k, min_score))) if present else {}
+
+        ranked = {candidate_id: top_k_rows(scores.ids, scores.score, top_k, min_score) for candidate_id, scores in per_candidate.items()}
+        job_ids = {int(per_candidate[cid].ids[position]) for cid, rows in ranked.items() for position, _ in rows}
+        jobs = {job.id: job for job in _load_jobs(db, job_ids)}
+
+        for candidate_id, candidate in batch:
+            if candidate is None:
+                yield candidate_id, None, []
+                continue
+            positions = [position for position, _ in ranked[candidate_id]]
+            yield candidate_id, candidate, build_results(db, candidate, per_candidate[candidate_id], positions, jobs)
+        db.expunge_all()
+
+
+def _cv_keyword_hits(
+    db: Session, candidate_ids: np.ndarray, job_norm: set[str], vocabulary: SkillVocabulary
+) -> np.ndarray:
+    """Count job skills mentioned in each candidate's CV, reading only ``(id, cv_text)``.
+
+    Each CV is scanned once for the whole vocabulary (and memoised by the
+    scanner); the count of the job's known skills is then a sorted-array
+    intersection. Job skills the vocabulary has never seen are counted with a
+    small automaton built for this request, so a read never grows the shared
+    vocabulary or invalidates the scanner's memo.
+    """
+
+    hits = np.zeros(len(candidate_ids), dtype=np.float64)
+    if not job_norm or not len(candidate_ids):
+        return hits
+    job_ids = vocabulary.lookup(job_norm)
+    unknown = sorted(skill for skill in job_norm if vocabulary.get(skill) is None)
+    extra = KeywordAutomaton(unknown) if unknown else None
+    scanner = get_keyword_scanner(vocabulary)
+    position = {int(candidate_id): pos for pos, candidate_id in enumerate(candidate_ids.tolist())}
+    ids = sorted(position)
+    for start in range(0, len(ids), LOAD_CHUNK):
+        chunk = ids[start:start + LOAD_CHUNK]
+        for candidate_id, cv_text in db.query(Candidate.id, Candidate.cv_text).filter(Candidate.id.in_(chunk)):
+            if cv_text:
+                found = scanner.scan(cv_text)
+                count = len(np.intersect1d(found, job_ids, assume_unique=True))
+                if extra is not None:
+                    count += len(extra.find(cv_text))
+                hits[position[candidate_id]] = count
+    return hits
+
+
+def rank_candidates(
+    db: Session,
+    job: Job,
+    snap: IndexSnapshot,
+    vocabulary: SkillVocabulary,
+    top_k: int,
+    min_score: float = 0.0,
+) -> Tuple[CorpusScores, List[Tuple[int, float]]]:
+    """Rank indexed candidates for one job with the same model as :func:`score_candidate_to_job`.
+
+    Skill scores come from the candidate CSR matrix and semantic scores from
+    the candidate embedding matrix. Keyword hits need the CV text, so they
+    are bounded by the job's own keyword cap first and only counted for
+    candidates that can still make the top-k.
+    """
+
+    job_norm, _ = _normalise_skills(job.skills)
+    job_vector = vocabulary.indicator(vocabulary.lookup(job_norm), snap.skills.shape[1])
+    skill_score, intersection, _ = _skill_components(snap.skills, len(job_norm), job_vector)
+    coverage = _ratio(intersection, float(len(job_norm)))
+    keyword_cap = min(KEYWORD_BONUS_CAP, len(job_norm) * KEYWORD_BONUS_STEP)
+
+    floor = max(min_score, kth_largest(skill_score, top_k))
+    rows = np.flatnonzero(can_reach(np.minimum(1.0, skill_score + keyword_cap + SEMANTIC_WEIGHT), floor))
+
+    # the indexed vector spares loading the deferred description
+    embedding = _indexed_vector(get_job_index(), job.id) if job.title or job_norm else None
+    if embedding is None:
+        try:
+            embedding = get_embedding_store().get(db, _compose_job_text(job))
+        except Exception:  # pragma: no cover - best effort fallback
+            embedding = None
+    semantic = _semantic(snap.vectors[rows], embedding)
+
+    floor = max(floor, kth_largest(np.minimum(1.0, skill_score[rows] + SEMANTIC_WEIGHT * semantic), top_k))
+    keep = can_reach(np.minimum(1.0, np.minimum(1.0, skill_score[rows] + keyword_cap) + SEMANTIC_WEIGHT * semantic), floor)
+    rows, semantic = rows[keep], semantic[keep]
+
+    keyword_hits = _cv_keyword_hits(db, snap.ids[rows], job_norm, vocabulary)
+    score = np.minimum(1.0, _base_scores(skill_score[rows], keyword_hits) + SEMANTIC_WEIGHT * semantic)
+    scores = CorpusScores(snap.ids[rows], score, skill_score[rows], keyword_hits.astype(np.int64), coverage[rows], semantic)
+    return scores, top_k_rows(scores.ids, scores.score, top_k, min_score)
+
+
+def match_for_job(db: Session, job_id: int, top_k: int = 20, min_score: float = 0.0) -> Tuple[Job | None, List[Dict[str, Any]]]:
+    """Top candidates for a job; only the returned candidates are loaded, without ``cv_text``.
+
+    The job's ``description`` stays unloaded when the job index already holds its embedding.
+    """
+
+    job = db.get(Job, job_id)
+    if not job:
+        return None, []
+
+    index = ensure_candidate_index(db)
+    _current_index(db, get_job_index(), JOBS)
+    scores, ranked = rank_candidates(db, job, index.snapshot(), index.vocabulary, top_k, min_score)
+
+    positions = [position for position, _ in ranked]
+    candidate_ids = [int(scores.ids[position]) for position in positions]
+    candidates = {
+        c.id: c
+        for c in db.query(Candidate)
+        .options(load_only(Candidate.id, Candidate.name, Candidate.skills))
+        .filter(Candidate.id.in_(candidate_ids))
+    }
+
+    job_norm, job_display = _normalise_skills(job.skills)
+    results: List[Dict[str, Any]] = []
+    for position, candidate_id in zip(positions, candidate_ids):
+        candidate = candidates.get(candidate_id)
+        if candidate is None:
+            continue
+        cand_norm, cand_display = _normalise_skills(candidate.skills)
+        results.append(
+            {
+                "candidate_id": candidate.id,
+                "candidate_name": candidate.name,
+                **_score_fields(
+                    float(scores.score[position]),
+                    float(scores.skill_score[position]),
+                    int(scores.keyword_hits[position]),
+                    float(scores.coverage[position]),
+                    float(scores.semantic_score[position]),
+                ),
+                **_skill_labels(job_norm, job_display, cand_norm, cand_display),
+            }
+        )
+    return job, results
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from typing import List, Tuple
+
+import numpy as np
+
+# Scores are reported rounded to 4 decimals; bounds keep this much slack so a
+# pruned job can never round up into a tie with the k-th result.
+SCORE_EPSILON = 1.5e-4
+
+
+def kth_largest(values: np.ndarray, k: int) -> float:
+    """The k-th largest value, or ``-inf`` when there are fewer than ``k``."""
+
+    if k <= 0 or len(values) < k:
+        return float("-inf")
+    return float(np.partition(values, len(values) - k)[len(values) - k])
+
+
+def can_reach(upper_bound: np.ndarray, floor: float) -> np.ndarray:
+    """Mask of rows whose best possible score could still make the cut."""
+
+    return upper_bound + SCORE_EPSILON >= floor
+
+
+def top_k(ids: np.ndarray, scores: np.ndarray, k: int, min_score: float = 0.0) -> List[Tuple[int, float]]:
+    """Return ``(position, rounded score)`` for the best ``k`` rows, ties broken by id.
+
+    ``argpartition`` narrows the rows to those within rounding distance of the
+    k-th raw score, so only a handful of Python tuples are ever sorted.
+    """
+
+    if k <= 0 or not len(scores):
+        return []
+    positions = np.flatnonzero(scores + SCORE_EPSILON >= min_score)
+    if len(positions) > k:
+        cutoff = kth_largest(scores[positions], k)
+        positions = positions[can_reach(scores[positions], cutoff - SCORE_EPSILON)]
+
+    ranked = []
+    for position in positions.tolist():
+        score = round(float(scores[position]), 4)
+        if score >= min_score:
+            ranked.append((-score, int(ids[position]), position))
+    ranked.sort()
+    return [(position, -neg_score) for neg_score, _, position in ranked[:k]]
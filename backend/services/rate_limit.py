@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Dict, Optional
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    """Token bucket whose rate backs off on 429s and recovers on successes.
+
+    ``acquire`` blocks until a token is available and no back-off window is
+    open. A 429 halves the rate (down to ``min_rate``) and closes the bucket
+    for the server's ``Retry-After``; every success adds back ``recovery``
+    requests/second up to the configured rate.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        min_rate: float = 0.2,
+        recovery: float = 0.05,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.min_rate = min(min_rate, rate)
+        self.recovery = recovery
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._blocked_until = 0.0
+        self.throttled = 0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """Take one token, sleeping as needed; returns the seconds waited."""
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._refill(now)
+                if now < self._blocked_until:
+                    wait = self._blocked_until - now
+                elif self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return waited
+                else:
+                    wait = (1.0 - self._tokens) / self.rate
+            self._sleep(wait)
+            waited += wait
+
+    def backoff(self, retry_after: Optional[float] = None) -> None:
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self.throttled += 1
+            self.rate = max(self.min_rate, self.rate / 2.0)
+            self._tokens = 0.0
+            pause = retry_after if retry_after is not None else 1.0 / self.rate
+            self._blocked_until = max(self._blocked_until, now + pause)
+
+    def success(self) -> None:
+        with self._lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.recovery)
+
+
+class HostRateLimiter:
+    """One :class:`TokenBucket` per host, created on first use."""
+
+    def __init__(self, rate: float, burst: int = 1, **bucket_options) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._options = bucket_options
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def bucket(self, url: str) -> TokenBucket:
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.rate, self.burst, **self._options)
+            return bucket
+
+    def acquire(self, url: str) -> float:
+        return self.bucket(url).acquire()
+
+    def backoff(self, url: str, retry_after: Optional[float] = None) -> None:
+        self.bucket(url).backoff(retry_after)
+
+    def success(self, url: str) -> None:
+        self.bucket(url).success()
+
+    @property
+    def throttled(self) -> int:
+        with self._lock:
+            return sum(bucket.throttled for bucket in self._buckets.values())
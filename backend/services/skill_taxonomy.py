@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+TAXONOMY_PATH = os.getenv("SKILL_TAXONOMY_PATH", os.path.join(os.path.dirname(__file__), "skill_taxonomy.json"))
+# Next to the package by default, so the artefact does not depend on the working directory.
+TAXONOMY_CACHE_DIR = os.getenv("SKILL_TAXONOMY_CACHE_DIR", os.path.join(os.path.dirname(__file__), ".taxonomy"))
+# Bump when the tokenizer or the compiled layout changes so old artefacts are ignored.
+ARTEFACT_FORMAT = 3
+# Tokens on either side of a guarded phrase searched for its context words.
+NEAR_WINDOW = 12
+
+_TOKEN_RE = re.compile(r"[\w\+\#\.]+", re.UNICODE)
+
+
+def _raw_tokens(text: str) -> List[str]:
+    tokens: List[str] = []
+    for token in _TOKEN_RE.findall(text or ""):
+        token = token.rstrip(".")
+        if token:
+            tokens.append(token)
+    return tokens
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens; "c++", "c#", ".net" and "node.js" survive, trailing full stops do not."""
+
+    return [token.lower() for token in _raw_tokens(text)]
+
+
+class Guard:
+    """Extra evidence an ambiguous phrase ("rust", "s3") needs before it counts as a skill.
+
+    ``cased`` lists the only spellings accepted as written ("Rust", not "rust
+    on the gate"); ``near`` lists words of which one must occur within
+    ``NEAR_WINDOW`` tokens ("s3" next to "aws" or "bucket"). Both apply when
+    both are given.
+    """
+
+    def __init__(self, cased: Iterable[str] = (), near: Iterable[str] = ()) -> None:
+        self.cased = sorted({tuple(_raw_tokens(spelling)) for spelling in cased if _raw_tokens(spelling)})
+        self.near = sorted({token for word in near for token in tokenize(word)})
+        self._cased = set(self.cased)
+        self._near = set(self.near)
+
+    def allows(self, raw: List[str], tokens: List[str], start: int, end: int) -> bool:
+        if self._cased and tuple(raw[start:end]) not in self._cased:
+            return False
+        if self._near:
+            window = tokens[max(0, start - NEAR_WINDOW):start] + tokens[end:end + NEAR_WINDOW]
+            return any(token in self._near for token in window)
+        return True
+
+    def to_json(self) -> Dict[str, List[Any]]:
+        return {"cased": [list(tokens) for tokens in self.cased], "near": self.near}
+
+    @classmethod
+    def from_json(cls, data: Mapping[str, Any]) -> "Guard":
+        return cls([" ".join(tokens) for tokens in data.get("cased", ())], data.get("near", ()))
+
+
+class SkillTaxonomy:
+    """Canonical skills and their aliases compiled into a token trie.
+
+    Every name and alias is tokenized like CV text, so "scikit-learn",
+    "scikit learn" and "sklearn" all end on a node labelled
+    ``scikit-learn``. :meth:`extract` walks the CV tokens once, taking the
+    longest phrase that starts at each position and whose :class:`Guard`, if
+    any, is satisfied.
+    """
+
+    def __init__(
+        self,
+        names: List[str],
+        children: List[Dict[str, int]],
+        terminal: List[int],
+        version: str,
+        guards: Optional[Dict[int, Guard]] = None,
+    ) -> None:
+        self.names = names
+        self.children = children
+        self.terminal = terminal
+        self.version = version
+        self.guards = guards or {}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def extract(self, text: str) -> List[str]:
+        raw = _raw_tokens(text)
+        tokens = [token.lower() for token in raw]
+        children, terminal, guards = self.children, self.terminal, self.guards
+        found: set[int] = set()
+        position = 0
+        while position < len(tokens):
+            node = 0
+            hits: List[Tuple[int, int, int]] = []
+            cursor = position
+            while cursor < len(tokens):
+                node = children[node].get(tokens[cursor], -1)
+                if node < 0:
+                    break
+                cursor += 1
+                if terminal[node] >= 0:
+                    hits.append((node, terminal[node], cursor))
+            for node, match, end in reversed(hits):
+                guard = guards.get(node)
+                if guard is None or guard.allows(raw, tokens, position, end):
+                    found.add(match)
+                    position = end
+                    break
+            else:
+                position += 1
+        return sorted(self.names[index] for index in found)
+
+
+def compile_taxonomy(
+    skills: Mapping[str, Iterable[str]], version: str = "", guards: Optional[Mapping[str, Mapping[str, Any]]] = None
+) -> SkillTaxonomy:
+    """Build the trie for ``{canonical name: [aliases]}``; canonical names win alias clashes.
+
+    ``guards`` maps a name or alias to the ``{"cased": [...], "near": [...]}``
+    evidence it needs, see :class:`Guard`.
+    """
+
+    names = sorted({name.strip().lower() for name in skills if name and name.strip()})
+    index = {name: position for position, name in enumerate(names)}
+    children: List[Dict[str, int]] = [{}]
+    terminal: List[int] = [-1]
+
+    def insert(phrase: str, target: int) -> Optional[int]:
+        tokens = tokenize(phrase)
+        if not tokens:
+            return None
+        node = 0
+        for token in tokens:
+            following = children[node].get(token)
+            if following is None:
+                following = len(children)
+                children[node][token] = following
+                children.append({})
+                terminal.append(-1)
+            node = following
+        if terminal[node] < 0:
+            terminal[node] = target
+        return node
+
+    nodes: Dict[str, int] = {}
+    for name in names:
+        node = insert(name, index[name])
+        if node is not None:
+            nodes[name] = node
+    for name, aliases in sorted(skills.items()):
+        target = index.get(name.strip().lower())
+        if target is None:
+            continue
+        for alias in sorted(aliases or ()):
+            node = insert(alias, target)
+            if node is not None:
+                nodes.setdefault(" ".join(tokenize(alias)), node)
+
+    compiled: Dict[int, Guard] = {}
+    for phrase, rule in sorted((guards or {}).items()):
+        node = nodes.get(" ".join(tokenize(phrase)))
+        if node is not None:
+            compiled[node] = Guard(rule.get("cased", ()), rule.get("near", ()))
+    return SkillTaxonomy(names, children, terminal, version, compiled)
+
+
+def _artefact_path(version: str, cache_dir: str) -> str:
+    return os.path.join(cache_dir, f"skill_taxonomy-{version}.json")
+
+
+def _read_artefact(path: str, version: str) -> Optional[SkillTaxonomy]:
+    # Plain JSON, never pickle: a file dropped into the cache dir must not be able to run code.
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("format") != ARTEFACT_FORMAT or data.get("version") != version:
+        return None
+    names, children, terminal = data.get("names"), data.get("children"), data.get("terminal")
+    guards = data.get("guards", {})
+    if not (isinstance(names, list) and isinstance(children, list) and isinstance(terminal, list)) or len(children) != len(terminal):
+        return None
+    if not isinstance(guards, dict):
+        return None
+    return SkillTaxonomy(names, children, terminal, version, {int(node): Guard.from_json(rule) for node, rule in guards.items()})
+
+
+def save_artefact(taxonomy: SkillTaxonomy, cache_dir: str = TAXONOMY_CACHE_DIR) -> str:
+    path = _artefact_path(taxonomy.version, cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    payload = {
+        "format": ARTEFACT_FORMAT,
+        "version": taxonomy.version,
+        "names": taxonomy.names,
+        "children": taxonomy.children,
+        "terminal": taxonomy.terminal,
+        "guards": {str(node): guard.to_json() for node, guard in taxonomy.guards.items()},
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump(payload, handle, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_taxonomy(path: str = TAXONOMY_PATH, cache_dir: str = TAXONOMY_CACHE_DIR) -> SkillTaxonomy:
+    """Load the compiled artefact for the taxonomy source at ``path``, compiling it on first use.
+
+    The source is JSON ``{"skills": {canonical: [aliases]}, "guards": {phrase:
+    rule}}``. Its hash is the taxonomy version, so editing the file
+    invalidates the artefact.
+    """
+
+    with open(path, "rb") as handle:
+        raw = handle.read()
+    version = hashlib.sha256(raw + f":{ARTEFACT_FORMAT}".encode()).hexdigest()[:16]
+
+    taxonomy = _read_artefact(_artefact_path(version, cache_dir), version)
+    if taxonomy is not None:
+        return taxonomy
+
+    data = json.loads(raw)
+    taxonomy = compile_taxonomy(data.get("skills", data), version, data.get("guards"))
+    try:
+        save_artefact(taxonomy, cache_dir)
+    except OSError:  # pragma: no cover - read-only filesystem, keep the in-memory copy
+        pass
+    return taxonomy
+
+
+@lru_cache(maxsize=1)
+def get_skill_taxonomy() -> SkillTaxonomy:
+    return load_taxonomy()
+
+
+def import_esco(csv_path: str, base_path: str = TAXONOMY_PATH) -> Dict[str, Any]:
+    """Merge the ESCO skills export (``skills_en.csv``) into the bundled taxonomy source.
+
+    ESCO lists about 14k skills with their ``altLabels`` (one per line) as
+    aliases. Bundled entries and guards win clashes, so their curated aliases
+    stay; the result is the ``{"skills", "guards"}`` JSON ``load_taxonomy`` reads.
+    """
+
+    with open(base_path, encoding="utf-8") as handle:
+        base = json.load(handle)
+    skills: Dict[str, List[str]] = {name: list(aliases) for name, aliases in base.get("skills", {}).items()}
+    taken = set(skills) | {" ".join(tokenize(alias)) for aliases in skills.values() for alias in aliases}
+    with open(csv_path, encoding="utf-8-sig", newline="") as handle:
+        for row in csv.DictReader(handle):
+            name = (row.get("preferredLabel") or "").strip().lower()
+            if not name or name in skills or row.get("status", "released") != "released":
+                continue
+            aliases = []
+            for label in (row.get("altLabels") or "").splitlines():
+                label = label.strip().lower()
+                if label and label != name and " ".join(tokenize(label)) not in taken:
+                    aliases.append(label)
+                    taken.add(" ".join(tokenize(label)))
+            skills[name] = sorted(set(aliases))
+            taken.add(name)
+    return {"skills": dict(sorted(skills.items())), "guards": base.get("guards", {})}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile the skill taxonomy, or build a larger one from ESCO.")
+    parser.add_argument("--from-esco", metavar="CSV", help="ESCO skills_en.csv to merge into the bundled taxonomy")
+    parser.add_argument("--out", metavar="JSON", help="where to write the merged source (use it as SKILL_TAXONOMY_PATH)")
+    args = parser.parse_args()
+
+    if args.from_esco:
+        if not args.out:
+            parser.error("--from-esco needs --out")
+        merged = import_esco(args.from_esco)
+        with open(args.out, "w", encoding="utf-8") as handle:
+            json.dump(merged, handle, ensure_ascii=False, indent=1)
+        compiled = load_taxonomy(args.out)
+    else:
+        compiled = load_taxonomy()
+    print(f"Compiled {len(compiled)} skills (version {compiled.version}) into {_artefact_path(compiled.version, TAXONOMY_CACHE_DIR)}")
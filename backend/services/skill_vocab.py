@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+
+class SkillVocabulary:
+    """Append-only mapping between normalised skill labels and dense integer ids."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._ids: Dict[str, int] = {}
+        self._labels: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def add(self, skill: str) -> int:
+        skill_id = self._ids.get(skill)
+        if skill_id is not None:
+            return skill_id
+        with self._lock:
+            skill_id = self._ids.get(skill)
+            if skill_id is None:
+                skill_id = len(self._labels)
+                self._labels.append(skill)
+                self._ids[skill] = skill_id
+            return skill_id
+
+    def add_many(self, skills: Iterable[str]) -> np.ndarray:
+        return np.asarray(sorted({self.add(skill) for skill in skills}), dtype=np.int32)
+
+    def get(self, skill: str) -> Optional[int]:
+        return self._ids.get(skill)
+
+    def lookup(self, skills: Iterable[str]) -> np.ndarray:
+        """Ids of the known skills in ``skills``; unknown labels are skipped, not added."""
+
+        found = {self._ids[skill] for skill in skills if skill in self._ids}
+        return np.asarray(sorted(found), dtype=np.int32)
+
+    def label(self, skill_id: int) -> str:
+        return self._labels[skill_id]
+
+    def labels(self) -> List[str]:
+        return list(self._labels)
+
+    def indicator(self, skill_ids: np.ndarray, size: int) -> np.ndarray:
+        """Dense 0/1 column vector over the first ``size`` ids."""
+
+        vector = np.zeros(size, dtype=np.float32)
+        if len(skill_ids):
+            vector[skill_ids[skill_ids < size]] = 1.0
+        return vector
+
+
+_VOCABULARY = SkillVocabulary()
+
+
+def get_skill_vocabulary() -> SkillVocabulary:
+    return _VOCABULARY
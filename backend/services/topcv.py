@@ -1,8 +1,9 @@
 # scrape_topcv_company.py  (phiên bản chống 429)
+import os
 import time
 import re
 import random
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
 from urllib.parse import urljoin, urlparse
 
 import requests
@@ -11,6 +12,11 @@ import pandas as pd
 from urllib3.util.retry import Retry
 from requests.adapters import HTTPAdapter
 
+from .crawl_sinks import DEFAULT_BATCH_SIZE, export_excel, open_sink
+from .crawl_state import CrawlState, listing_fingerprint
+from .http_cache import HttpCache, Memo, normalize_url
+from .http_replay import RecordingAdapter, ResponseArchive
+
 BASE = "https://www.topcv.vn"
 HEADERS = {
     # giữ UA thật; có thể xoay vòng nếu cần
@@ -23,9 +29,16 @@ HEADERS = {
     "Connection": "keep-alive",
 }
 
-def build_session() -> requests.Session:
+def build_session(rate_limiter=None, pool_maxsize: int = 50, http_cache=None,
+                  record_to: Optional[str] = None, transport=None) -> requests.Session:
+    # record_to: lưu mọi response 200 vào thư mục archive (xem http_replay.py)
+    # transport: adapter thay cho mạng thật, ví dụ http_replay.ReplayAdapter để chạy offline
     s = requests.Session()
     s.headers.update(HEADERS)
+    # có rate_limiter thì get_html tự xử lý 429 (backoff chung cho mọi luồng)
+    s.rate_limiter = rate_limiter
+    # có http_cache thì get_html đọc/ghi cache trên đĩa và gửi conditional GET
+    s.http_cache = http_cache
 
     # Retry cho lỗi tạm thời và 429
     retry = Retry(
@@ -34,12 +47,20 @@ def build_session() -> requests.Session:
         read=3,
         status=6,
         backoff_factor=1.2,               # backoff cơ bản
-        status_forcelist=(429, 500, 502, 503, 504),
+        status_forcelist=(500, 502, 503, 504) if rate_limiter else (429, 500, 502, 503, 504),
         allowed_methods=frozenset(["GET", "HEAD"]),
         raise_on_status=False,
         respect_retry_after_header=True,  # tôn trọng Retry-After
     )
-    adapter = HTTPAdapter(max_retries=retry, pool_connections=20, pool_maxsize=50)
+    if transport is not None:
+        s.mount("https://", transport)
+        s.mount("http://", transport)
+        return s
+    if record_to:
+        adapter = RecordingAdapter(ResponseArchive(record_to), max_retries=retry,
+                                   pool_connections=20, pool_maxsize=pool_maxsize)
+    else:
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=20, pool_maxsize=pool_maxsize)
     s.mount("https://", adapter)
     s.mount("http://", adapter)
 
@@ -62,9 +83,34 @@ def smart_sleep(min_s=1.2, max_s=2.8):
     time.sleep(random.uniform(min_s, max_s))
 
 def get_soup(session: requests.Session, url: str) -> BeautifulSoup:
+    return BeautifulSoup(get_html(session, url), "lxml")
+
+def get_html(session: requests.Session, url: str) -> str:
+    return fetch_html(session, url)[0]
+
+def fetch_html(session: requests.Session, url: str) -> Tuple[str, bool]:
+    # trả (html, downloaded): downloaded=False khi trang lấy từ cache hoặc server trả 304
     # vòng lặp thủ công để xử lý 429 với jitter bổ sung
+    limiter = getattr(session, "rate_limiter", None)
+    cache = getattr(session, "http_cache", None)
+    cached = cache.lookup(url) if cache is not None else None
+    if cached is not None and cache.is_fresh(cached):
+        # còn trong TTL của loại trang → không gửi request
+        cache.count("hits")
+        return cached.body, False
+    conditional = cached.conditional_headers() if cached is not None else {}
+
     for attempt in range(1, 6):
-        r = session.get(url, timeout=30)
+        if limiter is not None:
+            limiter.acquire(url)
+        r = session.get(url, timeout=30, headers=conditional or None)
+        if r.status_code == 304 and cached is not None:
+            # server xác nhận chưa đổi → dùng body đã lưu, gia hạn TTL
+            if limiter is not None:
+                limiter.success(url)
+            cache.count("revalidated")
+            cache.refresh(cached)
+            return cached.body, False
         if r.status_code == 429:
             retry_after = r.headers.get("Retry-After")
             if retry_after:
@@ -74,20 +120,59 @@ def get_soup(session: requests.Session, url: str) -> BeautifulSoup:
                     wait = 6 * attempt
             else:
                 wait = 6 * attempt
+            if limiter is not None:
+                # giảm tốc độ và chặn cả host, không ngủ cố định trong luồng này
+                print(f"[WARN] 429 tại {url} → tạm dừng host {wait}s (attempt {attempt})")
+                limiter.backoff(url, wait)
+                continue
             # jitter
             wait = wait + random.uniform(0.5, 2.0)
             print(f"[WARN] 429 tại {url} → ngủ {wait:.1f}s (attempt {attempt})")
             time.sleep(wait)
             continue
         r.raise_for_status()
-        return BeautifulSoup(r.text, "lxml")
+        if limiter is not None:
+            limiter.success(url)
+        if cache is not None:
+            cache.count("misses")
+            cache.store(url, r.text, r.headers.get("ETag"), r.headers.get("Last-Modified"))
+        return r.text, True
     # lần cuối: raise
     r.raise_for_status()
-    return BeautifulSoup("", "lxml")
+    return "", True
+
+# ------------ Parser backends ------------
+# "bs4": các hàm BeautifulSoup bên dưới (bản gốc, dễ sửa khi TopCV đổi giao diện)
+# "lxml": topcv_lxml.py, XPath biên dịch sẵn, nhanh hơn nhiều; kết quả phải giống "bs4"
+DEFAULT_PARSER = os.getenv("TOPCV_PARSER", "lxml")
+
+class ParserBackend(NamedTuple):
+    search: Callable[[str], List[Dict]]
+    job: Callable[[str], Dict]
+    company: Callable[[str], Dict]
+
+def get_parser_backend(name: Optional[str] = None) -> ParserBackend:
+    name = name or DEFAULT_PARSER
+    if name == "bs4":
+        return ParserBackend(
+            lambda html: parse_search_results(BeautifulSoup(html, "lxml")),
+            lambda html: parse_job_detail(BeautifulSoup(html, "lxml")),
+            lambda html: parse_company(BeautifulSoup(html, "lxml")),
+        )
+    if name == "lxml":
+        from .topcv_lxml import parse_company_html, parse_job_detail_html, parse_search_html
+        return ParserBackend(parse_search_html, parse_job_detail_html, parse_company_html)
+    raise ValueError(f"Unknown TopCV parser backend {name!r}; use 'bs4' or 'lxml'")
+
+def parse_page(parser: Optional[str], kind: str, html: str):
+    # kind: "search" / "job" / "company"; hàm cấp module để gửi được sang process pool
+    return getattr(get_parser_backend(parser), kind)(html)
 
 # ------------ Search page ------------
-def parse_search_page(session: requests.Session, url: str) -> List[Dict]:
-    soup = get_soup(session, url)
+def parse_search_page(session: requests.Session, url: str, parser: Optional[str] = None) -> List[Dict]:
+    return get_parser_backend(parser).search(get_html(session, url))
+
+def parse_search_results(soup: BeautifulSoup) -> List[Dict]:
     jobs = []
     for job in soup.select("div.job-item-search-result"):
         a_title = job.select_one("h3.title a[href]")
@@ -172,10 +257,24 @@ def extract_company_link_from_job(soup: BeautifulSoup) -> Optional[str]:
     cand = soup.select_one("a.company[href]") or soup.select_one("a[href*='/cong-ty/']")
     return urljoin(BASE, cand["href"]) if cand and cand.has_attr("href") else None
 
-def scrape_job_detail(session: requests.Session, job_url: str) -> Dict:
-    soup = get_soup(session, job_url)
-    smart_sleep()  # nghỉ nhẹ giữa các trang
-
+DETAIL_FIELDS = [
+    "detail_title", "detail_salary", "detail_location",
+    "detail_experience", "deadline", "tags", "desc_mota",
+    "desc_yeucau", "desc_quyenloi", "working_addresses",
+    "working_times", "company_url_from_job"
+]
+COMPANY_FIELDS = [
+    "company_name_full", "company_website", "company_size",
+    "company_industry", "company_address", "company_description"
+]
+
+def scrape_job_detail(session: requests.Session, job_url: str, parser: Optional[str] = None) -> Dict:
+    html, downloaded = fetch_html(session, job_url)
+    if downloaded:
+        smart_sleep()  # nghỉ nhẹ giữa các trang; cache hit / 304 thì không cần
+    return get_parser_backend(parser).job(html)
+
+def parse_job_detail(soup: BeautifulSoup) -> Dict:
     title = text(soup.select_one(".job-detail__info--title, h1"))
     salary = pick_info_value(soup, "Mức lương")
     location = pick_info_value(soup, "Địa điểm")
@@ -203,19 +302,15 @@ def scrape_job_detail(session: requests.Session, job_url: str) -> Dict:
     }
 
 # ------------ Company page ------------
-def scrape_company(session: requests.Session, company_url: Optional[str]) -> Dict:
+def scrape_company(session: requests.Session, company_url: Optional[str], parser: Optional[str] = None) -> Dict:
     if not company_url:
-        return {
-            "company_name_full": None,
-            "company_website": None,
-            "company_size": None,
-            "company_industry": None,
-            "company_address": None,
-            "company_description": None,
-        }
-    soup = get_soup(session, company_url)
-    smart_sleep()
+        return {k: None for k in COMPANY_FIELDS}
+    html, downloaded = fetch_html(session, company_url)
+    if downloaded:
+        smart_sleep()
+    return get_parser_backend(parser).company(html)
 
+def parse_company(soup: BeautifulSoup) -> Dict:
     # name
     company_name = None
     for css in ["h1.company-name", "h1.title", "div.company-header h1", "div.company-info h1",
@@ -293,17 +388,89 @@ def scrape_company(session: requests.Session, company_url: Optional[str]) -> Dic
     }
 
 # ------------ Pipeline ------------
-def crawl_to_dataframe(query_url_template: str, start_page: int = 1, end_page: int = 1,
-                       delay_between_pages=(0.5 , 1)) -> pd.DataFrame:
-    rows: List[Dict] = []
+COLUMNS = [
+    "title", "detail_title",
+    "job_url",
+    "company", "company_name_full",
+    "company_url", "company_url_from_job",
+    "salary_list", "detail_salary",
+    "address_list", "detail_location",
+    "exp_list", "detail_experience",
+    "deadline", "tags",
+    "working_addresses", "working_times",
+    "desc_mota", "desc_yeucau", "desc_quyenloi",
+    "company_website", "company_size", "company_industry",
+    "company_address", "company_description",
+]
+
+def rows_to_dataframe(rows: List[Dict]) -> pd.DataFrame:
+    df = pd.DataFrame(rows)
+    # sắp xếp cột
+    cols = [c for c in COLUMNS if c in df.columns]
+    return df.loc[:, cols] if cols else df
+
+def crawl_to_dataframe(query_url_template: str, start_page: int = 1, end_page: int = 1, **options) -> pd.DataFrame:
+    # giữ toàn bộ row trong RAM; crawl lớn thì dùng crawl_to_file
+    return rows_to_dataframe(list(iter_crawl(query_url_template, start_page, end_page, **options)))
+
+def crawl_to_file(output_path: str, query_url_template: str, start_page: int = 1, end_page: int = 1,
+                  batch_size: int = DEFAULT_BATCH_SIZE, **options) -> int:
+    # ghi từng lô row ra .jsonl / .csv / .parquet trong lúc crawl → RAM không tăng theo số job
+    with open_sink(output_path, COLUMNS, batch_size) as sink:
+        sink.write_all(iter_crawl(query_url_template, start_page, end_page, **options))
+        sink.flush()
+        return sink.rows_written
+
+def iter_crawl(query_url_template: str, start_page: int = 1, end_page: int = 1,
+               delay_between_pages=(0.5 , 1), max_in_flight: int = 1,
+               requests_per_second: float = 2.0, cache_dir: Optional[str] = None,
+               state_path: Optional[str] = None, incremental: bool = False,
+               resume: bool = True, parser: Optional[str] = None,
+               parse_workers: int = 0, record_to: Optional[str] = None) -> Iterator[Dict]:
+    # cache_dir: lưu response trên đĩa để lần crawl sau chủ yếu là cache hit / 304
+    http_cache = HttpCache(cache_dir) if cache_dir else None
+    # state_path: checkpoint SQLite → chạy lại sau crash thì tiếp tục từ trang dở dang;
+    # incremental=True: job có listing không đổi thì dùng lại row đã lưu, không mở trang chi tiết
+    state = CrawlState(state_path) if state_path else None
+    # parse_workers > 0: luồng chỉ tải trang, process pool parse (pipeline 2 tầng, chạy song song)
+    if max_in_flight > 1 or parse_workers > 0:
+        # chế độ song song: nhịp độ do token bucket quyết định, không smart_sleep
+        from .topcv_crawler import iter_crawl_concurrent
+        try:
+            yield from iter_crawl_concurrent(query_url_template, start_page, end_page,
+                                             max_in_flight=max_in_flight, requests_per_second=requests_per_second,
+                                             http_cache=http_cache, state=state, incremental=incremental,
+                                             resume=resume, parser=parser, parse_workers=parse_workers,
+                                             record_to=record_to)
+        finally:
+            if state is not None:
+                state.close()
+        return
+
+    try:
+        yield from _iter_sequential(query_url_template, start_page, end_page, delay_between_pages,
+                                    http_cache, state, incremental, resume, parser, record_to)
+    finally:
+        if state is not None:
+            state.close()
+
+def _iter_sequential(query_url_template, start_page, end_page, delay_between_pages,
+                     http_cache, state, incremental, resume, parser, record_to) -> Iterator[Dict]:
     seen_jobs = set()
+    companies = Memo()  # một công ty chỉ scrape một lần mỗi lượt crawl
+    run = state.start_run(query_url_template, start_page, resume) if state is not None else None
+    if run is not None and run.resumed:
+        print(f"[INFO] Tiếp tục lượt crawl #{run.id} từ trang {run.next_page}")
+        yield from state.run_rows(run)
+        start_page = run.next_page
 
-    s = build_session()
+    s = build_session(http_cache=http_cache, record_to=record_to)
 
     for page in range(start_page, end_page + 1):
         url = query_url_template.format(page=page)
         print(f"[INFO] Crawling search page {page}: {url}")
-        jobs = parse_search_page(s, url)
+        html, downloaded = fetch_html(s, url)
+        jobs = get_parser_backend(parser).search(html)
 
         if not jobs:
             print(f"[INFO] Trang {page} không còn job — dừng sớm.")
@@ -316,61 +483,64 @@ def crawl_to_dataframe(query_url_template: str, start_page: int = 1, end_page: i
                 continue
             seen_jobs.add(job_id)
 
+            if run is not None:
+                known = state.lookup(job_id)
+                if known is not None and known.run_id == run.id:
+                    continue  # đã lưu trong lượt này trước khi crash
+                fingerprint = listing_fingerprint(j)
+                if incremental and known is not None and known.fingerprint == fingerprint:
+                    yield state.reuse(run, job_id, j, known, run.next_position())
+                    continue
+
             # chi tiết job
+            detail_ok = True
             try:
-                detail = scrape_job_detail(s, job_url)
+                detail = scrape_job_detail(s, job_url, parser)
             except Exception as e:
                 print(f"[WARN] Lỗi job detail {job_url}: {e}")
-                detail = {k: None for k in [
-                    "detail_title", "detail_salary", "detail_location",
-                    "detail_experience", "deadline", "tags", "desc_mota",
-                    "desc_yeucau", "desc_quyenloi", "working_addresses",
-                    "working_times", "company_url_from_job"
-                ]}
+                detail = {k: None for k in DETAIL_FIELDS}
+                detail_ok = False
 
             company_url = detail.get("company_url_from_job") or j.get("company_url")
 
             # chi tiết công ty
             try:
-                comp = scrape_company(s, company_url)
+                # bỏ query (?ref=...) để mọi link tới cùng công ty dùng chung memo và cache
+                company_key = normalize_url(company_url, keep_query=False) if company_url else None
+                comp = (companies.get_or_fetch(company_key, lambda: scrape_company(s, company_key, parser))
+                        if company_key else scrape_company(s, company_url, parser))
             except Exception as e:
                 print(f"[WARN] Lỗi company {company_url}: {e}")
-                comp = {k: None for k in [
-                    "company_name_full", "company_website", "company_size",
-                    "company_industry", "company_address", "company_description"
-                ]}
+                comp = {k: None for k in COMPANY_FIELDS}
 
             row = {**j, **detail, **comp}
-            rows.append(row)
+            if run is not None:
+                # job lỗi lưu fingerprint rỗng → incremental sẽ scrape lại
+                state.record(run, job_id, fingerprint if detail_ok else "", row, run.next_position())
+            yield row
 
-        # nghỉ giữa các trang (random)
-        smart_sleep(*delay_between_pages)
+        if run is not None:
+            state.page_done(run, page)
+        # nghỉ giữa các trang (random); trang search lấy từ cache / 304 thì không tải lại gì từ server
+        if downloaded:
+            smart_sleep(*delay_between_pages)
 
-    df = pd.DataFrame(rows)
-    # sắp xếp cột
-    cols = [
-        "title", "detail_title",
-        "job_url",
-        "company", "company_name_full",
-        "company_url", "company_url_from_job",
-        "salary_list", "detail_salary",
-        "address_list", "detail_location",
-        "exp_list", "detail_experience",
-        "deadline", "tags",
-        "working_addresses", "working_times",
-        "desc_mota", "desc_yeucau", "desc_quyenloi",
-        "company_website", "company_size", "company_industry",
-        "company_address", "company_description",
-    ]
-    cols = [c for c in cols if c in df.columns]
-    return df.loc[:, cols] if cols else df
+    if run is not None:
+        state.finish_run(run)
 
 if __name__ == "__main__":
-    qtpl = "https://www.topcv.vn/tim-viec-lam-data-analyst?type_keyword=1&page={page}&sba=1"
-    df = crawl_to_dataframe(qtpl, start_page=1, end_page=1, delay_between_pages=(0.5, 1)) # thay end_page=5 nếu muốn nhiều trang hơn (5 trang)
-    print(df.head())
-    df.to_csv("../data-files/topcv_data_analyst_jobs.csv", index=False, encoding="utf-8-sig")
-    print("Saved CSV: topcv_data_analyst_jobs.csv")
+    import sys
 
-    df.to_excel("../data-files/topcv_data_analyst_jobs.xlsx")
-    print("Saved Excel: topcv_data_analyst_jobs.xlsx")
\ No newline at end of file
+    qtpl = "https://www.topcv.vn/tim-viec-lam-data-analyst?type_keyword=1&page={page}&sba=1"
+    # đuôi file quyết định định dạng: .csv / .jsonl / .parquet (ghi theo lô trong lúc crawl)
+    out = "../data-files/topcv_data_analyst_jobs.csv"
+    n = crawl_to_file(out, qtpl, start_page=1, end_page=1, delay_between_pages=(0.5, 1), # thay end_page=5 nếu muốn nhiều trang hơn (5 trang)
+                      max_in_flight=1, requests_per_second=2.0,  # max_in_flight > 1 để crawl song song
+                      cache_dir="../data-files/.http_cache",
+                      state_path="../data-files/topcv_crawl_state.sqlite",  # crash thì chạy lại để tiếp tục
+                      incremental=False)  # True: chỉ scrape job mới hoặc đã đổi
+    print(f"Saved {n} rows: {out}")
+
+    if "--excel" in sys.argv:
+        # bước hậu xử lý tuỳ chọn, đọc lại cả file vào RAM
+        print(f"Saved Excel: {export_excel(out)}")
@@ -0,0 +1,360 @@
+from __future__ import annotations
+
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Deque, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+from .crawl_state import CrawlRun, CrawlState, listing_fingerprint
+from .http_cache import HttpCache, Memo, normalize_url
+from .rate_limit import HostRateLimiter
+from .topcv import (
+    COMPANY_FIELDS,
+    DETAIL_FIELDS,
+    build_session,
+    get_html,
+    parse_page,
+)
+
+# Jobs queued per worker before the crawl waits for finished rows to be consumed.
+READ_AHEAD = 4
+
+
+# parse(kind, html) với kind là "search", "job" hoặc "company"
+PageParser = Callable[[str, str], Any]
+
+
+class ParseStage:
+    """Process pool that parses fetched pages, behind a bounded queue.
+
+    Fetch threads hand raw HTML to ``submit`` and move on to the next
+    download; whoever needs the fields waits on the returned future. At most
+    ``workers + max_queued`` pages are admitted at once; a fetcher that finds
+    the queue full blocks before submitting, so fetching slows down to the
+    speed of parsing instead of piling pages up in memory.
+    """
+
+    def __init__(self, workers: int, max_queued: Optional[int] = None, parser: Optional[str] = None) -> None:
+        self.workers = max(1, workers)
+        self.max_queued = self.workers if max_queued is None else max(0, max_queued)
+        self.parser = parser
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_queued)
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def submit(self, kind: str, html: str) -> Future:
+        self._slots.acquire()
+        try:
+            future = self._pool.submit(parse_page, self.parser, kind, html)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def parse(self, kind: str, html: str) -> Any:
+        return self.submit(kind, html).result()
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+
+class Checkpoint(NamedTuple):
+    """Where a worker records its row in the crawl state once it is scraped."""
+
+    state: CrawlState
+    run: CrawlRun
+    path: str
+    fingerprint: str
+    position: int
+
+
+def scrape_job_row(session: requests.Session, job: Dict, companies: Optional[Memo] = None,
+                   checkpoint: Optional[Checkpoint] = None, parse: Optional[PageParser] = None) -> Dict:
+    """Detail and company page for one search result, merged like the sequential crawl.
+
+    ``companies`` memoises company pages across the run; they are fetched at
+    their normalised URL so tracking query strings share one memo and cache entry.
+    ``parse`` turns fetched HTML into fields (in this thread by default).
+    """
+
+    parse = parse or partial(parse_page, None)
+    job_url = job["job_url"]
+    detail_ok = True
+    try:
+        detail = parse("job", get_html(session, job_url))
+    except Exception as e:
+        print(f"[WARN] Lỗi job detail {job_url}: {e}")
+        detail = {k: None for k in DETAIL_FIELDS}
+        detail_ok = False
+
+    company_url = _company_url(job, detail)
+    try:
+        if not company_url:
+            comp = {k: None for k in COMPANY_FIELDS}
+        elif companies is None:
+            comp = parse("company", get_html(session, company_url))
+        else:
+            company_key = normalize_url(company_url, keep_query=False)
+            comp = companies.get_or_fetch(company_key, lambda: parse("company", get_html(session, company_key)))
+    except Exception as e:
+        print(f"[WARN] Lỗi company {company_url}: {e}")
+        comp = {k: None for k in COMPANY_FIELDS}
+
+    return _merge_row(job, detail, comp, checkpoint, detail_ok)
+
+
+def _company_url(job: Dict, detail: Dict) -> Optional[str]:
+    return detail.get("company_url_from_job") or job.get("company_url")
+
+
+def _merge_row(job: Dict, detail: Dict, comp: Dict, checkpoint: Optional[Checkpoint], detail_ok: bool) -> Dict:
+    row = {**job, **detail, **comp}
+    if checkpoint is not None:
+        # job lỗi lưu fingerprint rỗng → incremental sẽ scrape lại
+        checkpoint.state.record(checkpoint.run, checkpoint.path,
+                                checkpoint.fingerprint if detail_ok else "", row, checkpoint.position)
+    return row
+
+
+class StagedRow(NamedTuple):
+    """A job whose pages are fetched and queued in the :class:`ParseStage`.
+
+    The fetch thread returns this as soon as the HTML is handed over; the
+    consumer waits on the parse futures and calls ``merge``, which records
+    the checkpoint and resolves ``row`` for the page bookkeeping.
+    """
+
+    job: Dict
+    detail: Future
+    company: Future
+    checkpoint: Optional[Checkpoint]
+    row: Future
+
+    def ready(self) -> bool:
+        return self.detail.done() and self.company.done()
+
+    def merge(self) -> Dict:
+        detail_ok = True
+        try:
+            detail = self.detail.result()
+        except Exception as e:
+            print(f"[WARN] Lỗi job detail {self.job['job_url']}: {e}")
+            detail = {k: None for k in DETAIL_FIELDS}
+            detail_ok = False
+        try:
+            comp = self.company.result()
+        except Exception as e:
+            print(f"[WARN] Lỗi company {_company_url(self.job, detail)}: {e}")
+            comp = {k: None for k in COMPANY_FIELDS}
+        row = _merge_row(self.job, detail, comp, self.checkpoint, detail_ok)
+        self.row.set_result(row)
+        return row
+
+
+def fetch_job_pages(pool: ThreadPoolExecutor, stage: ParseStage, session: requests.Session, job: Dict,
+                    companies: Memo, checkpoint: Optional[Checkpoint], row: Future) -> StagedRow:
+    """Fetch a job's detail page and queue it for parsing without waiting for the fields.
+
+    The company page depends on the parsed detail, so its fetch is chained
+    onto the detail parse and runs on ``pool`` once the URL is known.
+    """
+
+    try:
+        detail = stage.submit("job", get_html(session, job["job_url"]))
+    except Exception as e:
+        detail = Future()
+        detail.set_exception(e)
+    company: Future = Future()
+
+    def fetch_company(done: Future) -> None:
+        try:
+            company_url = job.get("company_url") if done.exception() else _company_url(job, done.result())
+            _forward(pool.submit(_fetch_company, stage, session, company_url, companies), company)
+        except Exception as e:  # pool đã đóng: báo lỗi thay vì để consumer chờ mãi
+            company.set_exception(e)
+
+    detail.add_done_callback(fetch_company)
+    return StagedRow(job, detail, company, checkpoint, row)
+
+
+def _fetch_company(stage: ParseStage, session: requests.Session, company_url: Optional[str], companies: Memo) -> Any:
+    if not company_url:
+        return {k: None for k in COMPANY_FIELDS}
+    company_key = normalize_url(company_url, keep_query=False)
+    return companies.get_or_fetch(company_key, lambda: stage.submit("company", get_html(session, company_key)))
+
+
+def _forward(source: Future, target: Future) -> None:
+    """Resolve ``target`` with ``source``'s outcome, following futures that resolve to futures."""
+
+    def copy(done: Future) -> None:
+        if done.exception() is not None:
+            target.set_exception(done.exception())
+        elif isinstance(done.result(), Future):
+            _forward(done.result(), target)
+        else:
+            target.set_result(done.result())
+
+    source.add_done_callback(copy)
+
+
+def crawl_concurrent(query_url_template: str, start_page: int = 1, end_page: int = 1, **options) -> List[Dict]:
+    return list(iter_crawl_concurrent(query_url_template, start_page, end_page, **options))
+
+
+def iter_crawl_concurrent(
+    query_url_template: str,
+    start_page: int = 1,
+    end_page: int = 1,
+    max_in_flight: int = 8,
+    requests_per_second: float = 2.0,
+    session: Optional[requests.Session] = None,
+    http_cache: Optional[HttpCache] = None,
+    state: Optional[CrawlState] = None,
+    incremental: bool = False,
+    resume: bool = True,
+    parser: Optional[str] = None,
+    parse_workers: int = 0,
+    record_to: Optional[str] = None,
+) -> Iterator[Dict]:
+    """Crawl like ``iter_crawl`` with ``max_in_flight`` worker threads fetching at once.
+
+    Search pages are read in order on the calling thread while a thread pool
+    fetches the detail and company pages of earlier results. Every request
+    takes a token from a per-host bucket, which is the only pacing: there
+    are no fixed sleeps, and a 429 slows down the whole host instead of just
+    the thread that saw it. Rows are yielded in the sequential crawl's order
+    as soon as they and every row before them are done; at most
+    ``READ_AHEAD`` jobs per worker are queued, so memory stays flat.
+    Each company page is fetched once per run, however many openings it has.
+    With ``state`` the run is checkpointed and resumable exactly like the
+    sequential crawl, including ``incremental`` reuse of unchanged postings.
+
+    With ``parse_workers > 0`` the crawl becomes a two-stage pipeline: the
+    threads only fetch, and a :class:`ParseStage` process pool parses, so
+    CPU-bound extraction scales with cores instead of sharing the GIL.
+    """
+
+    if session is None:
+        session = build_session(HostRateLimiter(requests_per_second, burst=max_in_flight), pool_maxsize=max_in_flight,
+                                http_cache=http_cache, record_to=record_to)
+    else:
+        if getattr(session, "rate_limiter", None) is None:
+            session.rate_limiter = HostRateLimiter(requests_per_second, burst=max_in_flight)
+        if http_cache is not None:
+            session.http_cache = http_cache
+
+    stage = ParseStage(parse_workers, parser=parser) if parse_workers > 0 else None
+    parse = stage.parse if stage is not None else partial(parse_page, parser)
+    try:
+        yield from _crawl_pages(session, query_url_template, start_page, end_page, max_in_flight, parse,
+                                state, incremental, resume, stage)
+    finally:
+        if stage is not None:
+            stage.close()
+
+
+def _crawl_pages(
+    session: requests.Session,
+    query_url_template: str,
+    start_page: int,
+    end_page: int,
+    max_in_flight: int,
+    parse: PageParser,
+    state: Optional[CrawlState],
+    incremental: bool,
+    resume: bool,
+    stage: Optional[ParseStage] = None,
+) -> Iterator[Dict]:
+    companies = Memo()
+    seen_jobs = set()
+    pending: Deque[Future] = deque()
+    open_pages: List[Tuple[int, List[Future]]] = []
+    run = state.start_run(query_url_template, start_page, resume) if state is not None else None
+    if run is not None and run.resumed:
+        print(f"[INFO] Tiếp tục lượt crawl #{run.id} từ trang {run.next_page}")
+        yield from state.run_rows(run)
+        start_page = run.next_page
+
+    with ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="topcv") as pool:
+        for page in range(start_page, end_page + 1):
+            page_futures: List[Future] = []
+            url = query_url_template.format(page=page)
+            print(f"[INFO] Crawling search page {page}: {url}")
+            jobs = parse("search", get_html(session, url))
+            if not jobs:
+                print(f"[INFO] Trang {page} không còn job — dừng sớm.")
+                break
+
+            for j in jobs:
+                job_id = urlparse(j["job_url"]).path
+                if job_id in seen_jobs:
+                    continue
+                seen_jobs.add(job_id)
+                checkpoint = None
+                if run is not None:
+                    known = state.lookup(job_id)
+                    if known is not None and known.run_id == run.id:
+                        continue
+                    fingerprint = listing_fingerprint(j)
+                    if incremental and known is not None and known.fingerprint == fingerprint:
+                        pending.append(_done(state.reuse(run, job_id, j, known, run.next_position())))
+                        page_futures.append(pending[-1])
+                        continue
+                    checkpoint = Checkpoint(state, run, job_id, fingerprint, run.next_position())
+                if stage is None:
+                    pending.append(pool.submit(scrape_job_row, session, j, companies, checkpoint, parse))
+                    page_futures.append(pending[-1])
+                else:
+                    # luồng fetch chỉ tải trang; consumer chờ kết quả parse rồi mới ghép row
+                    page_futures.append(Future())
+                    pending.append(pool.submit(fetch_job_pages, pool, stage, session, j, companies, checkpoint,
+                                               page_futures[-1]))
+                # đủ việc cho mọi luồng thì trả bớt row đã xong ra ngoài trước khi đọc tiếp
+                while len(pending) > READ_AHEAD * max_in_flight:
+                    yield _row(pending.popleft())
+                while pending and _ready(pending[0]):
+                    yield _row(pending.popleft())
+
+            if run is not None:
+                open_pages.append((page, page_futures))
+                _checkpoint_pages(state, run, open_pages)
+
+        while pending:
+            yield _row(pending.popleft())
+    if run is not None:
+        _checkpoint_pages(state, run, open_pages, wait=True)
+        state.finish_run(run)
+
+
+def _checkpoint_pages(state: CrawlState, run: CrawlRun, open_pages: List[Tuple[int, List[Future]]],
+                      wait: bool = False) -> None:
+    """Advance the run's last page over the leading pages whose jobs are all stored."""
+
+    while open_pages and (wait or all(future.done() for future in open_pages[0][1])):
+        page, futures = open_pages.pop(0)
+        for future in futures:
+            future.result()
+        state.page_done(run, page)
+
+
+def _ready(future: Future) -> bool:
+    if not future.done():
+        return False
+    return future.exception() is not None or not isinstance(future.result(), StagedRow) or future.result().ready()
+
+
+def _row(future: Future) -> Dict:
+    result = future.result()
+    return result.merge() if isinstance(result, StagedRow) else result
+
+
+def _done(row: Dict) -> Future:
+    future: Future = Future()
+    future.set_result(row)
+    return future
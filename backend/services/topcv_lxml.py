@@ -0,0 +1,257 @@
+# topcv_lxml.py — parser nhanh cho trang TopCV: lxml + XPath biên dịch sẵn
+# Kết quả phải giống hệt parse_search_results / parse_job_detail / parse_company (BeautifulSoup),
+# xem tests/test_topcv.py::test_lxml_parser_matches_beautifulsoup.
+import re
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+
+import lxml.html
+from lxml import etree
+
+from .topcv import BASE
+
+
+def _cls(name: str) -> str:
+    # tương đương selector CSS ".name"
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def _xp(path: str) -> etree.XPath:
+    return etree.XPath(path)
+
+
+# giống get_text của BeautifulSoup: bỏ comment và nội dung script/style/template
+_TEXT = _xp("descendant-or-self::text()[not(parent::script or parent::style) and not(ancestor::template)]")
+
+
+def text(el) -> Optional[str]:
+    if el is None:
+        return None
+    t = " ".join(part.strip() for part in _TEXT(el) if part.strip())
+    return re.sub(r"\s+", " ", t) if t else None
+
+
+def _first(xpath: etree.XPath, el):
+    found = xpath(el)
+    return found[0] if found else None
+
+
+# lxml từ chối chuỗi unicode có khai báo encoding; html đã được giải mã nên bỏ khai báo đi
+_XML_DECLARATION = re.compile(r"^\s*<\?xml[^>]*\?>")
+
+
+def _empty_doc():
+    return lxml.html.document_fromstring("<html></html>")
+
+
+def _doc(html: str):
+    # trang trắng / chỉ có comment (vd. trang chặn bot) → tài liệu rỗng như BeautifulSoup, không raise
+    html = _XML_DECLARATION.sub("", html or "", count=1)
+    if not html.strip():
+        return _empty_doc()
+    try:
+        return lxml.html.document_fromstring(html)
+    except etree.ParserError:
+        return _empty_doc()
+
+
+# ------------ Search page ------------
+_SEARCH_ITEMS = _xp(f"//div[{_cls('job-item-search-result')}]")
+_SEARCH_TITLE = _xp(f".//h3[{_cls('title')}]//a[@href]")
+_SEARCH_COMPANY_LINK = _xp(f".//a[{_cls('company')}][@href]")
+_SEARCH_COMPANY_NAME = _xp(f".//a[{_cls('company')}]//*[{_cls('company-name')}]")
+_SEARCH_SALARY = _xp(f".//label[{_cls('title-salary')}]")
+_SEARCH_ADDRESS = _xp(f".//label[{_cls('address')}]//*[{_cls('city-text')}]")
+_SEARCH_EXP = _xp(f".//label[{_cls('exp')}]//span")
+
+
+def parse_search_html(html: str) -> List[Dict]:
+    jobs = []
+    for job in _SEARCH_ITEMS(_doc(html)):
+        a_title = _first(_SEARCH_TITLE, job)
+        if a_title is None:
+            continue
+        comp_a = _first(_SEARCH_COMPANY_LINK, job)
+        jobs.append({
+            "title": text(a_title),
+            "job_url": urljoin(BASE, a_title.get("href")),
+            "company": text(_first(_SEARCH_COMPANY_NAME, job)),
+            "company_url": urljoin(BASE, comp_a.get("href")) if comp_a is not None else None,
+            "salary_list": text(_first(_SEARCH_SALARY, job)),
+            "address_list": text(_first(_SEARCH_ADDRESS, job)),
+            "exp_list": text(_first(_SEARCH_EXP, job)),
+        })
+    return jobs
+
+
+# ------------ Job detail page ------------
+_JOB_TITLE = _xp(f"(//*[{_cls('job-detail__info--title')}] | //h1)[1]")
+_INFO_SECTIONS = _xp(f"//*[{_cls('job-detail__info--section')}]")
+_INFO_TITLE = _xp(f".//*[{_cls('job-detail__info--section-content-title')}]")
+_INFO_VALUE = _xp(f".//*[{_cls('job-detail__info--section-content-value')}]")
+_DEADLINES = _xp(f"//*[{_cls('job-detail__info--deadline')} or {_cls('job-detail__information-detail--actions-label')}]")
+_TAGS = _xp(f"//*[{_cls('job-tags')}]//a[{_cls('item')}]")
+_DESC_ITEMS = _xp(f"//*[{_cls('job-description')}]//*[{_cls('job-description__item')}]")
+_DESC_H3 = _xp(".//h3")
+_DESC_CONTENT = _xp(f".//*[{_cls('job-description__item--content')}]")
+_ITEM_HEADINGS = _xp(f"//*[{_cls('job-description__item')}]//h3")
+_ITEM_WRAP = _xp(f"ancestor::*[{_cls('job-description__item')}][1]")
+_ITEM_LINES = _xp(f".//*[{_cls('job-description__item--content')}]//*[self::div or self::li]")
+_COMPANY_LINKS = [_xp(f"//a[{_cls('company')}][@href]"), _xp("//a[contains(@href, '/cong-ty/')]")]
+_DATE = re.compile(r"(\d{1,2}/\d{1,2}/\d{4})")
+
+
+def parse_job_detail_html(html: str) -> Dict:
+    doc = _doc(html)
+
+    # một lượt qua các section thông tin: giữ section đầu tiên cho mỗi tiêu đề
+    info: Dict[str, Optional[str]] = {}
+    for sec in _INFO_SECTIONS(doc):
+        key = (text(_first(_INFO_TITLE, sec)) or "").lower()
+        if key not in info:
+            v = _first(_INFO_VALUE, sec)
+            info[key] = text(v) if v is not None else text(sec)
+
+    deadline = None
+    for el in _DEADLINES(doc):
+        t = text(el)
+        if t and "Hạn nộp" in t:
+            m = _DATE.search(t)
+            deadline = m.group(1) if m else t
+            break
+
+    tags = [t for t in (text(a) for a in _TAGS(doc)) if t]
+
+    desc_blocks = {}
+    for item in _DESC_ITEMS(doc):
+        content = _first(_DESC_CONTENT, item)
+        if content is not None:
+            desc_blocks[text(_first(_DESC_H3, item)) or ""] = text(content)
+
+    # địa điểm và thời gian làm việc trong cùng một lượt qua các h3
+    addrs, times = [], []
+    for h3 in _ITEM_HEADINGS(doc):
+        heading = text(h3) or ""
+        targets = [out for label, out in (("Địa điểm làm việc", addrs), ("Thời gian làm việc", times)) if label in heading]
+        if not targets:
+            continue
+        wrap = _first(_ITEM_WRAP, h3)
+        if wrap is None:
+            continue
+        values = [val for val in (text(d) for d in _ITEM_LINES(wrap)) if val]
+        for out in targets:
+            out.extend(values)
+
+    # ưu tiên a.company rồi mới tới link /cong-ty/ bất kỳ
+    company_link = next((a for a in (_first(xpath, doc) for xpath in _COMPANY_LINKS) if a is not None), None)
+
+    return {
+        "detail_title": text(_first(_JOB_TITLE, doc)),
+        "detail_salary": info.get("mức lương"),
+        "detail_location": info.get("địa điểm"),
+        "detail_experience": info.get("kinh nghiệm"),
+        "deadline": deadline,
+        "tags": "; ".join(tags) if tags else None,
+        "desc_mota": desc_blocks.get("Mô tả công việc"),
+        "desc_yeucau": desc_blocks.get("Yêu cầu ứng viên"),
+        "desc_quyenloi": desc_blocks.get("Quyền lợi"),
+        "working_addresses": "; ".join(addrs) if addrs else None,
+        "working_times": "; ".join(times) if times else None,
+        "company_url_from_job": urljoin(BASE, company_link.get("href")) if company_link is not None else None,
+    }
+
+
+# ------------ Company page ------------
+_NAME_CANDIDATES = [
+    _xp(f"//h1[{_cls('company-name')}]"),
+    _xp(f"//h1[{_cls('title')}]"),
+    _xp(f"//div[{_cls('company-header')}]//h1"),
+    _xp(f"//div[{_cls('company-info')}]//h1"),
+    _xp("//meta[@property='og:title']"),
+    _xp("//meta[@property='og:site_name']"),
+    _xp("//title"),
+]
+_CONTAINERS = [
+    _xp(f"//div[{_cls('company-overview')}]"),
+    _xp(f"//div[{_cls('company-detail')}]"),
+    _xp(f"//div[{_cls('company-profile')}]"),
+    _xp("//section[@id='company']"),
+    _xp(f"//section[{_cls('company-info')}]"),
+    _xp(f"//div[{_cls('box-intro-company')}]"),
+    _xp(f"//div[{_cls('company-info-container')}]"),
+]
+_INFO_ROWS = _xp(
+    ".//*[self::li or " + " or ".join(_cls(c) for c in ("row", "item", "info-item", "company-info-item", "dl", "d-flex")) + "]"
+)
+_ROW_LABEL = _xp("(.//strong | .//b)[1]")
+_DESCRIPTIONS = [
+    _xp(f"//div[{_cls('company-description')}]"),
+    _xp("//div[@id='company-description']"),
+    _xp(f"//div[{_cls('box-intro-company')}]"),
+    _xp(f"//div[{_cls('company-introduction')}]"),
+    _xp(f"//div[{_cls('description')}]"),
+    _xp(f"//section[{_cls('company-description')}]"),
+    _xp("//div[@id='readmore-company']"),
+    _xp("//div[@id='readmore-content']"),
+]
+_LABEL_VALUE = re.compile(r"^([^:：]+)[:：]\s*(.+)$")
+
+
+def parse_company_html(html: str) -> Dict:
+    doc = _doc(html)
+
+    company_name = None
+    for xpath in _NAME_CANDIDATES:
+        el = _first(xpath, doc)
+        if el is not None:
+            company_name = el.get("content") if el.tag == "meta" else text(el)
+            if company_name:
+                company_name = re.sub(r"\s*\|\s*TopCV.*$", "", company_name, flags=re.I)
+                break
+
+    container = next((c for c in (_first(xpath, doc) for xpath in _CONTAINERS) if c is not None), doc)
+
+    website = size = industry = address = None
+    for row in _INFO_ROWS(container):
+        row_text = text(row) or ""
+        label = value = None
+        strong = _first(_ROW_LABEL, row)
+        if strong is not None:
+            label = text(strong)
+            value = row_text
+            if label:
+                value = re.sub(re.escape(label), "", value, flags=re.I).strip(" :-–—")
+        else:
+            m = _LABEL_VALUE.match(row_text)
+            if m:
+                label, value = m.group(1).strip(), m.group(2).strip()
+
+        if not label or not value:
+            continue
+
+        ln = re.sub(r"\s+", " ", label.lower())
+        if "website" in ln or "trang web" in ln:
+            website = value
+        elif "quy mô" in ln or "size" in ln or "nhân sự" in ln:
+            size = value
+        elif "lĩnh vực" in ln or "industry" in ln or "ngành" in ln:
+            industry = value
+        elif "địa chỉ" in ln or "address" in ln:
+            address = value
+
+    description = None
+    for xpath in _DESCRIPTIONS:
+        el = _first(xpath, doc)
+        if el is not None:
+            description = text(el)
+            if description:
+                break
+
+    return {
+        "company_name_full": company_name,
+        "company_website": website,
+        "company_size": size,
+        "company_industry": industry,
+        "company_address": address,
+        "company_description": description,
+    }
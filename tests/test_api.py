@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from typing import Generator
+import json
+from contextlib import contextmanager
+from typing import Generator, Iterator, List
 from pathlib import Path
 import sys
 
@@ -11,14 +13,22 @@ if str(PROJECT_ROOT) not in sys.path:
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, update
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from backend.main import app
 from backend.models import candidate as _candidate  # noqa: F401 ensure model registration
 from backend.models import job as _job  # noqa: F401 ensure model registration
+from backend.models.candidate import Candidate
 from backend.models.database import Base, get_db
+from backend.models.job import Job
+from backend.services.corpus_revision import CANDIDATES, JOBS, bump_revision, current_revision
+from backend.services.cv_cache import get_parsed_cv_cache
+from backend.services.embedding_store import get_embedding_store
+from backend.services.job_ingest import IngestReport, ingest_rows
+from backend.services.match_cache import MemoryBackend, get_match_cache
+from backend.services.match_index import get_candidate_index, get_job_index
 
 # Use in-memory SQLite with a static pool to share the same connection.
 engine = create_engine(
@@ -47,6 +57,25 @@ def client() -> Generator[TestClient, None, None]:
 
     app.dependency_overrides.clear()
     Base.metadata.drop_all(bind=engine)
+    get_job_index().clear()
+    get_candidate_index().clear()
+    get_match_cache().clear()
+    get_parsed_cv_cache().clear()
+    get_embedding_store().clear()
+
+
+@contextmanager
+def _recorded_statements() -> Iterator[List[str]]:
+    statements: List[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany) -> None:
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
 
 
 def test_job_crud_flow(client: TestClient) -> None:
@@ -184,3 +213,545 @@ def test_unsupported_cv_upload(client: TestClient) -> None:
     )
     assert response.status_code == 400
     assert "Unsupported file type" in response.text
+
+
+def test_docx_cv_upload_parses_in_worker(client: TestClient) -> None:
+    import io
+
+    from docx import Document
+
+    document = Document()
+    document.add_paragraph("Jane Doe")
+    document.add_paragraph("Backend engineer: Python, FastAPI, K8s and PostgreSQL.")
+    buffer = io.BytesIO()
+    document.save(buffer)
+
+    response = client.post(
+        "/candidates/upload",
+        files={"file": ("resume.docx", buffer.getvalue(), "application/vnd.openxmlformats-officedocument.wordprocessingml.document")},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["name"] == "Jane Doe"
+    assert body["skills"] == ["fastapi", "kubernetes", "postgresql", "python"]
+
+
+def _docx_bytes(*paragraphs: str) -> bytes:
+    import io
+
+    from docx import Document
+
+    document = Document()
+    for paragraph in paragraphs:
+        document.add_paragraph(paragraph)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def test_bulk_cv_upload_processes_files_and_zip_in_background(client: TestClient) -> None:
+    import io
+    import zipfile
+
+    from backend.services.bulk_upload import wait_for_batch
+
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as bundle:
+        bundle.writestr("cvs/bob-smith.docx", _docx_bytes("Bob Smith", "Go and Kubernetes"))
+        bundle.writestr("cvs/notes.txt", "not a CV")
+    docx_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+    response = client.post(
+        "/candidates/upload/bulk",
+        files=[
+            ("files", ("jane.docx", _docx_bytes("Jane Doe", "Python and SQL"), docx_type)),
+            ("files", ("batch.zip", archive.getvalue(), "application/zip")),
+        ],
+    )
+    assert response.status_code == 202
+    body = response.json()
+    assert body["total"] == 3
+
+    wait_for_batch(body["batch_id"], timeout=60)
+    status = client.get(f"/candidates/upload/bulk/{body['batch_id']}").json()
+    assert status["status"] == "completed"
+    assert (status["processed"], status["succeeded"], status["failed"]) == (3, 2, 1)
+    assert status["failures"][0]["filename"] == "notes.txt"
+    assert "Unsupported file type" in status["failures"][0]["error"]
+
+    names = {candidate["name"]: candidate["skills"] for candidate in client.get("/candidates").json()}
+    assert names == {"Jane Doe": ["python", "sql"], "Bob Smith": ["kubernetes"]}
+
+    assert client.get("/candidates/upload/bulk/unknown").status_code == 404
+
+
+def test_startup_fails_only_bulk_batches_with_a_stale_heartbeat(client: TestClient) -> None:
+    from datetime import datetime, timedelta, timezone
+
+    from backend.main import app
+    from backend.models.upload_batch import UploadBatch
+    from backend.services.bulk_upload import BULK_UPLOAD_STALE_AFTER, INTERRUPTED_ERROR
+
+    now = datetime.now(timezone.utc)
+    stale = now - timedelta(seconds=BULK_UPLOAD_STALE_AFTER + 60)
+    with TestingSessionLocal() as db:
+        db.add_all([
+            UploadBatch(id="queued", status="queued", total=4, failures=[], owner="dead:1:a", heartbeat_at=stale),
+            UploadBatch(id="halfway", status="processing", total=4, processed=2, succeeded=2, failures=[], owner="dead:1:a", heartbeat_at=stale),
+            # another live worker, mid-batch during a rolling restart
+            UploadBatch(id="elsewhere", status="processing", total=4, processed=1, succeeded=1, failures=[], owner="peer:2:b", heartbeat_at=now),
+            UploadBatch(id="done", status="completed", total=1, processed=1, succeeded=1, failures=[]),
+        ])
+        db.commit()
+
+    with TestClient(app):
+        pass
+
+    queued = client.get("/candidates/upload/bulk/queued").json()
+    halfway = client.get("/candidates/upload/bulk/halfway").json()
+    assert (queued["status"], queued["failed"]) == ("failed", 4)
+    assert (halfway["status"], halfway["succeeded"], halfway["failed"]) == ("failed", 2, 2)
+    assert halfway["failures"] == [{"filename": "", "error": INTERRUPTED_ERROR}]
+    assert client.get("/candidates/upload/bulk/elsewhere").json()["status"] == "processing"
+    assert client.get("/candidates/upload/bulk/done").json()["status"] == "completed"
+
+
+def test_batch_supervisor_keeps_running_batches_alive(client: TestClient) -> None:
+    from datetime import datetime, timedelta, timezone
+
+    from backend.models.upload_batch import UploadBatch
+    from backend.services import bulk_upload
+
+    long_ago = datetime.now(timezone.utc) - timedelta(days=1)
+    with TestingSessionLocal() as db:
+        db.add(UploadBatch(id="mine", status="processing", total=2, failures=[], owner=bulk_upload.WORKER_ID, heartbeat_at=long_ago))
+        db.commit()
+
+    bulk_upload._RUNNING["mine"] = None
+    try:
+        assert bulk_upload.BatchSupervisor(TestingSessionLocal).run_once() == 0
+    finally:
+        bulk_upload._RUNNING.pop("mine")
+    with TestingSessionLocal() as db:
+        batch = db.get(UploadBatch, "mine")
+        assert batch.status == "processing"
+        assert batch.heartbeat_at.replace(tzinfo=timezone.utc) > long_ago.replace(tzinfo=timezone.utc)
+
+
+def test_repeat_cv_upload_is_served_from_parse_cache(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    from backend.services import cv_executor
+
+    content = _docx_bytes("Jane Doe", "Python and Docker")
+    docx_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+    first = client.post("/candidates/upload", files={"file": ("a.docx", content, docx_type)})
+    assert first.status_code == 200
+
+    # A saturated parser would answer 503, so a 200 proves the parse was skipped.
+    busy = cv_executor.ParseExecutor(max_workers=1, max_queued=0)
+    busy._in_flight = busy.capacity
+    monkeypatch.setattr(cv_executor, "_EXECUTOR", busy)
+    second = client.post("/candidates/upload", files={"file": ("b.docx", content, docx_type)})
+    assert second.status_code == 200
+    assert second.json()["skills"] == first.json()["skills"] == ["docker", "python"]
+    assert second.json()["id"] != first.json()["id"]
+
+
+def test_cv_upload_returns_503_when_parser_is_saturated(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    from backend.services import cv_executor
+
+    busy = cv_executor.ParseExecutor(max_workers=1, max_queued=0)
+    busy._in_flight = busy.capacity
+    monkeypatch.setattr(cv_executor, "_EXECUTOR", busy)
+
+    response = client.post("/candidates/upload", files={"file": ("resume.pdf", b"%PDF-1.4", "application/pdf")})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_job_embeddings_follow_writes(client: TestClient) -> None:
+    from backend.models.embedding import EmbeddingRecord
+
+    job_payload = {
+        "title": "Data Engineer",
+        "company": "Acme",
+        "description": "Pipelines",
+        "location": "Remote",
+        "skills": ["Python", "Spark"],
+    }
+    job_id = client.post("/jobs", json=job_payload).json()["id"]
+
+    db = TestingSessionLocal()
+    try:
+        before = {row.content_hash for row in db.query(EmbeddingRecord).all()}
+        assert len(before) == 1
+
+        client.put(f"/jobs/{job_id}", json={"description": "Streaming pipelines"})
+        db.expire_all()
+        after = {row.content_hash for row in db.query(EmbeddingRecord).all()}
+        assert len(after) == 1
+        assert after != before
+    finally:
+        db.close()
+
+
+def test_cold_job_index_build_does_not_reload_rows_one_by_one(client: TestClient) -> None:
+    from backend.services.matcher import ensure_job_index
+
+    with TestingSessionLocal() as db:
+        db.add_all(Job(title=f"Engineer {n}", company="Acme", description=f"Role {n}", location="Remote", skills=["Python"]) for n in range(200))
+        db.commit()
+    get_job_index().clear()
+
+    with TestingSessionLocal() as db, _recorded_statements() as statements:
+        index = ensure_job_index(db)
+
+    assert len(index) == 200
+    # embedding writes go through their own session, so the loaded rows are never expired and re-selected
+    assert len(statements) < 20
+
+
+def test_uncached_candidate_match_loads_cv_text_with_the_candidate(client: TestClient) -> None:
+    from backend.services.matcher import match_for_candidate
+
+    with TestingSessionLocal() as db:
+        db.add_all(Job(title=f"Engineer {n}", company="Acme", description=f"Role {n}", location="Remote", skills=["Python"]) for n in range(5))
+        candidate = Candidate(name="Jane Doe", skills=["Python"], cv_text="Python and Docker engineer")
+        db.add(candidate)
+        db.commit()
+        candidate_id = candidate.id
+        match_for_candidate(db, candidate_id)  # warm the indexes
+    get_match_cache().clear()
+
+    with TestingSessionLocal() as db, _recorded_statements() as statements:
+        _, results = match_for_candidate(db, candidate_id)
+
+    assert len(results) == 5
+    candidate_loads = [statement for statement in statements if "FROM candidates" in statement]
+    # one SELECT brings the deferred CV along; scoring never lazy-loads it on its own
+    assert len(candidate_loads) == 1
+    assert "cv_text" in candidate_loads[0]
+
+
+def test_reverse_match_ranks_candidates_for_job(client: TestClient) -> None:
+    job_payload = {
+        "title": "Python Developer",
+        "company": "Tech Corp",
+        "description": "Create scalable services",
+        "location": "Hybrid",
+        "skills": ["Python", "FastAPI"],
+    }
+    job_id = client.post("/jobs", json=job_payload).json()["id"]
+
+    strong = client.post(
+        "/candidates",
+        json={"name": "Jane Doe", "skills": ["Python", "FastAPI"], "cv_text": "Python engineer using FastAPI."},
+    ).json()["id"]
+    weak = client.post(
+        "/candidates",
+        json={"name": "John Roe", "skills": ["React"], "cv_text": "Frontend developer."},
+    ).json()["id"]
+
+    resp = client.get(f"/match/job/{job_id}", params={"top_k": 5})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["job_id"] == job_id
+    assert body["job_skills"] == ["FastAPI", "Python"]
+
+    ranked = [row["candidate_id"] for row in body["results"]]
+    assert ranked == [strong, weak]
+    top = body["results"][0]
+    assert top["score"] == 1.0
+    assert top["matched_skills"] == ["FastAPI", "Python"]
+    assert body["results"][1]["missing_skills"] == ["FastAPI", "Python"]
+
+    assert client.get("/match/job/9999").status_code == 404
+
+
+def test_reverse_match_counts_unknown_job_skills_without_growing_vocabulary(client: TestClient) -> None:
+    job = {"title": "Platform Engineer", "company": "Acme", "description": "Ops", "location": "Remote", "skills": ["Zanzibar"]}
+    job_id = client.post("/jobs", json=job).json()["id"]
+    client.post("/candidates", json={"name": "Jane Doe", "skills": ["Python"], "cv_text": "Python and Zanzibar policies"})
+    vocabulary = get_candidate_index().vocabulary
+    client.get(f"/match/job/{job_id}")  # loads the candidate index
+    size = len(vocabulary)
+
+    top = client.get(f"/match/job/{job_id}").json()["results"][0]
+    assert top["keyword_hits"] == 1
+    assert len(vocabulary) == size
+    assert vocabulary.get("zanzibar") is None
+
+
+def test_reverse_match_sees_updates_made_by_another_process(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("backend.services.matcher.INDEX_REFRESH_SECONDS", 0)
+    job = {"title": "Go Developer", "company": "Acme", "description": "Services", "location": "Remote", "skills": ["Go"]}
+    job_id = client.post("/jobs", json=job).json()["id"]
+    candidate_id = client.post("/candidates", json={"name": "Jane Doe", "skills": ["Python"], "cv_text": "Python"}).json()["id"]
+    assert client.get(f"/match/job/{job_id}").json()["results"][0]["skill_score"] == 0.0
+
+    # another worker edits the candidate: same row count and max id, only the shared revision moves
+    with TestingSessionLocal() as db:
+        db.execute(update(Candidate).where(Candidate.id == candidate_id).values(skills=["Go"]))
+        db.commit()
+        bump_revision(db, CANDIDATES)
+
+    top = client.get(f"/match/job/{job_id}").json()["results"][0]
+    assert top["skill_score"] == 1.0
+    assert top["matched_skills"] == ["Go"]
+
+
+def test_batch_match_streams_ndjson(client: TestClient) -> None:
+    import json
+
+    client.post(
+        "/jobs",
+        json={
+            "title": "Python Developer",
+            "company": "Tech Corp",
+            "description": "Services",
+            "location": "Hybrid",
+            "skills": ["Python", "FastAPI"],
+        },
+    )
+    first = client.post("/candidates", json={"name": "Jane Doe", "skills": ["Python", "FastAPI"], "cv_text": "Python"}).json()["id"]
+    second = client.post("/candidates", json={"name": "John Roe", "skills": ["Go"], "cv_text": None}).json()["id"]
+
+    resp = client.post("/match/batch", json={"candidate_ids": [second, 9999, first], "top_k": 5})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert [line["candidate_id"] for line in lines] == [second, 9999, first]
+    assert lines[1]["error"] == "Candidate not found"
+    assert lines[2]["results"] == client.get(f"/match/candidate/{first}", params={"top_k": 5}).json()["results"]
+
+    everyone = [json.loads(line) for line in client.post("/match/batch", json={"candidate_ids": "all"}).text.splitlines()]
+    assert [line["candidate_id"] for line in everyone] == [first, second]
+
+
+def test_ann_semantic_mode_matches_exact_on_small_corpus(client: TestClient, tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr("backend.services.ann.ANN_INDEX_DIR", str(tmp_path))
+    for title, skills in (("Python Developer", ["Python"]), ("Designer", ["Figma"]), ("Data Engineer", ["SQL", "Python"])):
+        client.post(
+            "/jobs",
+            json={"title": title, "company": "Acme", "description": title, "location": "Remote", "skills": skills},
+        )
+    candidate_id = client.post(
+        "/candidates", json={"name": "Jane Doe", "skills": ["Python"], "cv_text": "Python and SQL"}
+    ).json()["id"]
+
+    exact = client.get(f"/match/candidate/{candidate_id}", params={"semantic_mode": "exact"})
+    approx = client.get(f"/match/candidate/{candidate_id}", params={"semantic_mode": "ann"})
+    assert approx.status_code == 200
+    assert approx.json()["results"] == exact.json()["results"]
+    assert list(tmp_path.glob("jobs-*.npz"))
+
+    assert client.get(f"/match/candidate/{candidate_id}", params={"semantic_mode": "fuzzy"}).status_code == 422
+
+
+def test_match_cache_hits_and_invalidates_on_writes(client: TestClient) -> None:
+    job = {"title": "Python Developer", "company": "Acme", "description": "APIs", "location": "Remote", "skills": ["Python"]}
+    job_id = client.post("/jobs", json=job).json()["id"]
+    candidate_id = client.post("/candidates", json={"name": "Jane Doe", "skills": ["Python"], "cv_text": "Python"}).json()["id"]
+
+    first = client.get(f"/match/candidate/{candidate_id}").json()
+    second = client.get(f"/match/candidate/{candidate_id}").json()
+    assert first == second
+
+    stats = client.get("/match/cache/stats").json()
+    assert stats["backend"] == "memory"
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == 0.5
+
+    client.put(f"/jobs/{job_id}", json={"skills": ["Go"]})
+    refreshed = client.get(f"/match/candidate/{candidate_id}").json()
+    assert refreshed["results"][0]["missing_skills"] == ["Go"]
+    assert client.get("/match/cache/stats").json()["misses"] == 2
+
+
+def _crawl_row(job_id: int, **overrides: str) -> dict:
+    row = {
+        "title": f"Data Analyst {job_id}",
+        "detail_title": f"Data Analyst {job_id} (SQL)",
+        "job_url": f"https://www.topcv.vn/viec-lam/data-analyst/{job_id}.html",
+        "company": "ABC",
+        "company_name_full": "Công ty ABC",
+        "detail_location": "Hà Nội",
+        "tags": "SQL; Python",
+        "desc_mota": "Phân tích dữ liệu bán hàng",
+        "desc_yeucau": "Thành thạo SQL",
+    }
+    row.update(overrides)
+    return row
+
+
+def test_cached_rankings_follow_job_updates_from_another_process(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("backend.services.matcher.INDEX_REFRESH_SECONDS", 0)
+    job = {"title": "Go Developer", "company": "Acme", "description": "Services", "location": "Remote", "skills": ["Go"]}
+    job_id = client.post("/jobs", json=job).json()["id"]
+    candidate_id = client.post("/candidates", json={"name": "Jane Doe", "skills": ["Python"], "cv_text": "Python"}).json()["id"]
+    assert client.get(f"/match/candidate/{candidate_id}").json()["results"][0]["skill_score"] == 0.0
+
+    with TestingSessionLocal() as db:
+        db.execute(update(Job).where(Job.id == job_id).values(skills=["Python"]))
+        db.commit()
+        bump_revision(db, JOBS)
+
+    assert client.get(f"/match/candidate/{candidate_id}").json()["results"][0]["skill_score"] == 1.0
+
+
+def test_memory_match_cache_entries_expire() -> None:
+    now = [0.0]
+    backend = MemoryBackend(max_entries=10, ttl_seconds=60, clock=lambda: now[0])
+    backend.set("v0.0:1", [{"job_id": 1}])
+    now[0] = 59.0
+    assert backend.get("v0.0:1") == [{"job_id": 1}]
+    now[0] = 60.0
+    assert backend.get("v0.0:1") is None
+    assert backend.size() == 0
+
+
+def test_ingest_crawl_rows_upserts_by_job_url(client: TestClient) -> None:
+    rows = [
+        _crawl_row(1),
+        _crawl_row(2),
+        _crawl_row(3, job_url=""),
+        _crawl_row(1, job_url="https://www.topcv.vn/viec-lam/data-analyst/1.html?ta_source=search"),
+    ]
+    with TestingSessionLocal() as db:
+        assert ingest_rows(db, rows, chunk_size=3) == IngestReport(inserted=2, updated=0, skipped=2)
+        # API workers learn about the load from this revision, not from the CLI's in-memory state
+        assert current_revision(db, JOBS) == 1
+
+    jobs = sorted(client.get("/jobs").json(), key=lambda job: job["id"])
+    assert [job["job_url"] for job in jobs] == [
+        "https://www.topcv.vn/viec-lam/data-analyst/1.html",
+        "https://www.topcv.vn/viec-lam/data-analyst/2.html",
+    ]
+    assert jobs[0]["company"] == "Công ty ABC"
+    assert jobs[0]["skills"] == ["SQL", "Python"]
+    assert jobs[0]["description"] == "Mô tả công việc:\nPhân tích dữ liệu bán hàng\n\nYêu cầu ứng viên:\nThành thạo SQL"
+
+    with TestingSessionLocal() as db:
+        report = ingest_rows(db, [_crawl_row(1), _crawl_row(2, detail_location="Hồ Chí Minh")])
+        assert current_revision(db, JOBS) == 2
+    assert report == IngestReport(inserted=0, updated=1, skipped=1)
+    assert client.get(f"/jobs/{jobs[1]['id']}").json()["location"] == "Hồ Chí Minh"
+
+    duplicate = {"title": "Copy", "company": "ABC", "description": "x", "location": "HN", "job_url": jobs[0]["job_url"]}
+    assert client.post("/jobs", json=duplicate).status_code == 409
+
+
+def test_ingest_embeds_jobs_and_shares_url_form_with_job_routes(client: TestClient) -> None:
+    from backend.models.embedding import EmbeddingRecord
+    from backend.services.matcher import job_fingerprint
+
+    posted = client.post("/jobs", json={
+        "title": "Data Analyst", "company": "ABC", "description": "x", "location": "HN",
+        "job_url": "HTTPS://WWW.TOPCV.VN/viec-lam/data-analyst/1.html/?ta_source=search#apply",
+    }).json()
+    assert posted["job_url"] == "https://www.topcv.vn/viec-lam/data-analyst/1.html"
+
+    with TestingSessionLocal() as db:
+        assert ingest_rows(db, [_crawl_row(1), _crawl_row(2)]) == IngestReport(inserted=1, updated=1, skipped=0)
+        jobs = db.query(Job).all()
+        stored = {row.content_hash for row in db.query(EmbeddingRecord)}
+        # embedded during the load, so the first match request embeds nothing
+        assert {job_fingerprint(job) for job in jobs} <= stored
+    assert [job["id"] for job in client.get("/jobs").json()] == [posted["id"], posted["id"] + 1]
+
+
+def test_ingest_upsert_updates_rows_inserted_concurrently(client: TestClient) -> None:
+    from backend.services.job_ingest import _upsert, row_to_job
+
+    job = row_to_job(_crawl_row(1))
+    # a row that appeared after the chunk looked for existing URLs
+    job_id = client.post("/jobs", json={**job, "title": "Stale"}).json()["id"]
+    with TestingSessionLocal() as db:
+        _upsert(db, [job])
+        db.commit()
+    assert client.get(f"/jobs/{job_id}").json()["title"] == job["title"]
+    assert len(client.get("/jobs").json()) == 1
+
+
+def test_ensure_schema_adds_job_url_to_an_existing_database() -> None:
+    from sqlalchemy import inspect, text
+
+    from backend.models.migrations import ensure_schema
+
+    legacy = create_engine("sqlite://", poolclass=StaticPool)
+    with legacy.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE jobs (id INTEGER PRIMARY KEY, title TEXT NOT NULL, company TEXT NOT NULL, "
+            "description TEXT NOT NULL, location TEXT NOT NULL, skills JSON)"
+        ))
+
+    assert ensure_schema(legacy) == ["jobs.job_url"]
+    assert ensure_schema(legacy) == []
+    indexes = {index["name"]: index for index in inspect(legacy).get_indexes("jobs")}
+    assert indexes["ix_jobs_job_url"]["unique"]
+
+
+def test_list_endpoints_page_by_id_and_stream_ndjson(client: TestClient) -> None:
+    with TestingSessionLocal() as db:
+        ingest_rows(db, [_crawl_row(number) for number in range(1, 6)])
+    candidate_ids = [
+        client.post("/candidates", json={"name": f"Candidate {n}", "skills": ["SQL"], "cv_text": "SQL"}).json()["id"]
+        for n in range(3)
+    ]
+
+    first = client.get("/jobs", params={"limit": 2})
+    assert [job["id"] for job in first.json()] == [1, 2]
+    second = client.get("/jobs", params={"limit": 2, "after": first.headers["X-Next-After"]})
+    assert [job["id"] for job in second.json()] == [3, 4]
+    last = client.get("/jobs", params={"limit": 2, "after": second.headers["X-Next-After"]})
+    assert [job["id"] for job in last.json()] == [5]
+    assert "X-Next-After" not in last.headers
+
+    streamed = client.get("/jobs", params={"stream": True, "after": 2})
+    assert streamed.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in streamed.text.splitlines()]
+    assert [job["id"] for job in lines] == [3, 4, 5]
+    assert lines[0]["job_url"] == "https://www.topcv.vn/viec-lam/data-analyst/3.html"
+
+    # candidates come newest first, so the cursor walks down
+    newest = client.get("/candidates", params={"limit": 2})
+    assert [c["id"] for c in newest.json()] == candidate_ids[:0:-1]
+    older = client.get("/candidates", params={"after": newest.headers["X-Next-After"]})
+    assert [c["id"] for c in older.json()] == candidate_ids[:1]
+    streamed = client.get("/candidates", params={"stream": True})
+    assert [json.loads(line)["id"] for line in streamed.text.splitlines()] == candidate_ids[::-1]
+    assert client.get("/jobs", params={"limit": 0}).status_code == 422
+
+
+def test_summaries_and_reverse_match_skip_long_text_columns(client: TestClient) -> None:
+    job = {"title": "Python Developer", "company": "Acme", "description": "Long posting", "location": "Remote", "skills": ["Python"]}
+    job_id = client.post("/jobs", json=job).json()["id"]
+    candidate_id = client.post("/candidates", json={"name": "Jane Doe", "skills": ["Python"], "cv_text": "Python"}).json()["id"]
+    # warm the job and candidate indexes
+    client.get(f"/match/candidate/{candidate_id}")
+    client.get(f"/match/job/{job_id}")
+
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany) -> None:
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        jobs = client.get("/jobs/summary").json()
+        candidates = client.get("/candidates/summary").json()
+        summary_statements, statements[:] = list(statements), []
+        matched = client.get(f"/match/job/{job_id}").json()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert jobs == [{"id": job_id, "title": "Python Developer", "company": "Acme", "location": "Remote", "skills": ["Python"], "job_url": None}]
+    assert candidates == [{"id": candidate_id, "name": "Jane Doe", "skills": ["Python"]}]
+    assert not [s for s in summary_statements if "description" in s or "cv_text" in s]
+    # the job embedding comes from the index; only the keyword pass reads CVs, as (id, cv_text)
+    assert matched["results"][0]["candidate_id"] == candidate_id
+    assert not [s for s in statements if "jobs.description" in s or ("candidates.name" in s and "cv_text" in s)]
+
+    assert client.get(f"/jobs/{job_id}").json()["description"] == "Long posting"
+    assert client.get(f"/candidates/{candidate_id}").json()["cv_text"] == "Python"
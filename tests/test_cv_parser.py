@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+from pathlib import Path
+import asyncio
+import io
+import json
+import os
+import sys
+import time
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import pytest
+
+from backend.services.cv_cache import ENTRY_OVERHEAD, CachedCv, ParsedCvCache, get_parsed_cv_cache
+from backend.services.cv_executor import ParseExecutor, ParserBusyError, ParserCrashedError, ParseTimeoutError
+from backend.benchmarks.cv_upload import write_synthetic_pdf
+from backend.services.cv_parser import _cache_key, _take_text, cached_parse, extract_skills, iter_pdf_pages, parse_cv_bytes, spool_upload
+from backend.services.skill_taxonomy import compile_taxonomy, import_esco, load_taxonomy
+
+
+def test_extract_skills_folds_aliases_and_phrases() -> None:
+    text = "Built ML pipelines (machine learning) on K8s with C++, Node.js and scikit-learn. Python."
+
+    assert extract_skills(text) == ["c++", "kubernetes", "machine learning", "node.js", "python", "scikit-learn"]
+
+
+def test_taxonomy_prefers_longest_phrase() -> None:
+    taxonomy = compile_taxonomy({"react": ["reactjs"], "react native": ["react-native"], "java": [], "javascript": ["js"]})
+
+    assert taxonomy.extract("React-Native and ReactJS") == ["react", "react native"]
+    assert taxonomy.extract("javascript developer") == ["javascript"]
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "There was rust on the gate",
+        "A swift learner who adapts quickly",
+        "Worked as a Business Analyst at ACME",
+        "Prepared a cucumber salad",
+        "ECS motherboard repair",
+        "Sold Galaxy S3 phones",
+        "Able to react quickly to incidents",
+        "Mapped each node of the graph",
+        "Measured 500 ml of water",
+        "Julia Nguyen, Hanoi",
+        "CNN news anchor",
+    ],
+)
+def test_extract_skills_ignores_ambiguous_everyday_words(text: str) -> None:
+    assert extract_skills(text) == []
+
+
+def test_extract_skills_keeps_ambiguous_skills_in_context() -> None:
+    text = "Built iOS apps in Swift, services in Rust, React UIs, BDD with Cucumber, files in S3 buckets on AWS ECS."
+
+    assert extract_skills(text) == ["amazon ecs", "amazon s3", "aws", "bdd", "cucumber", "ios", "react", "rust", "swift"]
+
+
+def test_taxonomy_guards_survive_the_compiled_artefact(tmp_path: Path) -> None:
+    source = tmp_path / "skills.json"
+    source.write_text(json.dumps({"skills": {"rust": []}, "guards": {"rust": {"cased": ["Rust"]}}}), encoding="utf-8")
+
+    for _ in range(2):  # compiled, then read back from the artefact
+        taxonomy = load_taxonomy(str(source), str(tmp_path / "cache"))
+        assert taxonomy.extract("Rust services") == ["rust"]
+        assert taxonomy.extract("rust on the gate") == []
+
+
+def test_import_esco_adds_skills_without_overriding_bundled_ones(tmp_path: Path) -> None:
+    base = tmp_path / "base.json"
+    base.write_text(json.dumps({"skills": {"kubernetes": ["k8s"]}, "guards": {"k8s": {"cased": ["K8s"]}}}), encoding="utf-8")
+    esco = tmp_path / "skills_en.csv"
+    esco.write_text(
+        "conceptUri,preferredLabel,altLabels,status\n"
+        'x/1,manage greenhouse climate,"control greenhouse climate\nregulate greenhouse climate",released\n'
+        "x/2,Kubernetes,kube orchestration,released\n"
+        'x/3,use k8s,"k8s",released\n'
+        "x/4,obsolete skill,,obsolete\n",
+        encoding="utf-8",
+    )
+
+    merged = import_esco(str(esco), str(base))
+
+    assert merged["skills"] == {
+        "kubernetes": ["k8s"],
+        "manage greenhouse climate": ["control greenhouse climate", "regulate greenhouse climate"],
+        "use k8s": [],
+    }
+    assert merged["guards"] == {"k8s": {"cased": ["K8s"]}}
+
+
+def test_load_taxonomy_reuses_compiled_artefact(tmp_path: Path) -> None:
+    source = tmp_path / "skills.json"
+    source.write_text(json.dumps({"skills": {"kubernetes": ["k8s"]}}), encoding="utf-8")
+    cache_dir = tmp_path / "cache"
+
+    first = load_taxonomy(str(source), str(cache_dir))
+    artefacts = list(cache_dir.iterdir())
+    assert [path.name for path in artefacts] == [f"skill_taxonomy-{first.version}.json"]
+    assert json.loads(artefacts[0].read_text(encoding="utf-8"))["version"] == first.version
+    assert load_taxonomy(str(source), str(cache_dir)).extract("k8s") == ["kubernetes"]
+
+    # A damaged artefact is recompiled from the source rather than trusted.
+    artefacts[0].write_bytes(b"\x80\x04not json")
+    assert load_taxonomy(str(source), str(cache_dir)).extract("k8s") == ["kubernetes"]
+
+    source.write_text(json.dumps({"skills": {"kubernetes": ["k8s", "kube"]}}), encoding="utf-8")
+    assert load_taxonomy(str(source), str(cache_dir)).version != first.version
+
+
+def test_spool_upload_moves_large_files_to_disk(tmp_path: Path) -> None:
+    assert spool_upload(io.BytesIO(b"small"), threshold=16) == b"small"
+
+    path = spool_upload(io.BytesIO(b"x" * 100), ".pdf", threshold=16)
+    try:
+        assert path.endswith(".pdf")
+        assert Path(path).read_bytes() == b"x" * 100
+    finally:
+        Path(path).unlink()
+
+
+def test_pdf_extraction_stops_at_page_and_char_budget(tmp_path: Path) -> None:
+    path = tmp_path / "cv.pdf"
+    write_synthetic_pdf(str(path), pages=5)
+
+    assert len(list(iter_pdf_pages(str(path), max_pages=2))) == 2
+
+    pages = iter_pdf_pages(str(path))
+    assert _take_text(pages, max_chars=20) == "Jane Doe - page 1\nSe"
+    assert pages.gi_frame is None  # generator closed, no further pages read
+
+    _, text, skills = parse_cv_bytes("cv.pdf", path.read_bytes())
+    assert "page 5" in text
+    assert "kubernetes" in skills
+
+
+def test_parsed_cv_cache_evicts_by_size() -> None:
+    cache = ParsedCvCache(max_bytes=2 * ENTRY_OVERHEAD + 150)
+    cache.put("a", CachedCv(None, "x" * 100, [], "t"))
+    cache.put("b", CachedCv(None, "y" * 10, [], "t"))
+    assert cache.get("a") is not None
+
+    cache.put("c", CachedCv(None, "z" * 50, [], "t"))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["bytes"] == 2 * ENTRY_OVERHEAD + 150
+
+
+def test_cached_parse_rederives_skills_after_taxonomy_change() -> None:
+    cache = get_parsed_cv_cache()
+    cache.clear()
+    cache.put(_cache_key("cv.pdf", "abc"), CachedCv("Jane Doe", "Python and K8s", ["python"], "old-taxonomy"))
+
+    assert cached_parse("cv.pdf", "abc") == ("Jane Doe", "Python and K8s", ["kubernetes", "python"])
+    assert cached_parse("cv.docx", "abc") is None
+    cache.clear()
+
+
+def test_parse_executor_rejects_when_saturated() -> None:
+    executor = ParseExecutor(max_workers=1, max_queued=0, timeout=5)
+    try:
+        first = executor.submit(time.sleep, 0.5)
+        with pytest.raises(ParserBusyError):
+            executor.submit(time.sleep, 0)
+        first.result(timeout=30)
+        assert executor.in_flight == 0
+        assert asyncio.run(executor.run(len, "abc")) == 3
+    finally:
+        executor.shutdown()
+
+
+def test_parse_executor_rebuilds_pool_after_worker_crash() -> None:
+    executor = ParseExecutor(max_workers=1, max_queued=0, timeout=30)
+    try:
+        with pytest.raises(ParserCrashedError):
+            asyncio.run(executor.run(os._exit, 1))
+        assert asyncio.run(executor.run(len, "abc")) == 3
+    finally:
+        executor.shutdown()
+
+
+def test_parse_executor_frees_the_slot_of_a_timed_out_parse() -> None:
+    executor = ParseExecutor(max_workers=1, max_queued=0, timeout=0.5)
+    try:
+        started = time.monotonic()
+        with pytest.raises(ParseTimeoutError):
+            asyncio.run(executor.run(time.sleep, 60))
+        while executor.in_flight and time.monotonic() - started < 20:
+            time.sleep(0.05)
+        # the hung worker was killed rather than left holding the only slot
+        assert asyncio.run(executor.run(len, "abc")) == 3
+        assert time.monotonic() - started < 30
+    finally:
+        executor.shutdown()
+
+
+def test_parse_executor_waits_for_a_slot_when_asked() -> None:
+    executor = ParseExecutor(max_workers=1, max_queued=0, timeout=5)
+    try:
+        first = executor.submit(time.sleep, 0.3)
+        second = executor.submit(len, "abc", wait=True)
+        assert first.done()
+        assert second.result(timeout=30) == 3
+    finally:
+        executor.shutdown()
+
+
+def test_parse_executor_times_out_slow_jobs() -> None:
+    executor = ParseExecutor(max_workers=1, timeout=0.2)
+    try:
+        executor.submit(len, "").result(timeout=30)  # start the worker before timing
+        with pytest.raises(ParseTimeoutError):
+            asyncio.run(executor.run(time.sleep, 2))
+    finally:
+        executor.shutdown()
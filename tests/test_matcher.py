@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+
+import numpy as np
+import pytest
+
+from backend.models.candidate import Candidate
+from backend.models.job import Job
+from backend.services.ann import IVFFlatIndex, recall_at_k
+from backend.services.embedding import HashingEmbeddingService, get_embedding_service
+from backend.services.embedding_store import EmbeddingStore, content_hash
+from backend.services.keyword_scan import KeywordAutomaton, KeywordScanner
+from backend.services.match_index import MatchIndex
+from backend.services.ranking import top_k
+from backend.services.matcher import (
+    _compose_candidate_text,
+    _compose_job_text,
+    rank_corpus,
+    score_candidate_to_job,
+    score_candidates_batch,
+    score_corpus,
+)
+from backend.services.skill_vocab import SkillVocabulary
+
+
+def _job(job_id: int, title: str, skills: list[str]) -> Job:
+    return Job(id=job_id, title=title, company="Acme", description=f"{title} role", location="Remote", skills=skills)
+
+
+def test_ranked_semantic_scores_match_pairwise_similarity() -> None:
+    candidate = Candidate(id=1, name="Jane Doe", skills=["Python", "SQL"], cv_text="Python and SQL analyst")
+    jobs = [
+        _job(1, "Data Analyst", ["SQL", "Python"]),
+        _job(2, "Frontend Engineer", ["React", "TypeScript"]),
+        _job(3, "Platform Engineer", ["Docker"]),
+    ]
+    index = MatchIndex(SkillVocabulary())
+    embedder = get_embedding_service()
+    for job in jobs:
+        index.upsert(job.id, {skill.lower() for skill in job.skills}, embedder.embed(_compose_job_text(job)))
+
+    scores, ranked = rank_corpus(None, candidate, index.snapshot(), index.vocabulary, top_k=len(jobs))
+
+    candidate_text = _compose_candidate_text(candidate)
+    semantic = dict(zip(scores.ids.tolist(), scores.semantic_score.tolist()))
+    expected = {job.id: embedder.similarity(candidate_text, _compose_job_text(job)) for job in jobs}
+    assert semantic == pytest.approx(expected, abs=1e-5)
+    assert int(scores.ids[ranked[0][0]]) == 1
+
+
+def test_embedding_store_memory_evicts_least_recently_used() -> None:
+    store = EmbeddingStore(HashingEmbeddingService(), max_memory_entries=2)
+    store.get_many(None, ["python", "sql"])
+    store.get(None, "python")  # a hit makes "python" the most recent entry
+    store.get(None, "docker")
+
+    assert list(store._memory) == [content_hash("python"), content_hash("docker")]
+
+
+def test_job_index_snapshot_tracks_writes() -> None:
+    index = MatchIndex(SkillVocabulary())
+    index.upsert(1, {"python", "sql"}, np.array([1.0, 0.0], dtype=np.float32))
+    index.upsert(2, {"react"}, np.array([0.0, 1.0], dtype=np.float32))
+    index.upsert(3, {"python"}, np.array([0.6, 0.8], dtype=np.float32))
+
+    assert sorted(index.snapshot().ids.tolist()) == [1, 2, 3]
+
+    index.upsert(1, {"go"}, np.array([1.0, 0.0], dtype=np.float32))
+    index.remove(3)
+
+    snap = index.snapshot()
+    assert sorted(snap.ids.tolist()) == [1, 2]
+    assert snap.row_sizes().tolist() == [1, 1]
+    assert snap.vectors[snap.rows[2]].tolist() == [0.0, 1.0]
+
+
+def test_score_corpus_matches_pairwise_scoring() -> None:
+    candidate = Candidate(id=1, name="Jane Doe", skills=["Python", "SQL", "Airflow"], cv_text="Built Docker images for Python jobs")
+    jobs = [
+        _job(1, "Data Engineer", ["Python", "SQL", "Docker"]),
+        _job(2, "Frontend Engineer", ["React"]),
+        _job(3, "Analyst", []),
+    ]
+    index = MatchIndex(SkillVocabulary())
+    embedder = get_embedding_service()
+    for job in jobs:
+        index.upsert(job.id, {skill.lower() for skill in job.skills}, embedder.embed(_compose_job_text(job)))
+
+    scores = score_corpus(None, candidate, index.snapshot(), index.vocabulary)
+
+    for row, job_id in enumerate(scores.ids.tolist()):
+        expected = score_candidate_to_job(candidate, jobs[job_id - 1], float(scores.semantic_score[row]))
+        assert round(float(scores.score[row]), 4) == expected["score"]
+        assert round(float(scores.skill_score[row]), 4) == expected["skill_score"]
+        assert int(scores.keyword_hits[row]) == expected["keyword_hits"]
+        assert round(float(scores.coverage[row]), 4) == expected["coverage"]
+
+
+def test_rank_corpus_prunes_without_changing_top_k() -> None:
+    candidate = Candidate(id=1, name="Jane Doe", skills=["Python", "SQL"], cv_text="Python, SQL and Airflow")
+    index = MatchIndex(SkillVocabulary())
+    embedder = get_embedding_service()
+    pool = ["Python", "SQL", "Airflow", "React", "Go", "Rust", "Docker", "AWS"]
+    for job_id in range(1, 61):
+        skills = [pool[(job_id + step) % len(pool)] for step in range(job_id % 4)]
+        job = _job(job_id, f"Role {job_id}", skills)
+        index.upsert(job_id, {skill.lower() for skill in skills}, embedder.embed(_compose_job_text(job)))
+    snap = index.snapshot()
+
+    full = score_corpus(None, candidate, snap, index.vocabulary)
+    expected = sorted(zip((-np.round(full.score, 4)).tolist(), full.ids.tolist()))[:5]
+
+    scores, ranked = rank_corpus(None, candidate, snap, index.vocabulary, top_k=5)
+
+    assert [(-score, int(scores.ids[position])) for position, score in ranked] == expected
+    assert len(scores.ids) < len(snap)
+
+
+def test_batch_scoring_in_job_chunks_keeps_each_top_k() -> None:
+    candidates = [
+        Candidate(id=1, name="Jane Doe", skills=["Python", "SQL"], cv_text="Python, SQL and Airflow"),
+        Candidate(id=2, name="John Roe", skills=["React"], cv_text="React and Docker"),
+    ]
+    index = MatchIndex(SkillVocabulary())
+    embedder = get_embedding_service()
+    pool = ["Python", "SQL", "Airflow", "React", "Go", "Rust", "Docker", "AWS"]
+    for job_id in range(1, 61):
+        skills = [pool[(job_id + step) % len(pool)] for step in range(job_id % 4)]
+        index.upsert(job_id, {skill.lower() for skill in skills}, embedder.embed(_compose_job_text(_job(job_id, f"Role {job_id}", skills))))
+    snap = index.snapshot()
+
+    batch = score_candidates_batch(None, candidates, snap, index.vocabulary, top_k=5, chunk_size=7)
+
+    for candidate, scores in zip(candidates, batch):
+        exact, ranked = rank_corpus(None, candidate, snap, index.vocabulary, top_k=5)
+        expected = [(int(exact.ids[position]), score) for position, score in ranked]
+        assert [(int(scores.ids[position]), score) for position, score in top_k(scores.ids, scores.score, 5)] == expected
+        assert len(scores.ids) <= 5 * 9  # at most top_k survivors per chunk
+
+
+def test_ivf_flat_recall_against_exact_search() -> None:
+    rng = np.random.default_rng(7)
+    centres = rng.normal(size=(20, 32))
+    vectors = centres[rng.integers(0, 20, size=2000)] + 0.3 * rng.normal(size=(2000, 32))
+    vectors = (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+    ids = np.arange(1, 2001)
+
+    ann = IVFFlatIndex(nprobe=16)
+    ann.train(vectors)
+    ann.add_many(ids.tolist(), vectors)
+    queries = vectors[rng.choice(2000, size=50, replace=False)]
+
+    assert recall_at_k(ann, vectors, ids, queries, k=10) >= 0.9
+
+    ann.remove(int(ids[0]))
+    assert 1 not in ann.search(vectors[0], 10)[0].tolist()
+    ann.add(1, vectors[0])
+    assert ann.search(vectors[0], 1)[0].tolist() == [1]
+
+
+def test_keyword_automaton_respects_word_boundaries() -> None:
+    automaton = KeywordAutomaton(["java", "javascript", "c++", "node.js", "machine learning", "go"])
+
+    found = automaton.find("Senior JavaScript dev; some C++, Node.js and machine learning. Gopher.")
+
+    assert {automaton.keywords[index] for index in found} == {"javascript", "c++", "node.js", "machine learning"}
+    assert automaton.find("java") == {0}
+
+
+def test_keyword_scanner_rescans_when_vocabulary_grows() -> None:
+    vocabulary = SkillVocabulary()
+    vocabulary.add_many(["python", "sql"])
+    scanner = KeywordScanner(vocabulary)
+    text = "Python, SQL and Docker"
+
+    assert [vocabulary.label(i) for i in scanner.scan(text)] == ["python", "sql"]
+
+    vocabulary.add("docker")
+    assert [vocabulary.label(i) for i in scanner.scan(text)] == ["python", "sql", "docker"]
+
+
+def test_keyword_hits_ignore_partial_words() -> None:
+    candidate = Candidate(id=1, name="Jane Doe", skills=[], cv_text="JavaScript and React")
+    job = _job(1, "Backend", ["Java", "React"])
+
+    assert score_candidate_to_job(candidate, job, 0.0)["keyword_hits"] == 1
@@ -0,0 +1,374 @@
+from __future__ import annotations
+
+from pathlib import Path
+import re
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+
+import pandas as pd
+import pytest
+
+from backend.services import topcv, topcv_crawler
+from backend.services.crawl_sinks import JsonlSink
+from backend.services.crawl_state import CrawlState
+from backend.services.http_cache import HttpCache, Memo, normalize_url
+from backend.services.http_replay import ReplayAdapter, ResponseArchive
+from backend.services.rate_limit import HostRateLimiter, TokenBucket
+from backend.services.topcv import parse_page
+from backend.services.topcv_crawler import crawl_concurrent
+
+FIXTURES = PROJECT_ROOT / "tests" / "fixtures" / "topcv"
+SEARCH_URL = "https://www.topcv.vn/tim-viec-lam-data-analyst?type_keyword=1&page={page}&sba=1"
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, text: str = "", headers: dict | None = None) -> None:
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class FakeSession:
+    """Serves the saved TopCV pages; ``throttle`` makes the first N calls to a URL answer 429."""
+
+    def __init__(self, throttle: dict | None = None, fail: set | None = None) -> None:
+        self.rate_limiter = None
+        self.http_cache = None
+        self.throttle = dict(throttle or {})
+        self.fail = set(fail or ())
+        self.calls: list[str] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fixture_for(url: str) -> Path | None:
+        page = re.search(r"[?&]page=(\d+)", url)
+        if page:
+            return FIXTURES / f"search_page_{page.group(1)}.html"
+        number = re.search(r"(\d+)\.html", url)
+        if not number:
+            return None
+        prefix = "company" if "/cong-ty/" in url else "job"
+        return FIXTURES / f"{prefix}_{number.group(1)}.html"
+
+    def get(self, url: str, timeout: float = 30, **kwargs) -> FakeResponse:
+        if url in self.fail:
+            raise ConnectionError(f"connection reset: {url}")
+        with self._lock:
+            self.calls.append(url)
+            if self.throttle.get(url, 0) > 0:
+                self.throttle[url] -= 1
+                return FakeResponse(429, headers={"Retry-After": "0"})
+        path = self.fixture_for(url)
+        if path is None or not path.exists():
+            return FakeResponse(404)
+        etag = f'"{path.stat().st_size}"'
+        if (kwargs.get("headers") or {}).get("If-None-Match") == etag:
+            return FakeResponse(304, headers={"ETag": etag})
+        return FakeResponse(200, path.read_text(encoding="utf-8"), headers={"ETag": etag})
+
+
+@pytest.fixture()
+def no_sleep(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(topcv, "smart_sleep", lambda *args, **kwargs: None)
+
+
+def _sequential_frame(monkeypatch: pytest.MonkeyPatch, end_page: int = 3) -> pd.DataFrame:
+    monkeypatch.setattr(topcv, "build_session", lambda *args, **kwargs: FakeSession())
+    return topcv.crawl_to_dataframe(SEARCH_URL, start_page=1, end_page=end_page)
+
+
+def test_sequential_crawl_reads_fixture_pages(monkeypatch: pytest.MonkeyPatch, no_sleep: None) -> None:
+    df = _sequential_frame(monkeypatch)
+
+    assert df["job_url"].tolist() == [
+        "https://www.topcv.vn/viec-lam/data-analyst/1001.html",
+        "https://www.topcv.vn/viec-lam/senior-data-engineer/1002.html",
+        "https://www.topcv.vn/brand/xyz/tuyen-dung/bi-analyst-j1003.html",
+        "https://www.topcv.vn/viec-lam/data-scientist/1004.html",
+    ]
+    first = df.iloc[0]
+    assert first["tags"] == "SQL; Python; Power BI"
+    assert first["company_size"] == "100-499 nhân viên"
+    assert first["deadline"] == "30/11/2025"
+
+
+def test_concurrent_crawl_matches_sequential_output(monkeypatch: pytest.MonkeyPatch, no_sleep: None) -> None:
+    expected = _sequential_frame(monkeypatch)
+
+    rows = crawl_concurrent(SEARCH_URL, 1, 3, max_in_flight=4, requests_per_second=1000, session=FakeSession())
+
+    pd.testing.assert_frame_equal(topcv.rows_to_dataframe(rows), expected)
+
+
+@pytest.mark.parametrize("parser", ["bs4", "lxml"])
+def test_pipeline_parses_in_process_pool(monkeypatch: pytest.MonkeyPatch, no_sleep: None, parser: str) -> None:
+    expected = _sequential_frame(monkeypatch)
+
+    rows = crawl_concurrent(SEARCH_URL, 1, 3, max_in_flight=4, requests_per_second=1000, session=FakeSession(),
+                            parser=parser, parse_workers=2)
+
+    pd.testing.assert_frame_equal(topcv.rows_to_dataframe(rows), expected)
+
+
+class ManualStage:
+    """Parse stage whose futures stay pending until the test resolves them."""
+
+    def __init__(self) -> None:
+        self.queued: list[tuple[str, str, Future]] = []
+
+    def submit(self, kind: str, html: str) -> Future:
+        future: Future = Future()
+        self.queued.append((kind, html, future))
+        return future
+
+    def resolve(self) -> None:
+        kind, html, future = self.queued.pop(0)
+        future.set_result(parse_page(None, kind, html))
+
+
+def test_pipeline_fetch_thread_does_not_wait_for_parsing() -> None:
+    session = FakeSession()
+    session.rate_limiter = HostRateLimiter(1000, burst=4)
+    stage = ManualStage()
+    job = {"job_url": "https://www.topcv.vn/viec-lam/data-analyst/1001.html", "company_url": None}
+    row: Future = Future()
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        staged = pool.submit(topcv_crawler.fetch_job_pages, pool, stage, session, job, Memo(), None, row).result(timeout=5)
+        assert [kind for kind, _, _ in stage.queued] == ["job"]
+        assert not staged.ready() and not row.done()
+
+        stage.resolve()
+        for _ in range(500):  # the company fetch is chained onto the detail parse
+            if stage.queued:
+                break
+            time.sleep(0.01)
+        assert [kind for kind, _, _ in stage.queued] == ["company"]
+        stage.resolve()
+
+        merged = staged.merge()
+    assert row.result() is merged
+    assert merged["company_size"] == "100-499 nhân viên"
+
+
+def test_concurrent_crawl_backs_off_on_429(monkeypatch: pytest.MonkeyPatch, no_sleep: None) -> None:
+    expected = _sequential_frame(monkeypatch)
+    company = "https://www.topcv.vn/cong-ty/cong-ty-abc/501.html"
+    session = FakeSession(throttle={company: 2})
+    session.rate_limiter = HostRateLimiter(1000, burst=4)
+
+    rows = crawl_concurrent(SEARCH_URL, 1, 3, max_in_flight=4, session=session)
+
+    pd.testing.assert_frame_equal(topcv.rows_to_dataframe(rows), expected)
+    assert session.rate_limiter.throttled == 2
+    assert session.rate_limiter.bucket(company).rate < 1000
+
+
+def test_replayed_archive_survives_injected_errors_and_429s(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, no_sleep: None
+) -> None:
+    build_session = topcv.build_session
+    recorder = FakeSession()
+    monkeypatch.setattr(topcv, "build_session", lambda *args, **kwargs: recorder)
+    expected = topcv.crawl_to_dataframe(SEARCH_URL, start_page=1, end_page=3)
+    archive = ResponseArchive(str(tmp_path / "archive"))
+    for url in set(recorder.calls):
+        path = FakeSession.fixture_for(url)
+        if path is not None and path.exists():
+            archive.store(url, 200, path.read_text(encoding="utf-8"))
+
+    replay = ReplayAdapter(archive, latency=0.01, error_rate=0.15, throttle_rate=0.15, max_retries=10, seed=3,
+                           sleep=lambda seconds: None)
+    session = build_session(HostRateLimiter(1000, burst=4), transport=replay)
+    rows = crawl_concurrent(SEARCH_URL, 1, 3, max_in_flight=4, session=session)
+
+    pd.testing.assert_frame_equal(topcv.rows_to_dataframe(rows), expected)
+    stats = replay.stats()
+    assert stats["throttled"] == session.rate_limiter.throttled > 0
+    assert stats["retries"] > 0
+    assert stats["served"] == len(recorder.calls)
+
+
+def test_company_pages_are_fetched_once_per_run(monkeypatch: pytest.MonkeyPatch, no_sleep: None) -> None:
+    session = FakeSession()
+    monkeypatch.setattr(topcv, "build_session", lambda *args, **kwargs: session)
+    df = topcv.crawl_to_dataframe(SEARCH_URL, start_page=1, end_page=3)
+
+    companies = {normalize_url(url, keep_query=False) for url in session.calls if "/cong-ty/" in url}
+    assert len([url for url in session.calls if "/cong-ty/" in url]) == len(companies) < len(df)
+
+    concurrent = FakeSession()
+    crawl_concurrent(SEARCH_URL, 1, 3, max_in_flight=4, requests_per_second=1000, session=concurrent)
+    fetched = [normalize_url(url, keep_query=False) for url in concurrent.calls if "/cong-ty/" in url]
+    assert sorted(fetched) == sorted(companies)
+
+
+def test_http_cache_serves_fresh_pages_and_revalidates_stale_ones(tmp_path: Path, no_sleep: None) -> None:
+    expected = topcv.rows_to_dataframe(
+        crawl_concurrent(SEARCH_URL, 1, 3, max_in_flight=4, requests_per_second=1000, session=FakeSession())
+    )
+
+    first = FakeSession()
+    crawl_concurrent(SEARCH_URL, 1, 3, max_in_flight=4, requests_per_second=1000, session=first,
+                     http_cache=HttpCache(str(tmp_path)))
+
+    fresh = FakeSession()
+    cache = HttpCache(str(tmp_path))
+    rows = crawl_concurrent(SEARCH_URL, 1, 3, max_in_flight=4, requests_per_second=1000, session=fresh, http_cache=cache)
+    assert fresh.calls == []
+    assert cache.stats() == {"hits": len(first.calls), "revalidated": 0, "misses": 0}
+    pd.testing.assert_frame_equal(topcv.rows_to_dataframe(rows), expected)
+
+    stale = FakeSession()
+    cache = HttpCache(str(tmp_path), ttls={"search": 0, "job": 0, "company": 0, "other": 0})
+    rows = crawl_concurrent(SEARCH_URL, 1, 3, max_in_flight=4, requests_per_second=1000, session=stale, http_cache=cache)
+    assert cache.stats()["revalidated"] == len(stale.calls) - cache.stats()["misses"] > 0
+    pd.testing.assert_frame_equal(topcv.rows_to_dataframe(rows), expected)
+
+
+def test_sequential_crawl_skips_polite_delay_for_cached_pages(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    sleeps: list[tuple] = []
+    monkeypatch.setattr(topcv, "smart_sleep", lambda *args: sleeps.append(args))
+
+    def crawl(ttls: dict | None = None) -> FakeSession:
+        session = FakeSession()
+        session.http_cache = HttpCache(str(tmp_path), ttls=ttls)
+        monkeypatch.setattr(topcv, "build_session", lambda *args, **kwargs: session)
+        topcv.crawl_to_dataframe(SEARCH_URL, start_page=1, end_page=3)
+        return session
+
+    first = crawl()
+    assert first.calls and sleeps  # downloads keep the polite delay
+
+    sleeps.clear()
+    crawl()  # every page is a fresh cache hit
+    assert sleeps == []
+
+    stale = crawl(ttls={"search": 0, "job": 0, "company": 0, "other": 0})
+    assert stale.http_cache.stats()["revalidated"] == len(stale.calls) > 0
+    assert sleeps == []
+
+
+def test_crawl_resumes_from_checkpoint_and_skips_unchanged_jobs(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, no_sleep: None
+) -> None:
+    expected = _sequential_frame(monkeypatch)
+    state_path = str(tmp_path / "crawl.sqlite")
+
+    crashing = FakeSession(fail={SEARCH_URL.format(page=2)})
+    monkeypatch.setattr(topcv, "build_session", lambda *args, **kwargs: crashing)
+    with pytest.raises(ConnectionError):
+        topcv.crawl_to_dataframe(SEARCH_URL, start_page=1, end_page=3, state_path=state_path)
+
+    resumed = FakeSession()
+    monkeypatch.setattr(topcv, "build_session", lambda *args, **kwargs: resumed)
+    df = topcv.crawl_to_dataframe(SEARCH_URL, start_page=1, end_page=3, state_path=state_path)
+    pd.testing.assert_frame_equal(df, expected)
+    assert SEARCH_URL.format(page=1) not in resumed.calls
+    assert not set(crashing.calls) & {url for url in resumed.calls if "/viec-lam/" in url}
+
+    with sqlite3.connect(state_path) as conn:
+        conn.execute("UPDATE crawl_jobs SET fingerprint = 'stale' WHERE path = '/viec-lam/data-scientist/1004.html'")
+    incremental = FakeSession()
+    rows = crawl_concurrent(SEARCH_URL, 1, 3, max_in_flight=4, requests_per_second=1000, session=incremental,
+                            state=CrawlState(state_path), incremental=True)
+    pd.testing.assert_frame_equal(topcv.rows_to_dataframe(rows), expected)
+    assert [url for url in incremental.calls if "/viec-lam/" in url or "/tuyen-dung/" in url] == [
+        "https://www.topcv.vn/viec-lam/data-scientist/1004.html"
+    ]
+
+
+@pytest.mark.parametrize("suffix", [".jsonl", ".csv", ".parquet"])
+def test_crawl_streams_rows_to_file(monkeypatch: pytest.MonkeyPatch, tmp_path: Path, no_sleep: None, suffix: str) -> None:
+    if suffix == ".parquet":
+        pytest.importorskip("pyarrow")
+    expected = _sequential_frame(monkeypatch)
+    out = tmp_path / f"jobs{suffix}"
+    monkeypatch.setattr(topcv_crawler, "build_session", lambda *args, **kwargs: FakeSession())
+
+    written = topcv.crawl_to_file(str(out), SEARCH_URL, 1, 3, batch_size=2, max_in_flight=4, requests_per_second=1000)
+
+    if suffix == ".jsonl":
+        df = pd.read_json(out, lines=True, dtype=False)
+    elif suffix == ".csv":
+        df = pd.read_csv(out, encoding="utf-8-sig", dtype=str, keep_default_na=False).replace("", None)
+    else:
+        df = pd.read_parquet(out)
+    assert written == len(expected)
+    assert df["job_url"].tolist() == expected["job_url"].tolist()
+    assert df["company_size"].tolist() == expected["company_size"].tolist()
+
+
+def test_sink_flushes_full_batches_before_close(tmp_path: Path) -> None:
+    out = tmp_path / "rows.jsonl"
+    sink = JsonlSink(str(out), ["job_url"], batch_size=2)
+    for i in range(3):
+        sink.write({"job_url": f"https://www.topcv.vn/viec-lam/x/{i}.html", "ignored": i})
+
+    assert len(out.read_text(encoding="utf-8").splitlines()) == 2
+    sink.close()
+    assert len(out.read_text(encoding="utf-8").splitlines()) == 3
+
+
+# Pages lxml refuses by default but BeautifulSoup reads, e.g. a blank anti-bot answer.
+EDGE_PAGES = {
+    "blank": " \n\t ",
+    "comment-only": "<!-- blocked -->",
+    "xml-declaration": '<?xml version="1.0" encoding="utf-8"?>\n'
+    + (FIXTURES / "search_page_1.html").read_text(encoding="utf-8"),
+}
+
+
+@pytest.mark.parametrize("fixture", sorted(path.name for path in FIXTURES.glob("*.html")) + sorted(EDGE_PAGES))
+def test_lxml_parser_matches_beautifulsoup(fixture: str) -> None:
+    html = EDGE_PAGES.get(fixture) or (FIXTURES / fixture).read_text(encoding="utf-8")
+    reference, fast = topcv.get_parser_backend("bs4"), topcv.get_parser_backend("lxml")
+
+    assert fast.search(html) == reference.search(html)
+    assert fast.job(html) == reference.job(html)
+    assert fast.company(html) == reference.company(html)
+
+
+def test_lxml_text_skips_scripts_and_comments_like_beautifulsoup() -> None:
+    html = (
+        "<html><body><div class='job-description'><div class='job-description__item'>"
+        "<h3>Mô tả <!-- x --> công việc</h3><div class='job-description__item--content'>"
+        "Phân tích<script>var a = 1;</script>\n\t dữ liệu&nbsp;bán hàng</div></div></div></body></html>"
+    )
+
+    assert topcv.get_parser_backend("lxml").job(html) == topcv.get_parser_backend("bs4").job(html)
+
+
+def test_normalize_url_ignores_case_fragment_and_trailing_slash() -> None:
+    assert normalize_url("HTTPS://WWW.TopCV.vn/cong-ty/abc/501.html/#about") == "https://www.topcv.vn/cong-ty/abc/501.html"
+    assert normalize_url("https://www.topcv.vn/cong-ty/abc/501.html?ref=job", keep_query=False) == (
+        "https://www.topcv.vn/cong-ty/abc/501.html"
+    )
+
+
+def test_token_bucket_paces_and_honours_retry_after() -> None:
+    now = [0.0]
+    bucket = TokenBucket(rate=2.0, burst=1, clock=lambda: now[0], sleep=lambda s: now.__setitem__(0, now[0] + s))
+
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == pytest.approx(0.5)
+
+    bucket.backoff(retry_after=3.0)
+    assert bucket.rate == 1.0
+    assert bucket.acquire() == pytest.approx(3.0)
+
+    for _ in range(40):
+        bucket.success()
+    assert bucket.rate == 2.0